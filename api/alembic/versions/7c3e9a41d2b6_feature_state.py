@@ -0,0 +1,32 @@
+"""feature state for incremental feature generation
+
+Revision ID: 7c3e9a41d2b6
+Revises: 21db927b19fb
+Create Date: 2026-10-17 09:12:44.318205
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = '7c3e9a41d2b6'
+down_revision: Union[str, None] = '21db927b19fb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('feature_state',
+    sa.Column('topic_id', sa.UUID(), nullable=False),
+    sa.Column('high_water_mark', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('window_json', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['topic_id'], ['topics.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('topic_id')
+    )
+    op.create_index('idx_ts_topic_created', 'source_timeseries', ['topic_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_ts_topic_created', table_name='source_timeseries')
+    op.drop_table('feature_state')
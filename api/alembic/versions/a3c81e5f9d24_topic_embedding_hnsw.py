@@ -0,0 +1,27 @@
+"""topic embedding hnsw
+
+Revision ID: a3c81e5f9d24
+Revises: f2a9d6c4b318
+Create Date: 2026-10-17 17:08:25.470193
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'a3c81e5f9d24'
+down_revision: Union[str, None] = 'f2a9d6c4b318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('topics', sa.Column('embedding_fingerprint', sa.String(length=64), nullable=True))
+    op.create_index('idx_topics_embedding_hnsw', 'topics', ['embedding'], unique=False,
+                    postgresql_using='hnsw',
+                    postgresql_with={'m': 16, 'ef_construction': 64},
+                    postgresql_ops={'embedding': 'vector_cosine_ops'})
+
+
+def downgrade() -> None:
+    op.drop_index('idx_topics_embedding_hnsw', table_name='topics')
+    op.drop_column('topics', 'embedding_fingerprint')
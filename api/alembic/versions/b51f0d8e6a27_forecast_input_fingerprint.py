@@ -0,0 +1,23 @@
+"""forecast input fingerprint
+
+Revision ID: b51f0d8e6a27
+Revises: 7c3e9a41d2b6
+Create Date: 2026-10-17 11:40:02.914336
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'b51f0d8e6a27'
+down_revision: Union[str, None] = '7c3e9a41d2b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('forecasts', sa.Column('input_fingerprint', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('forecasts', 'input_fingerprint')
@@ -0,0 +1,76 @@
+"""topic latest read model
+
+Revision ID: b7e4d2a61c95
+Revises: a3c81e5f9d24
+Create Date: 2026-10-17 18:31:02.655710
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = 'b7e4d2a61c95'
+down_revision: Union[str, None] = 'a3c81e5f9d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('topic_latest',
+    sa.Column('topic_id', sa.UUID(), nullable=False),
+    sa.Column('opportunity_score', sa.Numeric(precision=6, scale=2), nullable=True),
+    sa.Column('competition_score', sa.Numeric(precision=6, scale=2), nullable=True),
+    sa.Column('demand_score', sa.Numeric(precision=6, scale=2), nullable=True),
+    sa.Column('review_gap_score', sa.Numeric(precision=6, scale=2), nullable=True),
+    sa.Column('stage', sa.String(), nullable=True),
+    sa.Column('sparkline', postgresql.ARRAY(sa.Float()), nullable=True),
+    sa.Column('sources', postgresql.ARRAY(sa.String()), nullable=True),
+    sa.Column('scored_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['topic_id'], ['topics.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('topic_id')
+    )
+    op.create_index('idx_topic_latest_opportunity', 'topic_latest', ['opportunity_score'], unique=False)
+    op.create_index('idx_topic_latest_competition', 'topic_latest', ['competition_score'], unique=False)
+
+    # Backfill from existing history so reads work before the next scoring run
+    op.execute("""
+        INSERT INTO topic_latest (topic_id, opportunity_score, competition_score, demand_score,
+                                  review_gap_score, stage, sparkline, sources, scored_at, updated_at)
+        SELECT t.id, sc.opportunity, sc.competition, sc.demand, sc.review_gap, t.stage,
+               spark.points, src.sources, sc.scored_at, now()
+        FROM topics t
+        LEFT JOIN LATERAL (
+            SELECT max(score_value) FILTER (WHERE score_type = 'opportunity') AS opportunity,
+                   max(score_value) FILTER (WHERE score_type = 'competition') AS competition,
+                   max(score_value) FILTER (WHERE score_type = 'demand') AS demand,
+                   max(score_value) FILTER (WHERE score_type = 'review_gap') AS review_gap,
+                   max(computed_at) AS scored_at
+            FROM (
+                SELECT DISTINCT ON (score_type) score_type, score_value, computed_at
+                FROM scores
+                WHERE topic_id = t.id
+                ORDER BY score_type, computed_at DESC
+            ) latest
+        ) sc ON true
+        LEFT JOIN LATERAL (
+            SELECT array_agg(COALESCE(normalized_value, 0)::float8 ORDER BY date) AS points
+            FROM (
+                SELECT normalized_value, date FROM source_timeseries
+                WHERE topic_id = t.id
+                ORDER BY date DESC
+                LIMIT 12
+            ) recent
+        ) spark ON true
+        LEFT JOIN LATERAL (
+            SELECT array_agg(DISTINCT source) AS sources
+            FROM source_timeseries
+            WHERE topic_id = t.id
+        ) src ON true
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_topic_latest_competition', table_name='topic_latest')
+    op.drop_index('idx_topic_latest_opportunity', table_name='topic_latest')
+    op.drop_table('topic_latest')
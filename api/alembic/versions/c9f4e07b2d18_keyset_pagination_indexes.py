@@ -0,0 +1,24 @@
+"""keyset pagination indexes
+
+Revision ID: c9f4e07b2d18
+Revises: b7e4d2a61c95
+Create Date: 2026-10-17 19:42:05.380117
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'c9f4e07b2d18'
+down_revision: Union[str, None] = 'b7e4d2a61c95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_runs_started', 'ingestion_runs', ['started_at', 'id'], unique=False)
+    op.create_index('idx_error_logs_created', 'error_logs', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_error_logs_created', table_name='error_logs')
+    op.drop_index('idx_runs_started', table_name='ingestion_runs')
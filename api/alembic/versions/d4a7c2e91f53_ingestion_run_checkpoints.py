@@ -0,0 +1,31 @@
+"""ingestion run checkpoints
+
+Revision ID: d4a7c2e91f53
+Revises: b51f0d8e6a27
+Create Date: 2026-10-17 13:05:37.602118
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = 'd4a7c2e91f53'
+down_revision: Union[str, None] = 'b51f0d8e6a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('ingestion_runs', sa.Column('task_id', sa.String(), nullable=True))
+    op.add_column('ingestion_runs', sa.Column('batches_total', sa.Integer(), nullable=True))
+    op.add_column('ingestion_runs', sa.Column('batches_done', sa.Integer(), nullable=True))
+    op.add_column('ingestion_runs', sa.Column('checkpoint_json', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.create_index('idx_runs_dag_task', 'ingestion_runs', ['dag_id', 'task_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_runs_dag_task', table_name='ingestion_runs')
+    op.drop_column('ingestion_runs', 'checkpoint_json')
+    op.drop_column('ingestion_runs', 'batches_done')
+    op.drop_column('ingestion_runs', 'batches_total')
+    op.drop_column('ingestion_runs', 'task_id')
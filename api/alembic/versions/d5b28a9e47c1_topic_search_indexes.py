@@ -0,0 +1,30 @@
+"""topic search indexes
+
+Revision ID: d5b28a9e47c1
+Revises: c9f4e07b2d18
+Create Date: 2026-10-17 20:31:17.642088
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'd5b28a9e47c1'
+down_revision: Union[str, None] = 'c9f4e07b2d18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index('idx_topics_name_trgm', 'topics', ['name'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('idx_topics_name_prefix', 'topics', [sa.text('lower(name) COLLATE "C"')],
+                    unique=False, postgresql_where=sa.text('is_active = true'))
+    op.create_index('idx_keywords_keyword_trgm', 'keywords', ['keyword'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'keyword': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    op.drop_index('idx_keywords_keyword_trgm', table_name='keywords')
+    op.drop_index('idx_topics_name_prefix', table_name='topics')
+    op.drop_index('idx_topics_name_trgm', table_name='topics')
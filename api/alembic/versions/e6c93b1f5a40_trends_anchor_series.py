@@ -0,0 +1,37 @@
+"""trends anchor series
+
+Revision ID: e6c93b1f5a40
+Revises: d5b28a9e47c1
+Create Date: 2026-10-18 10:12:44.207315
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'e6c93b1f5a40'
+down_revision: Union[str, None] = 'd5b28a9e47c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('trends_anchor',
+    sa.Column('anchor', sa.String(), nullable=False),
+    sa.Column('geo', sa.String(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('value', sa.Numeric(precision=12, scale=4), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('anchor', 'geo', 'date')
+    )
+    # Google Trends values on the fixed anchor scale go to their own column.
+    # normalized_value keeps the legacy rolling-window values untouched, so a
+    # downgrade loses nothing; readers switch to scaled_value, which
+    # ingest_google_trends fills for the last three months and
+    # backfill_google_trends for older history. feature_state entries built
+    # from normalized_value are rebuilt by generate_features on its next run.
+    op.add_column('source_timeseries', sa.Column('scaled_value', sa.Numeric(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('source_timeseries', 'scaled_value')
+    op.drop_table('trends_anchor')
@@ -0,0 +1,31 @@
+"""keyword discovery source
+
+Revision ID: e8b3f15a0c72
+Revises: d4a7c2e91f53
+Create Date: 2026-10-17 15:42:11.830415
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'e8b3f15a0c72'
+down_revision: Union[str, None] = 'd4a7c2e91f53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_constraint('ck_keywords_source', 'keywords', type_='check')
+    op.create_check_constraint(
+        'ck_keywords_source', 'keywords',
+        "source IN ('keywordtool', 'junglescout', 'gtrends', 'reddit', 'discovery')",
+    )
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM keywords WHERE source = 'discovery'")
+    op.drop_constraint('ck_keywords_source', 'keywords', type_='check')
+    op.create_check_constraint(
+        'ck_keywords_source', 'keywords',
+        "source IN ('keywordtool', 'junglescout', 'gtrends', 'reddit')",
+    )
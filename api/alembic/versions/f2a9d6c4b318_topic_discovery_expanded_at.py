@@ -0,0 +1,22 @@
+"""topic discovery expanded at
+
+Revision ID: f2a9d6c4b318
+Revises: e8b3f15a0c72
+Create Date: 2026-10-17 16:20:48.114902
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'f2a9d6c4b318'
+down_revision: Union[str, None] = 'e8b3f15a0c72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('topics', sa.Column('discovery_expanded_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('topics', 'discovery_expanded_at')
@@ -0,0 +1,37 @@
+"""ingestion run completed batches
+
+Revision ID: f81d3c5a9b27
+Revises: e6c93b1f5a40
+Create Date: 2026-10-18 11:40:02.518930
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = 'f81d3c5a9b27'
+down_revision: Union[str, None] = 'e6c93b1f5a40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('ingestion_runs', sa.Column('batches_completed', postgresql.ARRAY(sa.Integer()), nullable=True))
+    # Move completed batch indexes out of the (large, immutable) plan document
+    op.execute("""
+        UPDATE ingestion_runs
+        SET batches_completed = ARRAY(
+                SELECT CAST(jsonb_array_elements_text(checkpoint_json -> 'done') AS int)),
+            checkpoint_json = checkpoint_json - 'done'
+        WHERE checkpoint_json -> 'done' IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    op.execute("""
+        UPDATE ingestion_runs
+        SET checkpoint_json = jsonb_set(checkpoint_json, '{done}',
+                                        to_jsonb(COALESCE(batches_completed, CAST('{}' AS int[]))))
+        WHERE checkpoint_json IS NOT NULL
+    """)
+    op.drop_column('ingestion_runs', 'batches_completed')
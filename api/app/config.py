@@ -2,6 +2,8 @@ from pydantic_settings import BaseSettings
 from functools import lru_cache
 from typing import Optional
 
+from neuranest_shared.timeseries_upsert import UPSERT_CHUNK_SIZE
+
 
 class Settings(BaseSettings):
     # App
@@ -46,6 +48,38 @@ class Settings(BaseSettings):
     AWS_REGION: str = "us-east-1"
     S3_RAW_BUCKET: str = "neuranest-raw"
 
+    # Ingestion
+    TIMESERIES_UPSERT_CHUNK_SIZE: int = UPSERT_CHUNK_SIZE  # source_timeseries rows per upsert statement
+    GOOGLE_TRENDS_ANCHOR_KEYWORD: str = "water bottle"  # shared by every payload; fixes the global scale
+    GOOGLE_TRENDS_IDENTITIES: str = ""  # JSON list of {"name", "proxy", "cookies", "requests_per_minute"}
+    GOOGLE_TRENDS_REQUESTS_PER_MINUTE: float = 12  # default budget per identity
+    GOOGLE_TRENDS_CACHE_ENABLED: bool = True  # reuse raw pytrends responses from Redis
+    GOOGLE_TRENDS_CACHE_TTL: int = 36 * 3600  # seconds; keys are also scoped to the UTC day
+    REDDIT_ASYNC: bool = True  # concurrent asyncio ingestion instead of the serial loop
+    REDDIT_BASE_URL: Optional[str] = None  # override (e.g. a local stub server)
+    REDDIT_CONCURRENCY: int = 8  # in-flight search requests
+    REDDIT_REQUESTS_PER_MINUTE: Optional[float] = None  # default: 100 with OAuth, 10 public
+
+    # Discovery
+    DISCOVERY_EXPANSION_FRACTION: float = 1.0  # share of active topics expanded per run, least recently expanded first
+    DISCOVERY_RELATED_TIMEFRAME: str = "today 3-m"  # related-queries window
+    DISCOVERY_SEMANTIC_DEDUP: bool = True  # check would-be new topics against topic embeddings
+    DISCOVERY_SEMANTIC_THRESHOLD: float = 0.80  # cosine similarity at which a candidate is a duplicate
+
+    # Embeddings
+    EMBEDDING_ENCODER: str = "sentence-transformers"  # or "hashing" (deterministic, offline)
+    EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"  # 384-dim, matches Topic.embedding
+    EMBEDDING_BATCH_SIZE: int = 256  # texts per encoder forward pass
+
+    # Forecasting
+    FORECAST_WORKERS: int = 4  # process-pool size for model fits (<= 1 fits in-process)
+    FORECAST_FIT_TIMEOUT: int = 120  # seconds per topic fit before its worker is killed
+    FORECAST_QUEUE: str = "forecasting"  # range tasks; consume with -c 1 (one fit pool per worker)
+
+    # API cache
+    API_CACHE_TTL: int = 6 * 3600  # seconds; pipeline tasks invalidate entries by bumping generations
+    API_CACHE_TTL_JITTER: float = 0.1  # +/- fraction, so entries written together don't expire together
+
     # Pagination
     DEFAULT_PAGE_SIZE: int = 20
     MAX_PAGE_SIZE: int = 100
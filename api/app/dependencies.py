@@ -1,5 +1,6 @@
 import json
 import hashlib
+import random
 from datetime import datetime, timedelta
 from typing import Optional
 from uuid import UUID
@@ -15,6 +16,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.config import get_settings
 from app.database import get_db
 from app.models import User
+from app.services.cache_versions import generation_key
 
 settings = get_settings()
 
@@ -117,6 +119,18 @@ def cache_key(prefix: str, **kwargs) -> str:
     return f"neuranest:{prefix}:{h}"
 
 
+async def versioned_cache_key(redis: aioredis.Redis, prefix: str, namespaces: tuple, **kwargs) -> str:
+    """cache_key scoped to the current generation of each namespace the response reads."""
+    generations = await redis.mget([generation_key(ns) for ns in namespaces])
+    version = ".".join(g or "0" for g in generations)
+    return cache_key(f"{prefix}:v{version}", **kwargs)
+
+
+def cache_ttl() -> int:
+    jitter = settings.API_CACHE_TTL_JITTER
+    return int(settings.API_CACHE_TTL * random.uniform(1 - jitter, 1 + jitter))
+
+
 async def get_cached(key: str, redis: aioredis.Redis) -> Optional[str]:
     return await redis.get(key)
 
@@ -2,9 +2,9 @@ import uuid
 from datetime import datetime, date
 from sqlalchemy import (
     Column, String, Text, Integer, BigInteger, Boolean, Numeric,
-    Date, DateTime, ForeignKey, UniqueConstraint, CheckConstraint, Index, JSON
+    Date, DateTime, ForeignKey, UniqueConstraint, CheckConstraint, Index, JSON, Float, text
 )
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
 from sqlalchemy.orm import relationship
 from pgvector.sqlalchemy import Vector
 from app.database import Base
@@ -61,8 +61,10 @@ class Topic(Base):
     stage = Column(String, default="unknown")
     primary_category = Column(String, nullable=True, index=True)
     embedding = Column(Vector(384), nullable=True)
+    embedding_fingerprint = Column(String(64), nullable=True)
     forecast_direction = Column(String, nullable=True)
     is_active = Column(Boolean, default=True)
+    discovery_expanded_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -75,12 +77,21 @@ class Topic(Base):
     forecasts = relationship("Forecast", back_populates="topic")
     scores = relationship("Score", back_populates="topic")
     gen_next_specs = relationship("GenNextSpec", back_populates="topic")
+    latest = relationship("TopicLatest", back_populates="topic", uselist=False)
 
     __table_args__ = (
         CheckConstraint(
             "stage IN ('emerging', 'exploding', 'peaking', 'declining', 'unknown')",
             name="ck_topics_stage"
         ),
+        Index("idx_topics_embedding_hnsw", "embedding", postgresql_using="hnsw",
+              postgresql_with={"m": 16, "ef_construction": 64},
+              postgresql_ops={"embedding": "vector_cosine_ops"}),
+        Index("idx_topics_name_trgm", "name", postgresql_using="gin",
+              postgresql_ops={"name": "gin_trgm_ops"}),
+        # prefix autocomplete: LIKE 'abc%' range scans and ORDER BY on one index
+        Index("idx_topics_name_prefix", text('lower(name) COLLATE "C"'),
+              postgresql_where=text("is_active = true")),
     )
 
 
@@ -103,10 +114,12 @@ class Keyword(Base):
     __table_args__ = (
         UniqueConstraint("keyword", "source", "geo", name="uq_keywords_unique"),
         CheckConstraint(
-            "source IN ('keywordtool', 'junglescout', 'gtrends', 'reddit')",
+            "source IN ('keywordtool', 'junglescout', 'gtrends', 'reddit', 'discovery')",
             name="ck_keywords_source"
         ),
         Index("idx_keywords_topic", "topic_id"),
+        Index("idx_keywords_keyword_trgm", "keyword", postgresql_using="gin",
+              postgresql_ops={"keyword": "gin_trgm_ops"}),
     )
 
 
@@ -132,6 +145,7 @@ class SourceTimeseries(Base):
     geo = Column(String, default="US")
     raw_value = Column(Numeric, nullable=True)
     normalized_value = Column(Numeric, nullable=True)
+    scaled_value = Column(Numeric, nullable=True)  # Google Trends on the fixed anchor scale (trends_anchor)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
 
     topic = relationship("Topic", back_populates="timeseries")
@@ -139,9 +153,22 @@ class SourceTimeseries(Base):
     __table_args__ = (
         UniqueConstraint("topic_id", "source", "date", "geo", name="uq_ts_unique"),
         Index("idx_ts_topic_date", "topic_id", "date"),
+        Index("idx_ts_topic_created", "topic_id", "created_at"),
     )
 
 
+# ─── Google Trends Anchor Series ───
+class TrendsAnchor(Base):
+    """Per-date global-scale value of the Trends anchor keyword. Written once per date."""
+    __tablename__ = "trends_anchor"
+
+    anchor = Column(String, primary_key=True)
+    geo = Column(String, primary_key=True)
+    date = Column(Date, primary_key=True)
+    value = Column(Numeric(12, 4), nullable=False)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+
 # ─── Amazon Competition Snapshot ───
 class AmazonCompetitionSnapshot(Base):
     __tablename__ = "amazon_competition_snapshot"
@@ -266,6 +293,16 @@ class DerivedFeature(Base):
     )
 
 
+# ─── Feature State (incremental feature generation) ───
+class FeatureState(Base):
+    __tablename__ = "feature_state"
+
+    topic_id = Column(UUID(as_uuid=True), ForeignKey("topics.id", ondelete="CASCADE"), primary_key=True)
+    high_water_mark = Column(DateTime(timezone=True), nullable=True)
+    window_json = Column(JSONB, nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+
 # ─── Forecasts ───
 class Forecast(Base):
     __tablename__ = "forecasts"
@@ -278,6 +315,7 @@ class Forecast(Base):
     yhat_lower = Column(Numeric, nullable=True)
     yhat_upper = Column(Numeric, nullable=True)
     model_version = Column(String, nullable=False)
+    input_fingerprint = Column(String(64), nullable=True)
     generated_at = Column(DateTime(timezone=True), default=datetime.utcnow)
 
     topic = relationship("Topic", back_populates="forecasts")
@@ -310,6 +348,34 @@ class Score(Base):
     )
 
 
+# ─── Topic Latest (read model) ───
+class TopicLatest(Base):
+    """
+    One row per topic with its latest score of each type, stage, sparkline
+    and sources. Rebuilt from scores/source_timeseries by the scoring task
+    (db_helpers.refresh_topic_latest) so reads don't scan score history.
+    """
+    __tablename__ = "topic_latest"
+
+    topic_id = Column(UUID(as_uuid=True), ForeignKey("topics.id", ondelete="CASCADE"), primary_key=True)
+    opportunity_score = Column(Numeric(6, 2), nullable=True)
+    competition_score = Column(Numeric(6, 2), nullable=True)
+    demand_score = Column(Numeric(6, 2), nullable=True)
+    review_gap_score = Column(Numeric(6, 2), nullable=True)
+    stage = Column(String, nullable=True)
+    sparkline = Column(ARRAY(Float), nullable=True)
+    sources = Column(ARRAY(String), nullable=True)
+    scored_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+    topic = relationship("Topic", back_populates="latest")
+
+    __table_args__ = (
+        Index("idx_topic_latest_opportunity", "opportunity_score"),
+        Index("idx_topic_latest_competition", "competition_score"),
+    )
+
+
 # ─── Gen-Next Specs ───
 class GenNextSpec(Base):
     __tablename__ = "gen_next_specs"
@@ -399,11 +465,18 @@ class IngestionRun(Base):
     error_count = Column(Integer, default=0)
     started_at = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
+    task_id = Column(String, nullable=True)  # Celery task id, stable across retries/redelivery
+    batches_total = Column(Integer, nullable=True)
+    batches_done = Column(Integer, default=0)
+    checkpoint_json = Column(JSONB, nullable=True)  # batch plan, written once per run
+    batches_completed = Column(ARRAY(Integer), nullable=True)  # completed batch indexes
 
     dq_metrics = relationship("DQMetric", back_populates="run")
 
     __table_args__ = (
         CheckConstraint("status IN ('running', 'success', 'failed', 'partial')", name="ck_runs_status"),
+        Index("idx_runs_dag_task", "dag_id", "task_id"),
+        Index("idx_runs_started", "started_at", "id"),
     )
 
 
@@ -430,3 +503,7 @@ class ErrorLog(Base):
     stack_trace = Column(Text, nullable=True)
     context_json = Column(JSONB, nullable=True)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("idx_error_logs_created", "created_at", "id"),
+    )
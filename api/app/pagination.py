@@ -0,0 +1,120 @@
+"""
+Keyset (cursor) pagination helpers.
+
+A cursor is an opaque url-safe token for the last row of a page: the sort it
+was issued for, that row's sort value and its id. The next page continues
+strictly after that (value, id) pair in ``ORDER BY value <dir> NULLS LAST,
+id <dir>`` order, so each page costs an index range scan no matter how deep
+the client has paged, and rows inserted meanwhile never shift the pages.
+
+Counts for cursor listings are either the planner's row estimate or an exact
+count cached in Redis, never a COUNT(*) per page.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+import redis.asyncio as aioredis
+from fastapi import HTTPException
+from sqlalchemy import asc, desc, func, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+COUNT_CACHE_TTL = 600  # seconds an exact count is reused across cursor pages
+
+
+def encode_cursor(sort: str, value: Any, row_id: Any) -> str:
+    raw = json.dumps({"s": sort, "v": value, "id": row_id}, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _coerce(column, raw):
+    if raw is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(raw)
+    return python_type(raw)
+
+
+def decode_cursor(cursor: str, sort: str, sort_col, id_col) -> Tuple[Any, Any]:
+    """
+    (value, id) from a cursor issued for ``sort``, typed like ``sort_col`` and
+    ``id_col``. Raises 400 for a malformed cursor or one from another sort.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["s"] != sort:
+            raise ValueError("cursor was issued for a different sort")
+        return _coerce(sort_col, payload["v"]), _coerce(id_col, payload["id"])
+    except (binascii.Error, KeyError, TypeError, ValueError, NotImplementedError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_order(sort_col, id_col, descending: bool) -> list:
+    direction = desc if descending else asc
+    return [direction(sort_col).nulls_last(), direction(id_col)]
+
+
+async def fetch_keyset(db: AsyncSession, query, sort_col, id_col, descending: bool,
+                       after: Optional[Tuple[Any, Any]], limit: int) -> list:
+    """
+    Up to ``limit`` rows of ``query`` in ``keyset_order`` order, strictly after
+    the (value, id) pair ``after`` (from the start when None).
+
+    Non-NULL sort values are read with a row comparison, which an index on
+    (sort_col, id) serves as a range scan; an ``OR sort_col IS NULL`` in the
+    same predicate would not be. NULLs sort last, so they are only read, by
+    id, once the non-NULL values run out.
+    """
+    direction = desc if descending else asc
+    rows = []
+    if after is None or after[0] is not None:
+        q = query.where(sort_col.isnot(None))
+        if after is not None:
+            key = tuple_(sort_col, id_col)
+            q = q.where(key < tuple_(*after) if descending else key > tuple_(*after))
+        result = await db.execute(q.order_by(direction(sort_col), direction(id_col)).limit(limit))
+        rows = result.all()
+    if len(rows) < limit:
+        q = query.where(sort_col.is_(None))
+        if after is not None and after[0] is None:
+            q = q.where(id_col < after[1] if descending else id_col > after[1])
+        result = await db.execute(q.order_by(direction(id_col)).limit(limit - len(rows)))
+        rows += result.all()
+    return rows
+
+
+async def estimated_count(db: AsyncSession, table: str) -> int:
+    """Planner row estimate for ``table`` (pg_class.reltuples), 0 if never analyzed."""
+    result = await db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+        {"table": table},
+    )
+    return max(result.scalar() or 0, 0)
+
+
+async def cached_count(db: AsyncSession, redis: aioredis.Redis, key: str, query,
+                       ttl_seconds: int = COUNT_CACHE_TTL) -> int:
+    """Exact row count of ``query``, cached under ``key`` for ``ttl_seconds``."""
+    cached = await redis.get(key)
+    if cached is not None:
+        return int(cached)
+    result = await db.execute(select(func.count()).select_from(query.order_by(None).subquery()))
+    total = result.scalar() or 0
+    await redis.set(key, total, ex=ttl_seconds)
+    return total
+
+
+def page_cursor(rows: list, page_size: int, sort: str, value_of, id_of) -> Tuple[list, Optional[str]]:
+    """
+    Trim a ``page_size + 1`` fetch to the page and build the cursor for the
+    next one (None on the last page).
+    """
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    last = rows[-1]
+    return rows, encode_cursor(sort, value_of(last), id_of(last))
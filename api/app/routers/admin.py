@@ -1,45 +1,94 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy import select, desc
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
 from app.database import get_db
 from app.models import User, IngestionRun, DQMetric, ErrorLog
-from app.dependencies import require_role
+from app.dependencies import require_role, get_redis, cache_key
+from app.pagination import (
+    cached_count, decode_cursor, estimated_count, fetch_keyset, page_cursor,
+)
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 
+async def _cursor_page(db: AsyncSession, query, table: str, filters: dict, cursor: str,
+                       limit: int, model, sort_col, serialize) -> dict:
+    """
+    One newest-first keyset page over ``sort_col, id``. Unfiltered listings
+    report the planner's row estimate; filtered ones a cached exact count.
+    """
+    if any(v is not None for v in filters.values()):
+        redis = await get_redis()
+        total = await cached_count(db, redis, cache_key(f"{table}_count", **filters), query)
+    else:
+        total = await estimated_count(db, table)
+
+    sort = f"-{sort_col.key}"
+    after = decode_cursor(cursor, sort, sort_col, model.id) if cursor else None
+    rows, next_cursor = page_cursor(
+        await fetch_keyset(db, query, sort_col, model.id, True, after, limit + 1), limit, sort,
+        value_of=lambda row: getattr(row[0], sort_col.key), id_of=lambda row: row[0].id,
+    )
+    return {
+        "data": [serialize(row[0]) for row in rows],
+        "pagination": {"page_size": limit, "total": total, "next_cursor": next_cursor},
+    }
+
+
+def _run_dict(r: IngestionRun) -> dict:
+    return {
+        "id": str(r.id),
+        "dag_id": r.dag_id,
+        "run_date": r.run_date.isoformat() if r.run_date else None,
+        "status": r.status,
+        "records_fetched": r.records_fetched,
+        "records_inserted": r.records_inserted,
+        "error_count": r.error_count,
+        "started_at": r.started_at.isoformat() if r.started_at else None,
+        "completed_at": r.completed_at.isoformat() if r.completed_at else None,
+        "batches_total": r.batches_total,
+        "batches_done": r.batches_done,
+        "progress_pct": (round(100.0 * (r.batches_done or 0) / r.batches_total, 1)
+                         if r.batches_total else None),
+    }
+
+
+def _error_log_dict(l: ErrorLog) -> dict:
+    return {
+        "id": l.id,
+        "source": l.source,
+        "error_type": l.error_type,
+        "message": l.message,
+        "context": l.context_json,
+        "created_at": l.created_at.isoformat() if l.created_at else None,
+    }
+
+
 @router.get("/ingestion-runs")
 async def list_ingestion_runs(
     dag_id: str = None,
     status: str = None,
     limit: int = Query(50, le=200),
+    cursor: str = None,
     user: User = Depends(require_role("admin")),
     db: AsyncSession = Depends(get_db),
 ):
-    query = select(IngestionRun).order_by(desc(IngestionRun.started_at))
+    # checkpoint_json can hold a whole batch plan; the listing never needs it
+    query = select(IngestionRun).options(defer(IngestionRun.checkpoint_json))
     if dag_id:
         query = query.where(IngestionRun.dag_id == dag_id)
     if status:
         query = query.where(IngestionRun.status == status)
-    query = query.limit(limit)
 
-    result = await db.execute(query)
-    runs = result.scalars().all()
-    return [
-        {
-            "id": str(r.id),
-            "dag_id": r.dag_id,
-            "run_date": r.run_date.isoformat() if r.run_date else None,
-            "status": r.status,
-            "records_fetched": r.records_fetched,
-            "records_inserted": r.records_inserted,
-            "error_count": r.error_count,
-            "started_at": r.started_at.isoformat() if r.started_at else None,
-            "completed_at": r.completed_at.isoformat() if r.completed_at else None,
-        }
-        for r in runs
-    ]
+    # ?cursor= (empty for the first page) switches to {"data", "pagination"} keyset pages
+    if cursor is not None:
+        return await _cursor_page(db, query, "ingestion_runs", {"dag_id": dag_id, "status": status},
+                                  cursor, limit, IngestionRun, IngestionRun.started_at, _run_dict)
+
+    result = await db.execute(query.order_by(desc(IngestionRun.started_at)).limit(limit))
+    return [_run_dict(r) for r in result.scalars().all()]
 
 
 @router.get("/dq-metrics")
@@ -69,24 +118,17 @@ async def list_dq_metrics(
 async def list_error_logs(
     source: str = None,
     limit: int = Query(100, le=500),
+    cursor: str = None,
     user: User = Depends(require_role("admin")),
     db: AsyncSession = Depends(get_db),
 ):
-    query = select(ErrorLog).order_by(desc(ErrorLog.created_at))
+    query = select(ErrorLog)
     if source:
         query = query.where(ErrorLog.source == source)
-    query = query.limit(limit)
 
-    result = await db.execute(query)
-    logs = result.scalars().all()
-    return [
-        {
-            "id": l.id,
-            "source": l.source,
-            "error_type": l.error_type,
-            "message": l.message,
-            "context": l.context_json,
-            "created_at": l.created_at.isoformat() if l.created_at else None,
-        }
-        for l in logs
-    ]
+    if cursor is not None:
+        return await _cursor_page(db, query, "error_logs", {"source": source},
+                                  cursor, limit, ErrorLog, ErrorLog.created_at, _error_log_dict)
+
+    result = await db.execute(query.order_by(desc(ErrorLog.created_at)).limit(limit))
+    return [_error_log_dict(l) for l in result.scalars().all()]
@@ -3,7 +3,7 @@ from sqlalchemy import select, func, desc, case, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.models import Topic, Score, SourceTimeseries, Forecast, AmazonCompetitionSnapshot, User
+from app.models import Topic, TopicLatest, Score, SourceTimeseries, Forecast, AmazonCompetitionSnapshot, User
 from app.dependencies import get_current_user
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
@@ -33,42 +33,30 @@ async def get_dashboard(
 
     # 3. Top 5 movers (highest opportunity score)
     top_movers_q = await db.execute(
-        select(Topic.id, Topic.name, Topic.slug, Topic.stage, Topic.primary_category, Score.score_value)
-        .join(Score, and_(Score.topic_id == Topic.id, Score.score_type == "opportunity"))
-        .where(Topic.is_active == True)
-        .order_by(desc(Score.score_value))
+        select(Topic.id, Topic.name, Topic.slug, Topic.stage, Topic.primary_category,
+               TopicLatest.opportunity_score)
+        .join(TopicLatest, TopicLatest.topic_id == Topic.id)
+        .where(and_(Topic.is_active == True, TopicLatest.opportunity_score.isnot(None)))
+        .order_by(desc(TopicLatest.opportunity_score))
         .limit(5)
     )
     top_movers = [
         {
             "id": str(row.id), "name": row.name, "slug": row.slug,
             "stage": row.stage, "category": row.primary_category,
-            "score": float(row.score_value) if row.score_value else 0,
+            "score": float(row.opportunity_score) if row.opportunity_score else 0,
         }
         for row in top_movers_q.all()
     ]
 
     # 4. Low competition opportunities (high opp score + low comp score)
-    opp_sub = (
-        select(Score.topic_id, Score.score_value.label("opp"))
-        .where(Score.score_type == "opportunity")
-        .distinct(Score.topic_id)
-        .order_by(Score.topic_id, desc(Score.computed_at))
-        .subquery()
-    )
-    comp_sub = (
-        select(Score.topic_id, Score.score_value.label("comp"))
-        .where(Score.score_type == "competition")
-        .distinct(Score.topic_id)
-        .order_by(Score.topic_id, desc(Score.computed_at))
-        .subquery()
-    )
     low_comp_q = await db.execute(
-        select(Topic.id, Topic.name, Topic.stage, opp_sub.c.opp, comp_sub.c.comp)
-        .join(opp_sub, Topic.id == opp_sub.c.topic_id)
-        .join(comp_sub, Topic.id == comp_sub.c.topic_id)
-        .where(and_(Topic.is_active == True, comp_sub.c.comp < 50))
-        .order_by(desc(opp_sub.c.opp))
+        select(Topic.id, Topic.name, Topic.stage,
+               TopicLatest.opportunity_score.label("opp"), TopicLatest.competition_score.label("comp"))
+        .join(TopicLatest, TopicLatest.topic_id == Topic.id)
+        .where(and_(Topic.is_active == True, TopicLatest.competition_score < 50,
+                    TopicLatest.opportunity_score.isnot(None)))
+        .order_by(desc(TopicLatest.opportunity_score))
         .limit(5)
     )
     low_comp = [
@@ -80,7 +68,9 @@ async def get_dashboard(
     # 5. Summary stats
     total_topics = sum(stages.values())
     avg_score_q = await db.execute(
-        select(func.avg(Score.score_value)).where(Score.score_type == "opportunity")
+        select(func.avg(TopicLatest.opportunity_score))
+        .join(Topic, TopicLatest.topic_id == Topic.id)
+        .where(Topic.is_active == True)
     )
     avg_score = float(avg_score_q.scalar() or 0)
 
@@ -8,7 +8,7 @@ from sqlalchemy import select, desc, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.models import User, Topic, Score
+from app.models import User, Topic, TopicLatest
 from app.dependencies import require_pro
 
 router = APIRouter(prefix="/exports", tags=["exports"])
@@ -22,7 +22,11 @@ async def export_topics_csv(
     user: User = Depends(require_pro()),
     db: AsyncSession = Depends(get_db),
 ):
-    query = select(Topic).where(Topic.is_active == True)
+    query = (
+        select(Topic, TopicLatest)
+        .outerjoin(TopicLatest, TopicLatest.topic_id == Topic.id)
+        .where(Topic.is_active == True)
+    )
 
     if category:
         query = query.where(Topic.primary_category == category)
@@ -31,7 +35,7 @@ async def export_topics_csv(
 
     query = query.order_by(Topic.name)
     result = await db.execute(query)
-    topics = result.scalars().all()
+    rows = result.all()
 
     # Build CSV in memory
     output = io.StringIO()
@@ -42,17 +46,11 @@ async def export_topics_csv(
         "Demand Score", "Review Gap Score",
     ])
 
-    for topic in topics:
+    for topic, latest in rows:
         scores = {}
         for score_type in ["opportunity", "competition", "demand", "review_gap"]:
-            score_result = await db.execute(
-                select(Score)
-                .where(and_(Score.topic_id == topic.id, Score.score_type == score_type))
-                .order_by(desc(Score.computed_at))
-                .limit(1)
-            )
-            s = score_result.scalar_one_or_none()
-            scores[score_type] = float(s.score_value) if s else ""
+            value = getattr(latest, f"{score_type}_score", None) if latest else None
+            scores[score_type] = float(value) if value is not None else ""
 
         if min_score and scores.get("opportunity") and scores["opportunity"] < min_score:
             continue
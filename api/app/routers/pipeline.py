@@ -55,12 +55,13 @@ async def run_full_pipeline(
     from app.tasks.features import generate_features
     from app.tasks.scoring_task import compute_all_scores
 
-    # Chain tasks to run in sequence
+    # Chain tasks to run in sequence. Immutable signatures: each task takes its
+    # own options, not the previous task's result dict.
     pipeline = chain(
-        ingest_google_trends.s(),
-        ingest_reddit_mentions.s(),
-        generate_features.s(),
-        compute_all_scores.s(),
+        ingest_google_trends.si(),
+        ingest_reddit_mentions.si(),
+        generate_features.si(),
+        compute_all_scores.si(),
     )
     result = pipeline.apply_async()
 
@@ -3,12 +3,12 @@ from typing import Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, func, desc, asc, and_, or_
+from sqlalchemy import select, func, desc, asc, and_, or_, Float
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models import (
-    Topic, Score, SourceTimeseries, Forecast, AmazonCompetitionSnapshot,
+    Topic, TopicLatest, Keyword, Score, SourceTimeseries, Forecast, AmazonCompetitionSnapshot,
     TopicTopAsin, Asin, ReviewAspect, Review, GenNextSpec, User,
 )
 from app.schemas import (
@@ -18,12 +18,40 @@ from app.schemas import (
     CompetitionResponse, AsinSummary,
     ReviewsSummaryResponse, AspectSummary, PainPoint, MissingFeature,
     GenNextSpecResponse, MustFix, MustAdd, Differentiator, Positioning,
-    ForecastDirection,
+    ForecastDirection, SimilarTopic, SimilarTopicsResponse,
+    TopicSuggestion, TopicAutocompleteResponse,
 )
-from app.dependencies import get_current_user, require_pro, get_redis, cache_key, get_cached, set_cached
+from app.dependencies import (
+    get_current_user, require_pro, get_redis, versioned_cache_key, cache_ttl, get_cached, set_cached,
+)
+from app.pagination import cached_count, decode_cursor, fetch_keyset, keyset_order, page_cursor
 
 router = APIRouter(prefix="/topics", tags=["topics"])
 
+FREE_PLAN_PAGE_LIMIT = 25
+
+# cache namespaces (app.services.cache_versions) each response is built from
+LIST_CACHE_NAMESPACES = ("topics", "scores")
+DETAIL_CACHE_NAMESPACES = ("topics", "scores")
+TIMESERIES_CACHE_NAMESPACES = ("timeseries",)
+FORECAST_CACHE_NAMESPACES = ("forecasts",)
+COMPETITION_CACHE_NAMESPACES = ("competition", "scores")
+LIKE_ESCAPE = "/"
+
+
+def _escape_like(term: str) -> str:
+    return (term.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2)
+            .replace("%", LIKE_ESCAPE + "%").replace("_", LIKE_ESCAPE + "_"))
+
+
+def _sort_value(row, sort_field: str):
+    topic, latest = row[0], row[1]
+    if sort_field == "opportunity_score":
+        return latest.opportunity_score if latest else None
+    if sort_field == "relevance" and "relevance" in row._fields:
+        return row.relevance
+    return getattr(topic, sort_field if hasattr(Topic, sort_field) else "name")
+
 
 # ─── GET /topics ───
 @router.get("", response_model=PaginatedResponse)
@@ -34,109 +62,114 @@ async def list_topics(
     min_score: Optional[float] = None,
     max_score: Optional[float] = None,
     search: Optional[str] = None,
-    sort: str = "-opportunity_score",
+    search_keywords: bool = False,
+    sort: Optional[str] = None,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
+    search = search.strip() if search else None
+    # searches rank by name similarity unless a sort is asked for
+    sort = sort or ("-relevance" if search else "-opportunity_score")
+
+    # cursor mode is opt-in: pass ?cursor= (empty) for the first page, then
+    # each response's pagination.next_cursor; page is ignored
+    use_cursor = cursor is not None
+
     # Check cache
     redis = await get_redis()
-    ck = cache_key("topics_list", category=category, stage=stage, geo=geo,
-                   min_score=min_score, max_score=max_score, search=search,
-                   sort=sort, page=page, page_size=page_size)
+    ck = await versioned_cache_key(
+        redis, "topics_list", LIST_CACHE_NAMESPACES, category=category, stage=stage, geo=geo,
+        min_score=min_score, max_score=max_score, search=search, search_keywords=search_keywords,
+        sort=sort, page=page, page_size=page_size, cursor=cursor,
+    )
     cached = await get_cached(ck, redis)
     if cached:
         return json.loads(cached)
 
-    # Build query
-    query = select(Topic).where(Topic.is_active == True)
+    # Build query; scores, sparkline and sources come from the topic_latest read model
+    query = (
+        select(Topic, TopicLatest)
+        .outerjoin(TopicLatest, TopicLatest.topic_id == Topic.id)
+        .where(Topic.is_active == True)
+    )
 
     if category:
         query = query.where(Topic.primary_category == category)
     if stage:
         query = query.where(Topic.stage == stage)
+    relevance = None
     if search:
-        query = query.where(Topic.name.ilike(f"%{search}%"))
-
-    # Count total
-    count_q = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_q)
-    total = total_result.scalar()
+        # substring or trigram-similar names, both served by idx_topics_name_trgm
+        pattern = f"%{_escape_like(search)}%"
+        matches = or_(Topic.name.ilike(pattern, escape=LIKE_ESCAPE), Topic.name.op("%")(search))
+        if search_keywords:
+            matches = or_(matches, Topic.id.in_(
+                select(Keyword.topic_id).where(Keyword.keyword.ilike(pattern, escape=LIKE_ESCAPE))
+            ))
+        query = query.where(matches)
+        relevance = func.similarity(Topic.name, search, type_=Float)
+
+    # Count total; cursor mode reuses a cached count instead of counting every page
+    if use_cursor:
+        total = await cached_count(db, redis, await versioned_cache_key(
+            redis, "topics_count", ("topics",), category=category, stage=stage, search=search,
+            search_keywords=search_keywords,
+        ), query)
+    else:
+        count_q = select(func.count()).select_from(query.subquery())
+        total_result = await db.execute(count_q)
+        total = total_result.scalar()
 
     # Sorting
     sort_field = sort.lstrip("-")
     sort_desc = sort.startswith("-")
 
     if sort_field == "opportunity_score":
-        # Join with scores to sort
-        score_subq = (
-            select(Score.topic_id, Score.score_value)
-            .where(Score.score_type == "opportunity")
-            .distinct(Score.topic_id)
-            .order_by(Score.topic_id, desc(Score.computed_at))
-            .subquery()
-        )
-        query = query.outerjoin(score_subq, Topic.id == score_subq.c.topic_id)
-
+        sort_col = TopicLatest.opportunity_score
         if min_score is not None:
-            query = query.where(score_subq.c.score_value >= min_score)
+            query = query.where(sort_col >= min_score)
         if max_score is not None:
-            query = query.where(score_subq.c.score_value <= max_score)
-
-        if sort_desc:
-            query = query.order_by(desc(score_subq.c.score_value).nulls_last())
-        else:
-            query = query.order_by(asc(score_subq.c.score_value).nulls_last())
+            query = query.where(sort_col <= max_score)
+    elif sort_field == "relevance" and relevance is not None:
+        sort_col = relevance
+        query = query.add_columns(relevance.label("relevance"))
     else:
-        col = getattr(Topic, sort_field, Topic.name)
-        query = query.order_by(desc(col) if sort_desc else asc(col))
+        sort_col = getattr(Topic, sort_field, Topic.name)
 
-    # Pagination
-    offset = (page - 1) * page_size
-    query = query.offset(offset).limit(page_size)
+    # Free tier limit
+    from app.models import Org
+    free_plan = False
+    if user.org_id:
+        org_result = await db.execute(select(Org).where(Org.id == user.org_id))
+        org = org_result.scalar_one_or_none()
+        free_plan = bool(org and org.plan == "free")
 
-    result = await db.execute(query)
-    topics = result.scalars().all()
+    # Pagination
+    next_cursor = None
+    if use_cursor:
+        limit = min(page_size, FREE_PLAN_PAGE_LIMIT) if free_plan else page_size
+        after = decode_cursor(cursor, sort, sort_col, Topic.id) if cursor else None
+        rows, next_cursor = page_cursor(
+            await fetch_keyset(db, query, sort_col, Topic.id, sort_desc, after, limit + 1),
+            limit, sort,
+            value_of=lambda row: _sort_value(row, sort_field),
+            id_of=lambda row: row[0].id,
+        )
+    else:
+        # Topic.id breaks ties so offset pages are stable too
+        offset = (page - 1) * page_size
+        query = query.order_by(*keyset_order(sort_col, Topic.id, sort_desc))
+        result = await db.execute(query.offset(offset).limit(page_size))
+        rows = result.all()
 
     # Build response items with scores
     items = []
-    for topic in topics:
-        # Get latest opportunity score
-        score_result = await db.execute(
-            select(Score)
-            .where(and_(Score.topic_id == topic.id, Score.score_type == "opportunity"))
-            .order_by(desc(Score.computed_at))
-            .limit(1)
-        )
-        score = score_result.scalar_one_or_none()
-
-        # Get latest competition score
-        comp_result = await db.execute(
-            select(Score)
-            .where(and_(Score.topic_id == topic.id, Score.score_type == "competition"))
-            .order_by(desc(Score.computed_at))
-            .limit(1)
-        )
-        comp_score = comp_result.scalar_one_or_none()
-
-        # Get sparkline (last 12 months normalized values)
-        ts_result = await db.execute(
-            select(SourceTimeseries.normalized_value)
-            .where(SourceTimeseries.topic_id == topic.id)
-            .order_by(desc(SourceTimeseries.date))
-            .limit(12)
-        )
-        sparkline_raw = [float(r) if r else 0 for r in ts_result.scalars().all()]
-        sparkline = list(reversed(sparkline_raw))
-
-        # Get active sources
-        src_result = await db.execute(
-            select(SourceTimeseries.source)
-            .where(SourceTimeseries.topic_id == topic.id)
-            .distinct()
-        )
-        sources = [r for r in src_result.scalars().all()]
+    for topic, latest, *_ in rows:
+        sparkline = list(latest.sparkline or []) if latest else []
+        sources = list(latest.sources or []) if latest else []
 
         items.append(TopicListItem(
             id=topic.id,
@@ -144,34 +177,63 @@ async def list_topics(
             slug=topic.slug,
             stage=topic.stage,
             primary_category=topic.primary_category,
-            opportunity_score=float(score.score_value) if score else None,
-            competition_index=float(comp_score.score_value) if comp_score else None,
+            opportunity_score=float(latest.opportunity_score)
+            if latest and latest.opportunity_score is not None else None,
+            competition_index=float(latest.competition_score)
+            if latest and latest.competition_score is not None else None,
             forecast_direction=getattr(topic, "forecast_direction", None),
             sparkline=sparkline if sparkline else None,
             sources_active=sources if sources else None,
         ))
 
-    # Free tier limit
-    from app.models import Org
-    if user.org_id:
-        org_result = await db.execute(select(Org).where(Org.id == user.org_id))
-        org = org_result.scalar_one_or_none()
-        if org and org.plan == "free":
-            items = items[:25]
+    if free_plan:
+        items = items[:FREE_PLAN_PAGE_LIMIT]
 
     total_pages = (total + page_size - 1) // page_size
     response = PaginatedResponse(
         data=items,
         pagination=PaginationMeta(
-            page=page, page_size=page_size, total=total, total_pages=total_pages
+            page=None if use_cursor else page, page_size=page_size,
+            total=total, total_pages=total_pages, next_cursor=next_cursor,
         ),
     )
 
-    # Cache for 5 minutes
-    await set_cached(ck, json.dumps(response.model_dump(), default=str), 300, redis)
+    await set_cached(ck, json.dumps(response.model_dump(), default=str), cache_ttl(), redis)
     return response
 
 
+# ─── GET /topics/autocomplete ───
+@router.get("/autocomplete", response_model=TopicAutocompleteResponse)
+async def autocomplete_topics(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=20),
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Active topics whose name starts with ``q`` (case-insensitive), in name
+    order. Served by a range scan of idx_topics_name_prefix, whose C-collated
+    lower(name) order is also the result order, so only ``limit`` index
+    entries are read.
+    """
+    prefix = q.strip().lower()
+    if not prefix:
+        return TopicAutocompleteResponse(query=q, data=[])
+
+    name_key = func.lower(Topic.name).collate("C")
+    result = await db.execute(
+        select(Topic.id, Topic.name, Topic.slug)
+        .where(Topic.is_active == True,
+               name_key.like(f"{_escape_like(prefix)}%", escape=LIKE_ESCAPE))
+        .order_by(name_key)
+        .limit(limit)
+    )
+    return TopicAutocompleteResponse(
+        query=q,
+        data=[TopicSuggestion(id=r.id, name=r.name, slug=r.slug) for r in result.all()],
+    )
+
+
 # ─── GET /topics/{id} ───
 @router.get("/{topic_id}", response_model=TopicDetail)
 async def get_topic(
@@ -179,6 +241,12 @@ async def get_topic(
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
+    redis = await get_redis()
+    ck = await versioned_cache_key(redis, "topic_detail", DETAIL_CACHE_NAMESPACES, topic_id=topic_id)
+    cached = await get_cached(ck, redis)
+    if cached:
+        return json.loads(cached)
+
     result = await db.execute(select(Topic).where(Topic.id == topic_id))
     topic = result.scalar_one_or_none()
     if not topic:
@@ -202,7 +270,7 @@ async def get_topic(
             }
             seen_types.add(s.score_type)
 
-    return TopicDetail(
+    response = TopicDetail(
         id=topic.id,
         name=topic.name,
         slug=topic.slug,
@@ -214,6 +282,47 @@ async def get_topic(
         created_at=topic.created_at,
         updated_at=topic.updated_at,
     )
+    await set_cached(ck, json.dumps(response.model_dump(), default=str), cache_ttl(), redis)
+    return response
+
+
+# ─── GET /topics/{id}/similar ───
+@router.get("/{topic_id}/similar", response_model=SimilarTopicsResponse)
+async def get_similar_topics(
+    topic_id: UUID,
+    limit: int = Query(10, ge=1, le=40),
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Nearest active topics by cosine distance over the HNSW embedding index."""
+    result = await db.execute(select(Topic.embedding).where(Topic.id == topic_id))
+    row = result.one_or_none()
+    if not row:
+        raise HTTPException(status_code=404, detail="Topic not found")
+    if row.embedding is None:
+        raise HTTPException(status_code=404, detail="Topic has no embedding yet")
+
+    # Bind the vector as a constant so the planner can order by the index
+    distance = Topic.embedding.cosine_distance(row.embedding).label("distance")
+    result = await db.execute(
+        select(Topic.id, Topic.name, Topic.slug, Topic.stage, Topic.primary_category, distance)
+        .where(and_(Topic.id != topic_id, Topic.is_active == True, Topic.embedding.isnot(None)))
+        .order_by(distance)
+        .limit(limit)
+    )
+
+    data = [
+        SimilarTopic(
+            id=r.id,
+            name=r.name,
+            slug=r.slug,
+            stage=r.stage,
+            primary_category=r.primary_category,
+            similarity=round(1 - float(r.distance), 4),
+        )
+        for r in result.all()
+    ]
+    return SimilarTopicsResponse(topic_id=topic_id, data=data)
 
 
 # ─── GET /topics/{id}/timeseries ───
@@ -225,6 +334,13 @@ async def get_timeseries(
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
+    redis = await get_redis()
+    ck = await versioned_cache_key(redis, "topic_timeseries", TIMESERIES_CACHE_NAMESPACES,
+                                   topic_id=topic_id, geo=geo, source=source)
+    cached = await get_cached(ck, redis)
+    if cached:
+        return json.loads(cached)
+
     query = (
         select(SourceTimeseries)
         .where(and_(SourceTimeseries.topic_id == topic_id, SourceTimeseries.geo == geo))
@@ -242,11 +358,14 @@ async def get_timeseries(
             source=r.source,
             raw_value=float(r.raw_value) if r.raw_value else None,
             normalized_value=float(r.normalized_value) if r.normalized_value else None,
+            scaled_value=float(r.scaled_value) if r.scaled_value is not None else None,
         )
         for r in rows
     ]
 
-    return TimeseriesResponse(topic_id=topic_id, geo=geo, data=data)
+    response = TimeseriesResponse(topic_id=topic_id, geo=geo, data=data)
+    await set_cached(ck, json.dumps(response.model_dump(), default=str), cache_ttl(), redis)
+    return response
 
 
 # ─── GET /topics/{id}/forecast ───
@@ -256,19 +375,33 @@ async def get_forecast(
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    # Get latest forecasts
-    result = await db.execute(
-        select(Forecast)
+    redis = await get_redis()
+    ck = await versioned_cache_key(redis, "topic_forecast", FORECAST_CACHE_NAMESPACES, topic_id=topic_id)
+    cached = await get_cached(ck, redis)
+    if cached:
+        return json.loads(cached)
+
+    # Latest forecast set: the rows of the newest (model_version, generated_at)
+    latest = (await db.execute(
+        select(Forecast.model_version, Forecast.generated_at)
         .where(Forecast.topic_id == topic_id)
         .order_by(desc(Forecast.generated_at))
-        .limit(20)  # max 6 months * 2 horizons + buffer
-    )
-    rows = result.scalars().all()
-    if not rows:
+        .limit(1)
+    )).first()
+    if latest is None:
         raise HTTPException(status_code=404, detail="No forecasts available for this topic")
 
-    latest_version = rows[0].model_version
-    latest_time = rows[0].generated_at
+    latest_version, latest_time = latest
+    result = await db.execute(
+        select(Forecast)
+        .where(
+            Forecast.topic_id == topic_id,
+            Forecast.model_version == latest_version,
+            Forecast.generated_at == latest_time,
+        )
+        .order_by(Forecast.horizon_months, Forecast.forecast_date)
+    )
+    rows = result.scalars().all()
     forecasts = [
         ForecastPoint(
             forecast_date=r.forecast_date,
@@ -277,15 +410,17 @@ async def get_forecast(
             yhat_lower=float(r.yhat_lower),
             yhat_upper=float(r.yhat_upper),
         )
-        for r in rows if r.model_version == latest_version
+        for r in rows
     ]
 
-    return ForecastResponse(
+    response = ForecastResponse(
         topic_id=topic_id,
         model_version=latest_version,
         generated_at=latest_time,
         forecasts=forecasts,
     )
+    await set_cached(ck, json.dumps(response.model_dump(), default=str), cache_ttl(), redis)
+    return response
 
 
 # ─── GET /topics/{id}/competition ───
@@ -295,6 +430,13 @@ async def get_competition(
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
+    redis = await get_redis()
+    ck = await versioned_cache_key(redis, "topic_competition", COMPETITION_CACHE_NAMESPACES,
+                                   topic_id=topic_id)
+    cached = await get_cached(ck, redis)
+    if cached:
+        return json.loads(cached)
+
     # Latest snapshot
     snap_result = await db.execute(
         select(AmazonCompetitionSnapshot)
@@ -336,7 +478,7 @@ async def get_competition(
         for link, asin in asins_result.all()
     ]
 
-    return CompetitionResponse(
+    response = CompetitionResponse(
         topic_id=topic_id,
         date=snap.date,
         marketplace=snap.marketplace,
@@ -353,6 +495,8 @@ async def get_competition(
         price_range=snap.price_range_json,
         top_asins=top_asins,
     )
+    await set_cached(ck, json.dumps(response.model_dump(), default=str), cache_ttl(), redis)
+    return response
 
 
 # ─── GET /topics/{id}/reviews/summary ───
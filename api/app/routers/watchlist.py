@@ -4,7 +4,7 @@ from sqlalchemy import select, func, desc, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.models import User, Watchlist, Topic, Score, Org
+from app.models import User, Watchlist, Topic, TopicLatest, Org
 from app.schemas import WatchlistAddRequest, WatchlistItem
 from app.dependencies import get_current_user
 
@@ -55,30 +55,22 @@ async def get_watchlist(
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
-        select(Watchlist, Topic)
+        select(Watchlist, Topic, TopicLatest.opportunity_score)
         .join(Topic, Watchlist.topic_id == Topic.id)
+        .outerjoin(TopicLatest, TopicLatest.topic_id == Topic.id)
         .where(Watchlist.user_id == user.id)
         .order_by(desc(Watchlist.added_at))
     )
     rows = result.all()
 
     items = []
-    for wl, topic in rows:
-        # Get opportunity score
-        score_result = await db.execute(
-            select(Score)
-            .where(and_(Score.topic_id == topic.id, Score.score_type == "opportunity"))
-            .order_by(desc(Score.computed_at))
-            .limit(1)
-        )
-        score = score_result.scalar_one_or_none()
-
+    for wl, topic, score in rows:
         items.append(WatchlistItem(
             id=wl.id,
             topic_id=topic.id,
             topic_name=topic.name,
             topic_stage=topic.stage,
-            opportunity_score=float(score.score_value) if score else None,
+            opportunity_score=float(score) if score is not None else None,
             added_at=wl.added_at,
         ))
 
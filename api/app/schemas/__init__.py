@@ -107,6 +107,31 @@ class TopicDetail(BaseModel):
     updated_at: Optional[datetime] = None
 
 
+class SimilarTopic(BaseModel):
+    id: UUID
+    name: str
+    slug: str
+    stage: TrendStage
+    primary_category: Optional[str] = None
+    similarity: float
+
+
+class SimilarTopicsResponse(BaseModel):
+    topic_id: UUID
+    data: List[SimilarTopic]
+
+
+class TopicSuggestion(BaseModel):
+    id: UUID
+    name: str
+    slug: str
+
+
+class TopicAutocompleteResponse(BaseModel):
+    query: str
+    data: List[TopicSuggestion]
+
+
 class TopicFilters(BaseModel):
     category: Optional[str] = None
     stage: Optional[TrendStage] = None
@@ -126,6 +151,7 @@ class TimeseriesPoint(BaseModel):
     source: str
     raw_value: Optional[float] = None
     normalized_value: Optional[float] = None
+    scaled_value: Optional[float] = None  # Google Trends on the fixed cross-topic scale
 
 
 class TimeseriesResponse(BaseModel):
@@ -303,10 +329,11 @@ class ScoreResponse(BaseModel):
 
 # ─── Pagination ───
 class PaginationMeta(BaseModel):
-    page: int
+    page: Optional[int] = None  # None in cursor mode
     page_size: int
     total: int
     total_pages: int
+    next_cursor: Optional[str] = None  # cursor mode only; None on the last page
 
 
 class PaginatedResponse(BaseModel):
@@ -0,0 +1,58 @@
+"""
+Versioned namespaces for the API response cache.
+
+Every namespace has a generation counter in Redis. API cache keys embed the
+current generation of each namespace a response is built from, and pipeline
+tasks bump the namespaces they write once their data is committed. The next
+request then misses and rebuilds under the new key while the old entries age
+out, so staleness no longer depends on expiry and entries can live for hours.
+
+Namespaces and their writers:
+- topics: topic rows (discovery; scoring updates stage)
+- scores: scores and topic_latest (scoring; scoring_daily DAG)
+- timeseries: source_timeseries (Google Trends and Reddit ingestion;
+  keywordtool_ingest_daily DAG)
+- forecasts: forecasts (forecasting, per completed range; forecasting_weekly DAG)
+- competition: Amazon competition snapshots
+
+The key scheme lives in neuranest_shared.cache_keys, which the Airflow DAGs
+use to bump the same keys through their Redis connection (neuranest_redis).
+"""
+from typing import Optional
+
+import structlog
+from neuranest_shared.cache_keys import NAMESPACES, generation_key  # noqa: F401
+from neuranest_shared import cache_keys
+
+from app.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+_redis = None
+
+
+def _client():
+    global _redis
+    if _redis is None:
+        import redis
+        _redis = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _redis
+
+
+def bump_generations(*namespaces: str, redis_client=None) -> Optional[list]:
+    """
+    Increment the generation of each namespace, invalidating every cached
+    response built from it. Call after the writes are committed. A Redis
+    failure is logged and never fails the task; cached entries then expire
+    by TTL.
+    """
+    for ns in namespaces:
+        generation_key(ns)  # unknown namespaces are a bug, not a Redis failure
+    try:
+        generations = cache_keys.bump_generations(redis_client or _client(), *namespaces)
+    except Exception as e:
+        logger.warning("cache_versions: bump failed", namespaces=list(namespaces), error=str(e))
+        return None
+    logger.info("cache_versions: bumped", **dict(zip(namespaces, generations)))
+    return generations
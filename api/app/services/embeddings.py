@@ -0,0 +1,97 @@
+"""
+Text encoders for topic embeddings (Topic.embedding, Vector(384)).
+
+Encoders share one interface: ``name`` (stored in the embedding fingerprint,
+so switching encoders re-embeds every topic), ``dim`` and
+``encode(texts) -> np.ndarray`` of L2-normalised float32 rows.
+
+- SentenceTransformerEncoder: all-MiniLM-L6-v2 (384 dims) on CPU, batched.
+- HashingEmbedder: deterministic signed feature hashing of word and
+  character-trigram features. No model download, so it suits offline use.
+"""
+import hashlib
+from typing import List, Sequence
+
+import numpy as np
+
+from app.config import get_settings
+
+settings = get_settings()
+
+EMBEDDING_DIM = 384  # must match Topic.embedding
+
+
+def vector_literal(values) -> str:
+    """pgvector text form of a vector, for CAST(:param AS vector)."""
+    return "[" + ",".join(f"{v:.6f}" for v in values) + "]"
+
+
+def embedding_text(name: str, description: str = None) -> str:
+    """The text a topic is embedded from."""
+    return f"{name}. {description}" if description else name
+
+
+class HashingEmbedder:
+    """Signed feature hashing over words and character trigrams, L2-normalised."""
+
+    name = "hashing-v1"
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+
+    def _features(self, text: str) -> List[str]:
+        words = text.lower().split()
+        padded = f" {' '.join(words)} "
+        return [f"w:{w}" for w in words] + [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+
+    def encode(self, texts: Sequence[str], batch_size: int = None) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+                h = int.from_bytes(digest, "little")
+                out[row, h % self.dim] += 1.0 if (h >> 63) else -1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.where(norms == 0, 1.0, norms)
+
+
+class SentenceTransformerEncoder:
+    """sentence-transformers model, loaded on first use."""
+
+    def __init__(self, model_name: str = None, device: str = "cpu"):
+        self.model_name = model_name or settings.EMBEDDING_MODEL
+        self.name = f"st:{self.model_name}"
+        self.device = device
+        self._model = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name, device=self.device)
+        return self._model
+
+    @property
+    def dim(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: Sequence[str], batch_size: int = None) -> np.ndarray:
+        return self.model.encode(
+            list(texts), batch_size=batch_size or settings.EMBEDDING_BATCH_SIZE,
+            normalize_embeddings=True, convert_to_numpy=True, show_progress_bar=False,
+        ).astype(np.float32)
+
+
+ENCODERS = {
+    "sentence-transformers": SentenceTransformerEncoder,
+    "hashing": HashingEmbedder,
+}
+
+
+def get_encoder(name: str = None):
+    """Encoder by name (default: settings.EMBEDDING_ENCODER)."""
+    name = name or settings.EMBEDDING_ENCODER
+    try:
+        return ENCODERS[name]()
+    except KeyError:
+        raise ValueError(f"unknown embedding encoder {name!r}; expected one of {sorted(ENCODERS)}")
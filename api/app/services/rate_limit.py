@@ -0,0 +1,96 @@
+"""Rate limiting primitives for outbound API clients - token bucket and per-host backoff."""
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+
+
+class TokenBucket:
+    """
+    Token bucket allowing ``rate`` requests per second with bursts of up to
+    ``capacity``. Callers reserve a token and sleep until it is due, so waiters
+    are served in arrival order. Usable from threads (``acquire``) and from
+    asyncio (``acquire_async``).
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, requests: float, burst: float = 1.0, **kwargs) -> "TokenBucket":
+        return cls(requests / 60.0, burst, **kwargs)
+
+    def reserve(self) -> float:
+        """Take one token, returning how many seconds to wait before using it."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self) -> None:
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        wait = self.reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+
+def parse_retry_after(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (when - now).total_seconds())
+
+
+class HostBackoff:
+    """Tracks, per host, the earliest time the next request may be sent."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._resume_at: Dict[str, float] = {}
+
+    def delay(self, host: str) -> float:
+        """Seconds until ``host`` may be contacted again (0 if not backing off)."""
+        return max(0.0, self._resume_at.get(host, 0.0) - self._clock())
+
+    def defer(self, host: str, seconds: float) -> None:
+        """Hold off ``host`` for at least ``seconds``; never shortens an existing backoff."""
+        resume_at = self._clock() + seconds
+        if resume_at > self._resume_at.get(host, 0.0):
+            self._resume_at[host] = resume_at
+
+    async def wait_async(self, host: str) -> None:
+        # Re-check after sleeping: another request may have extended the backoff.
+        while (delay := self.delay(host)) > 0:
+            await asyncio.sleep(delay)
+
+    def wait(self, host: str) -> None:
+        while (delay := self.delay(host)) > 0:
+            time.sleep(delay)
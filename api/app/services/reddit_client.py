@@ -0,0 +1,219 @@
+"""
+Async Reddit search client for mention counting.
+
+One shared httpx.AsyncClient (connection pool) serves a fixed number of
+worker coroutines pulling keywords from a queue. Every request takes a token
+from a TokenBucket sized to Reddit's published limits (100 QPM per OAuth
+client, 10 QPM unauthenticated), and 429 responses defer the whole host for
+the Retry-After interval rather than a fixed sleep. ``base_url`` may point
+at a local stub server.
+
+Searches are restricted to ``subreddits`` when given (the seed list the
+PRAW path has always used), sorted by relevance over the last day with
+Reddit's 100-post page size. The OAuth token is refreshed before it expires
+and whenever a request comes back 401.
+"""
+import asyncio
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+import structlog
+
+from app.services.rate_limit import HostBackoff, TokenBucket, parse_retry_after
+
+logger = structlog.get_logger()
+
+PUBLIC_BASE_URL = "https://www.reddit.com"
+OAUTH_BASE_URL = "https://oauth.reddit.com"
+PUBLIC_REQUESTS_PER_MINUTE = 10
+OAUTH_REQUESTS_PER_MINUTE = 100
+SEARCH_LIMIT = 100  # Reddit's maximum page size, as used by the PRAW path
+RETRY_BASE_DELAY = 2.0  # seconds; doubled per attempt when no Retry-After is given
+TOKEN_REFRESH_MARGIN = 60.0  # seconds before expires_in at which the token is renewed
+DEFAULT_TOKEN_TTL = 3600.0  # seconds, when the token response has no expires_in
+
+
+def summarize_posts(children: list) -> dict:
+    """Mention stats for a Reddit search listing's ``data.children``."""
+    mention_count = 0
+    total_score = 0
+    comment_count = 0
+    sub_counts = {}
+    for post_wrap in children:
+        post = post_wrap.get("data", {})
+        mention_count += 1
+        total_score += post.get("score", 0)
+        comment_count += post.get("num_comments", 0)
+        sub_name = post.get("subreddit", "")
+        sub_counts[sub_name] = sub_counts.get(sub_name, 0) + 1
+    return {
+        "mention_count": mention_count,
+        "avg_score": round(total_score / max(mention_count, 1), 1),
+        "comment_count": comment_count,
+        "top_subreddit": max(sub_counts, key=sub_counts.get) if sub_counts else None,
+    }
+
+
+class RedditSearchClient:
+    """Concurrent, rate-limited keyword search against Reddit's JSON API."""
+
+    def __init__(self, user_agent: str, base_url: Optional[str] = None,
+                 client_id: Optional[str] = None, client_secret: Optional[str] = None,
+                 subreddits: Optional[List[str]] = None, concurrency: int = 8, requests_per_minute: Optional[float] = None,
+                 max_attempts: int = 4, timeout: float = 15.0):
+        self.oauth = bool(client_id and client_secret)
+        self.base_url = (base_url or (OAUTH_BASE_URL if self.oauth else PUBLIC_BASE_URL)).rstrip("/")
+        self.token_url = (base_url or PUBLIC_BASE_URL).rstrip("/") + "/api/v1/access_token"
+        self.user_agent = user_agent
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.subreddits = list(subreddits or [])
+        self.token_expires_at = 0.0
+        self._token_lock: Optional[asyncio.Lock] = None
+        self.concurrency = max(1, concurrency)
+        rpm = requests_per_minute or (OAUTH_REQUESTS_PER_MINUTE if self.oauth else PUBLIC_REQUESTS_PER_MINUTE)
+        self.bucket = TokenBucket.per_minute(rpm)
+        self.backoff = HostBackoff()
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+
+    async def _authenticate(self, client: httpx.AsyncClient) -> None:
+        """Application-only OAuth token (client_credentials grant)."""
+        resp = await client.post(
+            self.token_url, data={"grant_type": "client_credentials"},
+            auth=(self.client_id, self.client_secret),
+        )
+        resp.raise_for_status()
+        payload = resp.json()
+        client.headers["Authorization"] = f"Bearer {payload['access_token']}"
+        ttl = float(payload.get("expires_in") or DEFAULT_TOKEN_TTL)
+        self.token_expires_at = time.monotonic() + max(ttl - TOKEN_REFRESH_MARGIN, 0.0)
+        logger.info("reddit_client: token acquired", expires_in=ttl)
+
+    async def _ensure_token(self, client: httpx.AsyncClient, stale: Optional[str] = None) -> None:
+        """
+        Fetch a new token when the current one is about to expire, or when
+        ``stale`` (the Authorization header a request was rejected with) is
+        still the one in use. One worker refreshes; the others wait for it.
+        """
+        if not self.oauth:
+            return
+        if self._token_lock is None:
+            self._token_lock = asyncio.Lock()
+        async with self._token_lock:
+            current = client.headers.get("Authorization")
+            if current is None or time.monotonic() >= self.token_expires_at or (
+                    stale is not None and stale == current):
+                await self._authenticate(client)
+
+    def _note_rate_headers(self, host: str, resp: httpx.Response) -> None:
+        """Pause the host until the window resets once Reddit reports no quota left."""
+        remaining = resp.headers.get("x-ratelimit-remaining")
+        reset = resp.headers.get("x-ratelimit-reset")
+        try:
+            if remaining is not None and reset is not None and float(remaining) < 1:
+                self.backoff.defer(host, float(reset))
+        except ValueError:
+            pass
+
+    async def search(self, client: httpx.AsyncClient, keyword: str) -> dict:
+        """Mention stats for one keyword over the last day."""
+        params = {"q": keyword, "sort": "relevance", "t": "day", "limit": SEARCH_LIMIT}
+        if self.subreddits:
+            url = f"{self.base_url}/r/{'+'.join(self.subreddits)}/search.json"
+            params["restrict_sr"] = 1
+        else:
+            url = f"{self.base_url}/search.json"
+        host = urlsplit(url).netloc
+
+        for attempt in range(self.max_attempts):
+            # Take a fresh token if a 429 arrived while waiting for this one,
+            # so requests released by a backoff are still spaced by the bucket.
+            while True:
+                await self.backoff.wait_async(host)
+                await self.bucket.acquire_async()
+                if not self.backoff.delay(host):
+                    break
+            try:
+                await self._ensure_token(client)
+                auth = client.headers.get("Authorization")
+                resp = await client.get(url, params=params)
+            except httpx.TransportError as e:
+                if attempt == self.max_attempts - 1:
+                    raise
+                logger.warning("reddit_client: transport error, retrying",
+                               keyword=keyword, attempt=attempt + 1, error=str(e))
+                await asyncio.sleep(RETRY_BASE_DELAY * 2 ** attempt)
+                continue
+
+            self._note_rate_headers(host, resp)
+
+            if resp.status_code == 401 and self.oauth:
+                logger.warning("reddit_client: token rejected, refreshing",
+                               keyword=keyword, attempt=attempt + 1)
+                await self._ensure_token(client, stale=auth)
+                continue
+            if resp.status_code == 429:
+                delay = parse_retry_after(resp.headers.get("retry-after"))
+                if delay is None:
+                    delay = RETRY_BASE_DELAY * 2 ** attempt
+                self.backoff.defer(host, delay)
+                logger.warning("reddit_client: rate limited, backing off host",
+                               host=host, wait_seconds=delay, attempt=attempt + 1)
+                continue
+            if resp.status_code >= 500:
+                await asyncio.sleep(RETRY_BASE_DELAY * 2 ** attempt)
+                continue
+
+            resp.raise_for_status()
+            return summarize_posts(resp.json().get("data", {}).get("children", []))
+
+        raise RuntimeError(f"reddit search gave up after {self.max_attempts} attempts: {keyword!r}")
+
+    async def iter_mentions(self, keywords: List[dict]
+                            ) -> AsyncIterator[Tuple[dict, Optional[dict], Optional[Exception]]]:
+        """
+        Search every keyword item (dicts with a "keyword" key), yielding
+        ``(item, stats, error)`` in completion order.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in keywords:
+            queue.put_nowait(item)
+        results: asyncio.Queue = asyncio.Queue()
+
+        limits = httpx.Limits(max_connections=self.concurrency,
+                              max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits,
+                                     headers={"User-Agent": self.user_agent}) as client:
+            await self._ensure_token(client)
+
+            async def worker():
+                while True:
+                    try:
+                        item = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    try:
+                        await results.put((item, await self.search(client, item["keyword"]), None))
+                    except Exception as e:
+                        await results.put((item, None, e))
+
+            workers = [asyncio.create_task(worker())
+                       for _ in range(min(self.concurrency, len(keywords)))]
+            try:
+                for _ in range(len(keywords)):
+                    yield await results.get()
+            finally:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+
+    async def fetch_mentions(self, keywords: List[dict]) -> Dict[str, dict]:
+        """Convenience wrapper: {keyword: stats} for every keyword that succeeded."""
+        out = {}
+        async for item, stats, error in self.iter_mentions(keywords):
+            if error is None:
+                out[item["keyword"]] = stats
+        return out
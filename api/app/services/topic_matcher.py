@@ -0,0 +1,155 @@
+"""
+Fuzzy keyword → topic matching for discovery.
+
+TopicMatcher is built once per run over the active topics and answers the
+same question as rapidfuzz ``process.extractOne(keyword, names,
+scorer=fuzz.token_sort_ratio)`` with a score cutoff, without scoring every
+keyword against every topic.
+
+Names are pre-processed the way token_sort_ratio sees them (whitespace
+tokens sorted and re-joined) and indexed by length and by character bigram.
+A score >= threshold bounds the indel distance between the two strings,
+which in turn bounds both the length ratio and the number of bigrams they
+must share, so the shortlist never drops a topic that could reach the
+threshold. Shortlisted names are then scored in batch with
+``process.cdist`` across all cores.
+"""
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+DEFAULT_THRESHOLD = 85
+CDIST_CHUNK = 64  # keywords scored per cdist call
+FALLBACK_SCORE = 0.90  # reported score when rapidfuzz is missing
+
+
+def _sort_tokens(text: str) -> str:
+    return " ".join(sorted(text.split()))
+
+
+def _bigram_tokens(text: str) -> set:
+    """
+    Bigrams tagged with their occurrence number ("er#0", "er#1", ...), so
+    the multiset intersection of two strings' bigrams is the plain set
+    intersection of their tokens.
+    """
+    seen = Counter()
+    tokens = set()
+    for i in range(len(text) - 1):
+        gram = text[i:i + 2]
+        tokens.add(f"{gram}#{seen[gram]}")
+        seen[gram] += 1
+    return tokens
+
+
+class TopicMatcher:
+    """
+    Match keywords to the best topic by token_sort_ratio at or above
+    ``threshold``. ``topics`` are dicts with "id" and "name". Ties go to the
+    earliest topic, as with extractOne. Without rapidfuzz it falls back to
+    case-insensitive equality/substring matching.
+    """
+
+    def __init__(self, topics: List[dict], threshold: float = DEFAULT_THRESHOLD, workers: int = -1):
+        self.ids = [t["id"] for t in topics]
+        self.names = [t["name"] for t in topics]
+        self.threshold = threshold
+        self.workers = workers
+        try:
+            from rapidfuzz import fuzz, process
+            self._fuzz, self._process = fuzz, process
+        except ImportError:
+            self._fuzz = self._process = None
+
+        if self._process is None:
+            self._lower = [n.lower() for n in self.names]
+            self._exact = {}
+            for i, name in enumerate(self._lower):
+                self._exact.setdefault(name, i)
+            return
+
+        postings: Dict[str, List[int]] = defaultdict(list)
+        lengths = []
+        for i, name in enumerate(self.names):
+            processed = _sort_tokens(name)
+            lengths.append(len(processed))
+            for token in _bigram_tokens(processed):
+                postings[token].append(i)
+        self._lengths = np.array(lengths, dtype=np.int64)
+        self._postings = {token: np.array(ids, dtype=np.int64) for token, ids in postings.items()}
+
+    @property
+    def uses_rapidfuzz(self) -> bool:
+        return self._process is not None
+
+    # ─── Blocking ───
+
+    def shortlist(self, keyword: str) -> List[int]:
+        """
+        Indexes of every topic that could score >= threshold against
+        ``keyword``. token_sort_ratio is 100 * (1 - indel / (la + lb)), so the
+        threshold caps the indel distance, which caps the length ratio and,
+        since strings within Levenshtein distance k share at least
+        max(la, lb) - 1 - 2k bigrams, sets a minimum bigram overlap.
+        """
+        if not self.ids:
+            return []
+        query = _sort_tokens(keyword)
+        la = len(query)
+        lb = self._lengths
+
+        shared = np.zeros(len(self.ids), dtype=np.int64)
+        for token in _bigram_tokens(query):
+            ids = self._postings.get(token)
+            if ids is not None:
+                shared[ids] += 1
+
+        max_dist = (100 - self.threshold) * (la + lb) // 100
+        required = np.maximum(la, lb) - 1 - 2 * max_dist
+        length_ok = 200 * np.minimum(la, lb) >= self.threshold * (la + lb)
+        return np.flatnonzero(length_ok & (shared >= required)).tolist()
+
+    # ─── Matching ───
+
+    def _fallback(self, keyword: str) -> Optional[dict]:
+        # First topic in list order that equals, contains or is contained in
+        # the keyword; an exact hit only bounds how far the scan has to go.
+        kw_lower = keyword.lower()
+        exact = self._exact.get(kw_lower, len(self._lower))
+        i = next((j for j, name in enumerate(self._lower[:exact])
+                  if kw_lower in name or name in kw_lower), None)
+        if i is None and exact < len(self._lower):
+            i = exact
+        return None if i is None else {"topic_id": self.ids[i], "score": FALLBACK_SCORE}
+
+    def match(self, keyword: str) -> Optional[dict]:
+        """{'topic_id', 'score' (0-1)} for the best topic at/above threshold, else None."""
+        return self.match_many([keyword])[0]
+
+    def match_many(self, keywords: Iterable[str]) -> List[Optional[dict]]:
+        """``match`` for every keyword, scoring shortlists in batched cdist calls."""
+        keywords = list(keywords)
+        if not self.uses_rapidfuzz:
+            return [self._fallback(k) for k in keywords]
+
+        results: List[Optional[dict]] = [None] * len(keywords)
+        pending = [(pos, self.shortlist(k)) for pos, k in enumerate(keywords)]
+        pending = [(pos, cands) for pos, cands in pending if cands]
+
+        for start in range(0, len(pending), CDIST_CHUNK):
+            chunk = pending[start:start + CDIST_CHUNK]
+            columns = sorted({i for _, cands in chunk for i in cands})
+            col_of = {i: c for c, i in enumerate(columns)}
+            scores = self._process.cdist(
+                [keywords[pos] for pos, _ in chunk], [self.names[i] for i in columns],
+                scorer=self._fuzz.token_sort_ratio, score_cutoff=self.threshold,
+                dtype=np.float64, workers=self.workers,
+            )
+            for row, (pos, cands) in enumerate(chunk):
+                row_scores = scores[row, [col_of[i] for i in cands]]
+                best = int(np.argmax(row_scores))
+                if row_scores[best] >= self.threshold:
+                    results[pos] = {"topic_id": self.ids[cands[best]],
+                                    "score": float(row_scores[best]) / 100}
+        return results
@@ -0,0 +1,150 @@
+"""
+Anchor-scaled batching for Google Trends.
+
+Google Trends scales every request to its own 0-100 range, so values from
+different 5-keyword payloads are not comparable. Every payload therefore
+carries the anchor keyword plus four topic keywords, and each batch is
+rescaled onto one global scale by fitting its anchor column against the
+anchor's stored per-date series (trends_anchor). The very first batch
+defines that series at ANCHOR_LEVEL; later batches only add dates it does
+not have yet, and stored dates are never rescaled.
+
+Every fit goes back to that one fixed series rather than to values an
+earlier fit produced, so fitting errors don't compound from run to run, and
+a date's value doesn't move when the rolling timeframe does. Keywords are
+deduplicated and packed in order of their last known level, so batch-mates
+have similar magnitudes and none of them is flattened to integer noise by a
+much larger neighbour. The anchor slot costs a fifth of each payload; the
+ingestion task reports the planned request count next to
+naive_request_count, so the net of that and deduplication is visible.
+"""
+import math
+import re
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+PAYLOAD_SIZE = 5  # pytrends keyword limit per request
+ANCHOR_LEVEL = 50.0  # mean of the anchor series on the global scale, fixed by the first batch
+MIN_ANCHOR_MEAN = 1.0  # below this a reference is rounding noise and the batch can't be rescaled
+MIN_REFERENCE_POINTS = 28  # overlapping stored anchor points a fit needs
+TIMEFRAME_MONTHS = re.compile(r"^today (\d+)-m$")
+
+
+def plan_batches(keywords: Sequence[str], anchor: str,
+                 levels: Optional[Dict[str, float]] = None,
+                 payload_size: int = PAYLOAD_SIZE) -> List[List[str]]:
+    """
+    Pack unique keywords into ``[anchor] + (payload_size - 1)`` payloads.
+    Keywords with a known level are ordered by it and new ones go last. The
+    anchor itself is never a batch member.
+    """
+    levels = levels or {}
+    unique = list(dict.fromkeys(k for k in keywords if k != anchor))
+    unique.sort(key=lambda k: (k not in levels, levels.get(k, 0.0)))
+    slots = payload_size - 1
+    return [[anchor] + unique[i:i + slots] for i in range(0, len(unique), slots)]
+
+
+def timeframe_dates(timeframe: str, today: date) -> Tuple[date, date]:
+    """Date span of a pytrends timeframe ("today N-m" or "YYYY-MM-DD YYYY-MM-DD")."""
+    match = TIMEFRAME_MONTHS.match(timeframe)
+    if match:
+        return today - timedelta(days=31 * int(match.group(1))), today
+    start, end = timeframe.split()
+    return date.fromisoformat(start), date.fromisoformat(end)
+
+
+def backfill_timeframes(earliest: date, until: date, window_days: int = 90,
+                        overlap_days: int = 30) -> List[str]:
+    """
+    Historical timeframes, newest first, reaching back from ``earliest``
+    (the oldest stored anchor date) to ``until``. Each window overlaps the
+    dates the previous one stored by ``overlap_days``, so the anchor series
+    can be extended backwards one window at a time.
+    """
+    timeframes = []
+    end = earliest + timedelta(days=overlap_days)
+    while end > until:
+        start = end - timedelta(days=window_days)
+        timeframes.append(f"{start.isoformat()} {end.isoformat()}")
+        end = start + timedelta(days=overlap_days)
+    return timeframes
+
+
+def naive_request_count(n_keywords: int, payload_size: int = PAYLOAD_SIZE) -> int:
+    """Requests needed by plain 5-keyword batching (no anchor, no dedup)."""
+    return math.ceil(n_keywords / payload_size)
+
+
+def _row_date(idx) -> date:
+    return idx.date() if hasattr(idx, "date") else idx
+
+
+def fit_scale(df: pd.DataFrame, reference: Dict[str, Dict[date, float]],
+              exclude: Iterable[date] = ()) -> Optional[float]:
+    """
+    Factor mapping one batch's 0-100 scale onto the global scale: stored
+    reference total over batch total, across every (column, date) both have.
+    ``exclude`` drops dates (e.g. the partial last day). None when there are
+    fewer than MIN_REFERENCE_POINTS such points or they are too small.
+    """
+    exclude = set(exclude)
+    num = den = 0.0
+    points = 0
+    for col, ref in reference.items():
+        if col not in df.columns or not ref:
+            continue
+        for idx, value in df[col].items():
+            day = _row_date(idx)
+            if day in exclude or day not in ref or pd.isna(value):
+                continue
+            num += float(ref[day])
+            den += float(value)
+            points += 1
+    if points < MIN_REFERENCE_POINTS or not den >= MIN_ANCHOR_MEAN * points:
+        return None
+    return num / den
+
+
+def bootstrap_scale(df: pd.DataFrame, anchor: str, exclude: Iterable[date] = (),
+                    level: float = ANCHOR_LEVEL) -> Optional[float]:
+    """Factor putting the anchor's mean at ``level``; only for defining the anchor series."""
+    if anchor not in df.columns:
+        return None
+    exclude = set(exclude)
+    values = [float(v) for idx, v in df[anchor].items() if _row_date(idx) not in exclude]
+    anchor_mean = float(np.mean(values)) if values else 0.0
+    if not anchor_mean >= MIN_ANCHOR_MEAN:
+        return None
+    return level / anchor_mean
+
+
+def fit_error(scaled: pd.DataFrame, reference: Dict[str, Dict[date, float]],
+              exclude: Iterable[date] = ()) -> Optional[float]:
+    """
+    How far a rescaled batch misses its reference: mean absolute deviation
+    over the fitted points relative to their mean. A perfect global scale
+    gives 0; integer rounding and Trends sampling noise raise it.
+    """
+    exclude = set(exclude)
+    deviations, refs = [], []
+    for col, ref in reference.items():
+        if col not in scaled.columns:
+            continue
+        for idx, value in scaled[col].items():
+            day = _row_date(idx)
+            if day in exclude or day not in ref or pd.isna(value):
+                continue
+            deviations.append(abs(float(value) - float(ref[day])))
+            refs.append(float(ref[day]))
+    if not refs or not np.mean(refs) > 0:
+        return None
+    return float(np.mean(deviations) / np.mean(refs))
+
+
+def normalization_error(batch_errors: Sequence[float]) -> Optional[float]:
+    """Run-level normalization error: mean of the per-batch fit_error values."""
+    return float(np.mean(batch_errors)) if batch_errors else None
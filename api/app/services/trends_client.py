@@ -0,0 +1,199 @@
+"""
+Google Trends client with a shared response cache.
+
+Raw pytrends responses (interest_over_time, related_queries) are stored in
+Redis under a content-addressed key built from (kind, keyword batch,
+timeframe, geo, UTC day) with a TTL, so retries, re-runs and discovery reuse
+what today's ingestion already fetched instead of spending rate-limit budget.
+"""
+import json
+import hashlib
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+import structlog
+
+from app.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+
+# ─── Serialization ───
+
+def _frame_to_payload(df: Optional[pd.DataFrame]) -> Optional[dict]:
+    if df is None:
+        return None
+    return {
+        "index": [i.isoformat() if hasattr(i, "isoformat") else i for i in df.index],
+        "index_name": df.index.name,
+        "columns": {str(c): df[c].tolist() for c in df.columns},
+    }
+
+
+def _payload_to_frame(payload: Optional[dict]) -> Optional[pd.DataFrame]:
+    if payload is None:
+        return None
+    index = payload["index"]
+    if index and isinstance(index[0], str):
+        index = pd.DatetimeIndex(pd.to_datetime(index), name=payload.get("index_name"))
+    return pd.DataFrame(payload["columns"], index=index)
+
+
+def _related_to_payload(related: dict) -> dict:
+    return {
+        kw: None if queries is None else {
+            qtype: None if qdf is None else qdf.to_dict(orient="records")
+            for qtype, qdf in queries.items()
+        }
+        for kw, queries in related.items()
+    }
+
+
+def _payload_to_related(payload: dict) -> dict:
+    return {
+        kw: None if queries is None else {
+            qtype: None if records is None else pd.DataFrame(records)
+            for qtype, records in queries.items()
+        }
+        for kw, queries in payload.items()
+    }
+
+
+# ─── Cache ───
+
+class TrendsCache:
+    """Redis-backed cache of raw Google Trends responses. Failures never break a fetch."""
+
+    def __init__(self, redis_client=None, ttl_seconds: int = None):
+        self._redis = redis_client
+        self.ttl_seconds = ttl_seconds or settings.GOOGLE_TRENDS_CACHE_TTL
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+        return self._redis
+
+    @staticmethod
+    def key(kind: str, keywords: List[str], timeframe: str, geo: str, day: str = None) -> str:
+        raw = json.dumps({
+            "kind": kind, "keywords": list(keywords), "timeframe": timeframe,
+            "geo": geo, "day": day or datetime.utcnow().date().isoformat(),
+        }, sort_keys=True)
+        return f"neuranest:trends:{kind}:{hashlib.sha256(raw.encode()).hexdigest()}"
+
+    def get(self, key: str) -> Optional[object]:
+        try:
+            raw = self.redis.get(key)
+        except Exception as e:
+            logger.warning("trends_cache: read failed", error=str(e))
+            return None
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key: str, payload: object) -> None:
+        try:
+            self.redis.set(key, json.dumps(payload, default=str), ex=self.ttl_seconds)
+        except Exception as e:
+            logger.warning("trends_cache: write failed", error=str(e))
+
+
+# ─── Client ───
+
+def metered_trendreq(before_request: Optional[Callable[[], None]] = None, **kwargs):
+    """
+    TrendReq that calls ``before_request`` ahead of every HTTP request it
+    sends: the cookie fetch in its constructor (and per request behind a
+    proxy), the build_payload token request, and each widget data request
+    (one per interest_over_time call, one per keyword for related_queries).
+    """
+    from pytrends.request import TrendReq
+
+    class MeteredTrendReq(TrendReq):
+        def GetGoogleCookie(self):
+            if before_request is not None:
+                before_request()
+            return super().GetGoogleCookie()
+
+        def _get_data(self, url, *args, **kw):
+            if before_request is not None:
+                before_request()
+            return super()._get_data(url, *args, **kw)
+
+    return MeteredTrendReq(**kwargs)
+
+
+class CachedTrendsClient:
+    """
+    Drop-in for the pytrends calls the tasks make, reading the cache first.
+    TrendReq is only created on the first cache miss, so a fully warm run
+    never touches Google. ``last_from_cache`` tells callers whether the most
+    recent call was served from cache (and so needs no rate-limit sleep).
+    ``before_request`` runs before every HTTP request the TrendReq sends
+    (see metered_trendreq), e.g. a rate limiter; an injected ``pytrends``
+    is not metered. ``cookies`` are applied to the TrendReq session when it
+    is created.
+    """
+
+    def __init__(self, cache: Optional[TrendsCache] = None, pytrends=None,
+                 before_request: Optional[Callable[[], None]] = None,
+                 cookies: Optional[dict] = None, **trendreq_kwargs):
+        self.cache = cache if cache is not None else (
+            TrendsCache() if settings.GOOGLE_TRENDS_CACHE_ENABLED else None
+        )
+        self._pytrends = pytrends
+        self._before_request = before_request
+        self._cookies = cookies or {}
+        self._trendreq_kwargs = {"hl": "en-US", "tz": 360, **trendreq_kwargs}
+        self._payload = None
+        self.hits = 0
+        self.misses = 0
+        self.last_from_cache = False
+
+    @property
+    def pytrends(self):
+        if self._pytrends is None:
+            self._pytrends = metered_trendreq(self._before_request, **self._trendreq_kwargs)
+            if self._cookies:
+                self._pytrends.cookies.update(self._cookies)
+        return self._pytrends
+
+    def _build_payload(self, keywords: List[str], timeframe: str, geo: str) -> None:
+        payload = (tuple(keywords), timeframe, geo)
+        if payload != self._payload:
+            self.pytrends.build_payload(list(keywords), timeframe=timeframe, geo=geo)
+            self._payload = payload
+
+    def _cached_call(self, kind: str, keywords: List[str], timeframe: str, geo: str,
+                     fetch, encode, decode):
+        key = TrendsCache.key(kind, keywords, timeframe, geo) if self.cache else None
+        if key:
+            payload = self.cache.get(key)
+            if payload is not None:
+                self.hits += 1
+                self.last_from_cache = True
+                return decode(payload)
+
+        self.misses += 1
+        self.last_from_cache = False
+        self._build_payload(keywords, timeframe, geo)
+        result = fetch()
+        if key and result is not None:
+            self.cache.set(key, encode(result))
+        return result
+
+    def interest_over_time(self, keywords: List[str], timeframe: str,
+                           geo: str = "US") -> Optional[pd.DataFrame]:
+        return self._cached_call(
+            "interest_over_time", keywords, timeframe, geo,
+            lambda: self.pytrends.interest_over_time(), _frame_to_payload, _payload_to_frame,
+        )
+
+    def related_queries(self, keywords: List[str], timeframe: str,
+                        geo: str = "US") -> Dict[str, Optional[dict]]:
+        return self._cached_call(
+            "related_queries", keywords, timeframe, geo,
+            lambda: self.pytrends.related_queries(), _related_to_payload, _payload_to_related,
+        )
@@ -0,0 +1,238 @@
+"""
+Parallel Google Trends fetcher over several independent identities.
+
+Each identity is one pytrends session (its own TrendReq, so its own cookie
+jar), optionally behind its own proxy, with its own TokenBucket rate budget.
+One worker thread per identity pulls keyword batches from a shared work
+queue, so throughput scales with the number of identities instead of one
+session sleeping between every request.
+
+A 429 puts only that identity into an exponentially growing cooldown and
+hands its batch back to the queue for the others. An identity that keeps
+getting 429s is retired for the rest of the run; the run only fails batches
+once every identity has been retired.
+"""
+import json
+import queue
+import random
+import threading
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import structlog
+
+from app.config import get_settings
+from app.services.rate_limit import HostBackoff, TokenBucket
+from app.services.trends_client import CachedTrendsClient, TrendsCache
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+MAX_BATCH_ATTEMPTS = 3  # non-rate-limit failures before a batch is given up
+MAX_RATE_LIMIT_STRIKES = 4  # consecutive 429s before an identity is retired
+COOLDOWN_BASE_SECONDS = 60.0
+POLL_SECONDS = 0.5
+
+
+def is_rate_limited(error: Exception) -> bool:
+    return ("429" in str(error) or "Too Many" in str(error)
+            or type(error).__name__ == "TooManyRequestsError")
+
+
+class TrendsIdentity:
+    """One Trends session: proxy, cookies and request budget."""
+
+    def __init__(self, name: str, proxy: Optional[str] = None, cookies: Optional[dict] = None,
+                 requests_per_minute: Optional[float] = None):
+        self.name = name
+        self.proxy = proxy
+        self.cookies = cookies or {}
+        self.requests_per_minute = requests_per_minute or settings.GOOGLE_TRENDS_REQUESTS_PER_MINUTE
+        self.strikes = 0
+        self.retired = False
+
+    @classmethod
+    def from_settings(cls) -> List["TrendsIdentity"]:
+        """
+        Identities from GOOGLE_TRENDS_IDENTITIES, a JSON list of
+        {"name", "proxy", "cookies", "requests_per_minute"} objects.
+        Falls back to one direct identity.
+        """
+        raw = settings.GOOGLE_TRENDS_IDENTITIES
+        if not raw:
+            return [cls("direct")]
+        return [
+            cls(item.get("name") or f"identity-{i}", item.get("proxy"),
+                item.get("cookies"), item.get("requests_per_minute"))
+            for i, item in enumerate(json.loads(raw))
+        ]
+
+
+def default_client_factory(identity: TrendsIdentity, cache: Optional[TrendsCache],
+                           before_request: Callable[[], None]) -> CachedTrendsClient:
+    """
+    CachedTrendsClient bound to the identity's proxy and cookies, charging
+    ``before_request`` (the identity's token bucket) for every HTTP request.
+    The TrendReq (and its cookie request to Google) is only created on the
+    identity's first cache miss.
+    """
+    kwargs = {"retries": 0, "timeout": (10, 30)}
+    if identity.proxy:
+        kwargs["proxies"] = [identity.proxy]
+    return CachedTrendsClient(cache=cache, before_request=before_request,
+                              cookies=identity.cookies, **kwargs)
+
+
+class TrendsFetcherPool:
+    """
+    Fetch interest_over_time (and related_queries) for many keyword batches
+    across identities. ``run`` yields ``(batch_idx, keywords, df, related,
+    error)`` in completion order on the calling thread, so callers keep all
+    database writes on their own thread. With ``with_interest=False`` only
+    related_queries is fetched, and its failures are retried and requeued
+    the way interest_over_time failures are.
+    """
+
+    def __init__(self, identities: List[TrendsIdentity], timeframe: str, geo: str = "US",
+                 cache: Optional[TrendsCache] = None, with_related: bool = True,
+                 client_factory: Callable = default_client_factory, with_interest: bool = True):
+        if not identities:
+            raise ValueError("at least one Trends identity is required")
+        self.identities = identities
+        self.timeframe = timeframe
+        self.geo = geo
+        self.with_related = with_related
+        self.with_interest = with_interest
+        self.backoff = HostBackoff()
+        if cache is None and settings.GOOGLE_TRENDS_CACHE_ENABLED:
+            cache = TrendsCache()
+        self.clients = {}
+        for identity in identities:
+            bucket = TokenBucket.per_minute(identity.requests_per_minute)
+            self.clients[identity.name] = client_factory(identity, cache, bucket.acquire)
+        self._lock = threading.Lock()
+        self._work: queue.Queue = queue.Queue()
+        self._results: queue.Queue = queue.Queue()
+        self._attempts = {}
+        self._remaining = 0
+
+    # ─── Stats ───
+
+    @property
+    def hits(self) -> int:
+        return sum(c.hits for c in self.clients.values())
+
+    @property
+    def misses(self) -> int:
+        return sum(c.misses for c in self.clients.values())
+
+    @property
+    def active_identities(self) -> int:
+        return sum(1 for i in self.identities if not i.retired)
+
+    # ─── Work queue ───
+
+    def _finish(self, batch_idx: int, keywords: List[str], df, related, error) -> None:
+        with self._lock:
+            self._remaining -= 1
+        self._results.put((batch_idx, keywords, df, related, error))
+
+    def _requeue(self, batch_idx: int, keywords: List[str], error: Exception) -> None:
+        with self._lock:
+            exhausted = self.active_identities == 0
+        if exhausted:
+            self._finish(batch_idx, keywords, None, None, error)
+        else:
+            self._work.put((batch_idx, keywords))
+
+    def _drain(self, error: Exception) -> None:
+        """Fail every queued batch once no identity is left to take it."""
+        while True:
+            try:
+                batch_idx, keywords = self._work.get_nowait()
+            except queue.Empty:
+                return
+            self._finish(batch_idx, keywords, None, None, error)
+
+    def _on_rate_limited(self, identity: TrendsIdentity, error: Exception) -> None:
+        identity.strikes += 1
+        cooldown = COOLDOWN_BASE_SECONDS * 2 ** (identity.strikes - 1) * random.uniform(1.0, 1.5)
+        self.backoff.defer(identity.name, cooldown)
+        if identity.strikes >= MAX_RATE_LIMIT_STRIKES:
+            with self._lock:
+                identity.retired = True
+            logger.warning("trends_fetcher: identity retired after repeated 429s",
+                           identity=identity.name, active=self.active_identities)
+        else:
+            logger.warning("trends_fetcher: identity rate limited, cooling down",
+                           identity=identity.name, strikes=identity.strikes,
+                           wait_seconds=round(cooldown, 1))
+
+    def _worker(self, identity: TrendsIdentity) -> None:
+        client = self.clients[identity.name]
+        while not identity.retired:
+            with self._lock:
+                if self._remaining <= 0:
+                    return
+            self.backoff.wait(identity.name)
+            try:
+                batch_idx, keywords = self._work.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                continue
+
+            try:
+                if self.with_interest:
+                    df, related = client.interest_over_time(keywords, self.timeframe, self.geo), None
+                else:
+                    df, related = None, client.related_queries(keywords, self.timeframe, self.geo)
+            except Exception as e:
+                if is_rate_limited(e):
+                    self._on_rate_limited(identity, e)
+                    self._requeue(batch_idx, keywords, e)
+                    continue
+                with self._lock:
+                    self._attempts[batch_idx] = self._attempts.get(batch_idx, 0) + 1
+                    attempts = self._attempts[batch_idx]
+                logger.warning("trends_fetcher: batch error", identity=identity.name,
+                               batch=batch_idx, attempt=attempts, error=str(e))
+                if attempts >= MAX_BATCH_ATTEMPTS:
+                    self._finish(batch_idx, keywords, None, None, e)
+                else:
+                    self._requeue(batch_idx, keywords, e)
+                continue
+
+            identity.strikes = 0
+            if self.with_interest and self.with_related:
+                try:
+                    related = client.related_queries(keywords, self.timeframe, self.geo)
+                except Exception as e:
+                    if is_rate_limited(e):
+                        self._on_rate_limited(identity, e)
+                    logger.warning("trends_fetcher: related queries failed",
+                                   identity=identity.name, batch=batch_idx, error=str(e))
+            self._finish(batch_idx, keywords, df, related, None)
+
+        if self.active_identities == 0:
+            self._drain(RuntimeError("all Google Trends identities are rate limited"))
+
+    def run(self, batches: List[Tuple[int, List[str]]]
+            ) -> Iterator[Tuple[int, List[str], object, Optional[dict], Optional[Exception]]]:
+        """Fetch ``(batch_idx, keywords)`` batches; yields one result per batch."""
+        if not batches:
+            return
+        for batch in batches:
+            self._work.put(batch)
+        self._remaining = len(batches)
+
+        threads = [threading.Thread(target=self._worker, args=(identity,), daemon=True,
+                                    name=f"trends-{identity.name}")
+                   for identity in self.identities if not identity.retired]
+        for thread in threads:
+            thread.start()
+        try:
+            for _ in range(len(batches)):
+                yield self._results.get()
+        finally:
+            with self._lock:
+                self._remaining = 0
+            for thread in threads:
+                thread.join(timeout=POLL_SECONDS * 4)
@@ -4,6 +4,7 @@ NeuraNest Celery Task Definitions & Beat Schedule.
 Tasks:
   - ingest_google_trends    (daily 6AM UTC)
   - ingest_reddit_mentions  (daily 7AM UTC)
+  - embed_topics            (daily 8AM UTC)
   - generate_features       (daily 9AM UTC)
   - compute_scores          (daily 10AM UTC)
   - generate_forecasts      (weekly Tue 3AM UTC)
@@ -37,8 +38,15 @@ celery_app.conf.update(
         "app.tasks.features",
         "app.tasks.scoring_task",
         "app.tasks.forecasting",
+        "app.tasks.embeddings",
         "app.tasks.alerts_eval",
     ],
+    # Forecast ranges each start a FORECAST_WORKERS process pool, so they run
+    # on their own queue, consumed by concurrency-1 workers:
+    #   celery -A app.tasks.celery_app worker -Q forecasting -c 1
+    task_routes={
+        "app.tasks.forecasting.forecast_topic_range": {"queue": settings.FORECAST_QUEUE},
+    },
 )
 
 # ─── Celery Beat Schedule ───
@@ -52,10 +60,16 @@ celery_app.conf.beat_schedule = {
         "task": "app.tasks.ingestion.ingest_reddit_mentions",
         "schedule": crontab(hour=7, minute=0),  # 7AM UTC daily
     },
+    # Topic embeddings (only topics whose text changed are re-encoded)
+    "embeddings-daily": {
+        "task": "app.tasks.embeddings.embed_topics",
+        "schedule": crontab(hour=8, minute=0),  # 8AM UTC daily
+    },
     # Feature engineering (after ingestion)
     "features-daily": {
         "task": "app.tasks.features.generate_features",
         "schedule": crontab(hour=9, minute=0),  # 9AM UTC daily
+        "kwargs": {"incremental": True},  # only topics with new timeseries rows
     },
     # Scoring (after features)
     "scoring-daily": {
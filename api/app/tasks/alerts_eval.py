@@ -16,6 +16,8 @@ from app.tasks.db_helpers import get_sync_db, log_ingestion_run, update_ingestio
 
 logger = structlog.get_logger()
 
+SCORE_TYPES = ("opportunity", "competition", "demand", "review_gap")
+
 
 @celery_app.task(name="app.tasks.alerts_eval.evaluate_alerts",
                  bind=True, max_retries=1, default_retry_delay=120)
@@ -43,9 +45,12 @@ def evaluate_alerts(self):
         with get_sync_db() as session:
             alerts = session.execute(text("""
                 SELECT a.id, a.user_id, a.topic_id, a.alert_type, a.config_json,
-                       t.name as topic_name, t.stage as topic_stage
+                       t.name as topic_name, t.stage as topic_stage,
+                       tl.opportunity_score, tl.competition_score,
+                       tl.demand_score, tl.review_gap_score
                 FROM alerts a
                 LEFT JOIN topics t ON t.id = a.topic_id
+                LEFT JOIN topic_latest tl ON tl.topic_id = a.topic_id
                 WHERE a.is_active = true
             """)).fetchall()
 
@@ -65,17 +70,13 @@ def evaluate_alerts(self):
                     threshold = config.get("threshold", 80)
                     metric = config.get("metric", "opportunity")
 
-                    with get_sync_db() as session:
-                        row = session.execute(text("""
-                            SELECT score_value FROM scores
-                            WHERE topic_id = :tid AND score_type = :stype
-                            ORDER BY computed_at DESC LIMIT 1
-                        """), {"tid": topic_id, "stype": metric}).fetchone()
+                    # Latest score from the topic_latest read model
+                    value = getattr(alert, f"{metric}_score") if metric in SCORE_TYPES else None
 
-                    if row and float(row.score_value) >= threshold:
+                    if value is not None and float(value) >= threshold:
                         should_fire = True
-                        message = f"{alert.topic_name}: {metric} score reached {float(row.score_value):.1f} (threshold: {threshold})"
-                        payload = {"score": float(row.score_value), "threshold": threshold}
+                        message = f"{alert.topic_name}: {metric} score reached {float(value):.1f} (threshold: {threshold})"
+                        payload = {"score": float(value), "threshold": threshold}
 
                 elif alert.alert_type == "stage_change" and topic_id:
                     # Check if stage changed from what was last seen
@@ -8,6 +8,9 @@ from contextlib import contextmanager
 
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker, Session
+from neuranest_shared.timeseries_upsert import (  # noqa: F401
+    TIMESERIES_COLUMNS, multi_row_values, upsert_timeseries,
+)
 
 from app.config import get_settings
 
@@ -41,24 +44,80 @@ def log_ingestion_run(session: Session, dag_id: str, run_date: date,
                        status: str, records_fetched: int = 0,
                        records_inserted: int = 0, records_skipped: int = 0,
                        error_count: int = 0, started_at: datetime = None,
-                       completed_at: datetime = None) -> str:
+                       completed_at: datetime = None, task_id: str = None) -> str:
     """Insert a row into ingestion_runs and return the run ID."""
     run_id = str(uuid.uuid4())
     session.execute(text("""
         INSERT INTO ingestion_runs (id, dag_id, run_date, status,
             records_fetched, records_inserted, records_skipped,
-            error_count, started_at, completed_at)
+            error_count, started_at, completed_at, task_id)
         VALUES (:id, :dag_id, :run_date, :status,
-            :fetched, :inserted, :skipped, :errors, :started, :completed)
+            :fetched, :inserted, :skipped, :errors, :started, :completed, :task_id)
     """), {
         "id": run_id, "dag_id": dag_id, "run_date": run_date,
         "status": status, "fetched": records_fetched,
         "inserted": records_inserted, "skipped": records_skipped,
         "errors": error_count, "started": started_at, "completed": completed_at,
+        "task_id": task_id,
     })
     return run_id
 
 
+def find_resumable_run(session: Session, dag_id: str, task_id: str = None,
+                       run_id: str = None):
+    """
+    The checkpointed, unfinished run a retried or redelivered task should
+    continue: by explicit ``run_id``, otherwise the latest running run of
+    ``dag_id`` started by the same Celery task id. Returns the row or None.
+    """
+    if not run_id and not task_id:
+        return None
+    return session.execute(text("""
+        SELECT id, records_fetched, records_inserted, records_skipped, error_count,
+               batches_total, batches_done, checkpoint_json, batches_completed
+        FROM ingestion_runs
+        WHERE dag_id = :dag_id
+          AND checkpoint_json IS NOT NULL
+          AND (CAST(:run_id AS uuid) IS NOT NULL AND id = CAST(:run_id AS uuid)
+               OR CAST(:run_id AS uuid) IS NULL AND task_id = :task_id AND status = 'running')
+        ORDER BY started_at DESC
+        LIMIT 1
+    """), {"dag_id": dag_id, "task_id": task_id, "run_id": run_id}).fetchone()
+
+
+def start_checkpoint(session: Session, run_id: str, plan: dict, batches_total: int):
+    """
+    Persist a run's batch plan so a resumed task replays exactly the same
+    batches. The plan is written once; progress goes to batches_completed.
+    """
+    import json as _json
+    session.execute(text("""
+        UPDATE ingestion_runs
+        SET checkpoint_json = CAST(:checkpoint AS jsonb),
+            batches_completed = CAST('{}' AS int[]),
+            batches_total = :total, batches_done = 0
+        WHERE id = :id
+    """), {
+        "id": run_id, "total": batches_total,
+        "checkpoint": _json.dumps(plan),
+    })
+
+
+def checkpoint_batch(session: Session, run_id: str, batch_idx: int):
+    """
+    Mark one batch of a checkpointed run complete (idempotent). Only the
+    small batches_completed array changes; the unchanged plan document is
+    carried over by reference instead of being rewritten.
+    """
+    session.execute(text("""
+        UPDATE ingestion_runs
+        SET batches_completed = array_append(batches_completed, CAST(:idx AS int)),
+            batches_done = COALESCE(batches_done, 0) + 1
+        WHERE id = :id
+          AND NOT (CAST(:idx AS int) = ANY(COALESCE(batches_completed, CAST('{}' AS int[]))))
+    """), {"id": run_id, "idx": batch_idx})
+
+
 def update_ingestion_run(session: Session, run_id: str, status: str,
                           records_fetched: int = 0, records_inserted: int = 0,
                           records_skipped: int = 0, error_count: int = 0):
@@ -76,6 +135,125 @@ def update_ingestion_run(session: Session, run_id: str, status: str,
     })
 
 
+def update_ingestion_progress(session: Session, run_id: str,
+                              records_fetched: int = 0, records_inserted: int = 0,
+                              records_skipped: int = 0, error_count: int = 0):
+    """Update the running counters of an in-flight ingestion run without closing it."""
+    session.execute(text("""
+        UPDATE ingestion_runs
+        SET records_fetched = :fetched, records_inserted = :inserted,
+            records_skipped = :skipped, error_count = :errors
+        WHERE id = :id
+    """), {
+        "id": run_id, "fetched": records_fetched,
+        "inserted": records_inserted, "skipped": records_skipped,
+        "errors": error_count,
+    })
+
+
+def increment_ingestion_progress(session: Session, run_id: str,
+                                 records_fetched: int = 0, records_inserted: int = 0,
+                                 records_skipped: int = 0, error_count: int = 0):
+    """Add to the counters of an in-flight run; safe for concurrent subtasks."""
+    session.execute(text("""
+        UPDATE ingestion_runs
+        SET records_fetched = COALESCE(records_fetched, 0) + :fetched,
+            records_inserted = COALESCE(records_inserted, 0) + :inserted,
+            records_skipped = COALESCE(records_skipped, 0) + :skipped,
+            error_count = COALESCE(error_count, 0) + :errors
+        WHERE id = :id
+    """), {
+        "id": run_id, "fetched": records_fetched,
+        "inserted": records_inserted, "skipped": records_skipped,
+        "errors": error_count,
+    })
+
+
+def log_dq_metric(session: Session, run_id: str, metric_name: str,
+                  metric_value: float, threshold: float = None,
+                  passed: bool = None):
+    """Insert a row into dq_metrics attached to an ingestion run."""
+    session.execute(text("""
+        INSERT INTO dq_metrics (run_id, metric_name, metric_value, threshold, passed)
+        VALUES (:run_id, :name, :value, :threshold, :passed)
+    """), {
+        "run_id": run_id, "name": metric_name, "value": metric_value,
+        "threshold": threshold, "passed": passed,
+    })
+
+
+def bulk_upsert_timeseries(session: Session, rows: list[dict],
+                           chunk_size: int = None, freeze_scaled: bool = False) -> dict:
+    """
+    Upsert source_timeseries rows in TIMESERIES_UPSERT_CHUNK_SIZE chunks; see
+    neuranest_shared.timeseries_upsert.upsert_timeseries. Returns inserted /
+    updated / unchanged counts.
+    """
+    return upsert_timeseries(session, rows, chunk_size or settings.TIMESERIES_UPSERT_CHUNK_SIZE,
+                             freeze_scaled)
+
+
+SPARKLINE_POINTS = 12
+
+
+def refresh_topic_latest(session: Session, topic_ids: list[str] = None) -> int:
+    """
+    Rebuild topic_latest rows (latest score per type, stage, sparkline,
+    sources) for ``topic_ids``, or for every topic when None. Runs inside the
+    caller's transaction, so it commits together with the scores it reflects.
+    Returns rows written.
+    """
+    where = "" if topic_ids is None else "WHERE t.id = ANY(CAST(:tids AS uuid[]))"
+    result = session.execute(text(f"""
+        INSERT INTO topic_latest (topic_id, opportunity_score, competition_score, demand_score,
+                                  review_gap_score, stage, sparkline, sources, scored_at, updated_at)
+        SELECT t.id, sc.opportunity, sc.competition, sc.demand, sc.review_gap, t.stage,
+               spark.points, src.sources, sc.scored_at, :now
+        FROM topics t
+        LEFT JOIN LATERAL (
+            SELECT max(score_value) FILTER (WHERE score_type = 'opportunity') AS opportunity,
+                   max(score_value) FILTER (WHERE score_type = 'competition') AS competition,
+                   max(score_value) FILTER (WHERE score_type = 'demand') AS demand,
+                   max(score_value) FILTER (WHERE score_type = 'review_gap') AS review_gap,
+                   max(computed_at) AS scored_at
+            FROM (
+                SELECT DISTINCT ON (score_type) score_type, score_value, computed_at
+                FROM scores
+                WHERE topic_id = t.id
+                ORDER BY score_type, computed_at DESC
+            ) latest
+        ) sc ON true
+        LEFT JOIN LATERAL (
+            SELECT array_agg(COALESCE(value, 0)::float8 ORDER BY date) AS points
+            FROM (
+                SELECT CASE WHEN source = 'google_trends' THEN scaled_value
+                            ELSE normalized_value END AS value, date
+                FROM source_timeseries
+                WHERE topic_id = t.id
+                ORDER BY date DESC
+                LIMIT {SPARKLINE_POINTS}
+            ) recent
+        ) spark ON true
+        LEFT JOIN LATERAL (
+            SELECT array_agg(DISTINCT source) AS sources
+            FROM source_timeseries
+            WHERE topic_id = t.id
+        ) src ON true
+        {where}
+        ON CONFLICT (topic_id) DO UPDATE SET
+            opportunity_score = EXCLUDED.opportunity_score,
+            competition_score = EXCLUDED.competition_score,
+            demand_score = EXCLUDED.demand_score,
+            review_gap_score = EXCLUDED.review_gap_score,
+            stage = EXCLUDED.stage,
+            sparkline = EXCLUDED.sparkline,
+            sources = EXCLUDED.sources,
+            scored_at = EXCLUDED.scored_at,
+            updated_at = EXCLUDED.updated_at
+    """), {"tids": topic_ids, "now": datetime.utcnow()})
+    return result.rowcount
+
+
 def log_error(session: Session, source: str, error_type: str,
               message: str, context: dict = None):
     """Insert a row into error_logs."""
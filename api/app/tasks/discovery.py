@@ -8,25 +8,44 @@ Flow:
 1. For each existing active topic, fetch related_queries from Google Trends
 2. For each discovered keyword, fuzzy-match against existing topics (rapidfuzz)
 3. If match score >= 85 → link as keyword to existing topic
-4. If no match → create new candidate topic + auto-categorize
-5. Newly created topics get picked up by the next ingestion cycle
+4. If no match → embed the keyword and look up its nearest topic in the
+   pgvector index; semantic near-duplicates are linked instead of created
+5. Otherwise → create new candidate topic + auto-categorize
+6. Newly created topics get picked up by the next ingestion cycle
 
 Schedule: Weekly (Monday 2AM UTC)
 """
 import uuid
-import time
-import random
+import math
 import re
 from datetime import datetime, date
 from typing import Optional
 
+import numpy as np
 from sqlalchemy import text
 import structlog
 
+from app.config import get_settings
+from app.services.cache_versions import bump_generations
+from app.services.embeddings import embedding_text, get_encoder, vector_literal
+from app.services.trends_batching import PAYLOAD_SIZE
 from app.tasks import celery_app
-from app.tasks.db_helpers import get_sync_db, log_ingestion_run, update_ingestion_run, log_error
+from app.tasks.db_helpers import (
+    get_sync_db, log_ingestion_run, update_ingestion_run, log_error,
+    log_dq_metric, multi_row_values,
+)
+from app.tasks.embeddings import embedding_fingerprint
+from app.services.topic_matcher import TopicMatcher
 
 logger = structlog.get_logger()
+settings = get_settings()
+
+DISCOVERY_INSERT_BATCH = 500  # rows per multi-row INSERT (one transaction each)
+DISCOVERY_ANN_BATCH = 200  # candidate vectors per batched nearest-topic query
+DISCOVERY_ANN_NEIGHBOURS = 5  # nearest topics fetched per vector before the encoder check
+KEYWORD_LINK_COLUMNS = ["id", "keyword", "topic_id", "source", "geo", "created_at"]
+NEW_TOPIC_COLUMNS = ["id", "name", "slug", "primary_category", "description",
+                     "stage", "is_active", "created_at", "updated_at"]
 
 # ── Category classification rules ──
 # Maps keyword patterns to category slugs
@@ -192,14 +211,58 @@ SEED_DISCOVERY_KEYWORDS = {
 }
 
 
+class CategoryClassifier:
+    """
+    CATEGORY_RULES compiled into one regex, built once.
+
+    Every rule becomes a named group inside a zero-width lookahead, so a
+    single finditer pass visits each start position and reports the first
+    rule (in list order) matching there. The lowest rule index over all
+    positions is exactly the first rule whose patterns match anywhere, i.e.
+    the same answer as searching the rules one by one in order.
+    """
+
+    def __init__(self, rules: list, default: str = "general"):
+        self.categories = [slug for slug, _ in rules]
+        self.default = default
+        alternation = "|".join(
+            f"(?P<r{i}>{'|'.join(patterns)})" for i, (_, patterns) in enumerate(rules)
+        )
+        self._regex = re.compile(f"(?=(?:{alternation}))")
+
+    def classify(self, keyword: str) -> str:
+        best = None
+        for m in self._regex.finditer(keyword.lower()):
+            idx = int(m.lastgroup[1:])
+            if idx == 0:
+                return self.categories[0]
+            if best is None or idx < best:
+                best = idx
+        return self.categories[best] if best is not None else self.default
+
+    def classify_many(self, keywords) -> list[str]:
+        """Classify a batch of keywords; repeated keywords are classified once."""
+        seen = {}
+        out = []
+        for keyword in keywords:
+            category = seen.get(keyword)
+            if category is None:
+                category = seen[keyword] = self.classify(keyword)
+            out.append(category)
+        return out
+
+
+_CLASSIFIER = CategoryClassifier(CATEGORY_RULES)
+
+
 def classify_category(keyword: str) -> str:
     """Classify a keyword into a category using regex rules."""
-    kw_lower = keyword.lower()
-    for category_slug, patterns in CATEGORY_RULES:
-        for pattern in patterns:
-            if re.search(pattern, kw_lower):
-                return category_slug
-    return "general"
+    return _CLASSIFIER.classify(keyword)
+
+
+def classify_many(keywords) -> list[str]:
+    """Classify many keywords at once; same result as classify_category per keyword."""
+    return _CLASSIFIER.classify_many(keywords)
 
 
 def slugify(text: str) -> str:
@@ -215,27 +278,187 @@ def fuzzy_match_topic(keyword: str, existing_topics: list) -> Optional[dict]:
     """
     Fuzzy match a keyword against existing topic names.
     Returns {'topic_id': ..., 'score': ...} if match >= 85, else None.
+    For many keywords build one TopicMatcher and use match_many instead.
     """
-    try:
-        from rapidfuzz import fuzz, process
-    except ImportError:
-        # Fallback to simple substring matching
-        kw_lower = keyword.lower()
-        for t in existing_topics:
-            name_lower = t["name"].lower()
-            if kw_lower == name_lower or kw_lower in name_lower or name_lower in kw_lower:
-                return {"topic_id": t["id"], "score": 0.90}
-        return None
+    return TopicMatcher(existing_topics).match(keyword)
+
+
+def _insert_chunked(session, table: str, columns: list, rows: list,
+                    conflict: str, label: str) -> tuple[list, int, int]:
+    """
+    Insert ``rows`` with chunked multi-row INSERT ... ON CONFLICT DO NOTHING
+    RETURNING id, committing each chunk. Returns (inserted ids, skipped,
+    failed) where skipped rows hit the conflict and failed rows were in a
+    chunk that errored and was rolled back.
+    """
+    inserted = []
+    skipped = failed = 0
+    for i in range(0, len(rows), DISCOVERY_INSERT_BATCH):
+        chunk = rows[i:i + DISCOVERY_INSERT_BATCH]
+        values_sql, params = multi_row_values(chunk, columns)
+        try:
+            returned = session.execute(text(f"""
+                INSERT INTO {table} ({", ".join(columns)})
+                VALUES {values_sql}
+                ON CONFLICT {conflict} DO NOTHING
+                RETURNING id
+            """), params).fetchall()
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.warning(f"topic_discovery: {label} insert failed",
+                           rows=len(chunk), error=str(e)[:200])
+            failed += len(chunk)
+            continue
+        inserted.extend(str(r.id) for r in returned)
+        skipped += len(chunk) - len(returned)
+    return inserted, skipped, failed
+
+
+def _select_expansion_topics(session, fraction: float) -> list:
+    """
+    Active topics to expand this run: ``fraction`` of the catalog, least
+    recently expanded first (never-expanded topics lead), so successive runs
+    rotate through the whole catalog.
+    """
+    total = session.execute(text(
+        "SELECT count(*) FROM topics WHERE is_active = true"
+    )).scalar() or 0
+    limit = min(total, math.ceil(total * max(0.0, min(fraction, 1.0))))
+    if not limit:
+        return []
+    rows = session.execute(text("""
+        SELECT id, name FROM topics
+        WHERE is_active = true
+        ORDER BY discovery_expanded_at ASC NULLS FIRST, random()
+        LIMIT :limit
+    """), {"limit": limit}).fetchall()
+    return [{"id": str(r.id), "name": r.name} for r in rows]
+
+
+def _expand_related_queries(topics: list, timeframe: str) -> dict:
+    """
+    Fetch related queries for ``topics`` through the Trends fetcher pool:
+    topic names packed five to a payload, one worker per identity, each on
+    its own rate budget, with responses read from and written to the Trends
+    cache. Returns {"keywords", "expanded_ids", "errors", "requests",
+    "cache_hits"}.
+    """
+    from app.services.trends_fetcher import TrendsFetcherPool, TrendsIdentity
+
+    ids_by_name = {}
+    for t in topics:
+        ids_by_name.setdefault(t["name"], []).append(t["id"])
+    names = list(ids_by_name)
+    batches = [(i, names[start:start + PAYLOAD_SIZE])
+               for i, start in enumerate(range(0, len(names), PAYLOAD_SIZE))]
+
+    pool = TrendsFetcherPool(TrendsIdentity.from_settings(), timeframe, "US",
+                             with_interest=False)
+    keywords, expanded_ids, errors = set(), [], 0
+    for _, batch_names, _, related, error in pool.run(batches):
+        if error is not None:
+            logger.debug("topic_discovery: related query error",
+                         topics=batch_names, error=str(error)[:100])
+            errors += 1
+            continue
+        for name in batch_names:
+            expanded_ids.extend(ids_by_name[name])
+            for qtype in ["top", "rising"]:
+                df = (related.get(name) or {}).get(qtype)
+                if df is None or df.empty:
+                    continue
+                for query in df["query"]:
+                    kw = str(query).strip()
+                    if kw and len(kw) > 3 and len(kw) < 80:
+                        keywords.add(kw)
+
+    return {"keywords": keywords, "expanded_ids": expanded_ids, "errors": errors,
+            "requests": pool.misses, "cache_hits": pool.hits}
+
+
+def _nearest_topics(session, vectors, encoder_name: str) -> list:
+    """
+    Nearest active topic for every vector as (topic_id, cosine similarity),
+    or None where no comparable topic embedding is found. Each chunk of
+    vectors is one statement: a VALUES list joined LATERAL to an ORDER BY <=>
+    LIMIT DISCOVERY_ANN_NEIGHBOURS lookup, which the HNSW index on
+    topics.embedding answers per row.
+
+    A stored embedding only counts if its fingerprint matches
+    ``encoder_name`` and the topic's current text; vectors from another
+    encoder live in a different space and their distances mean nothing.
+    """
+    nearest = [None] * len(vectors)
+    mismatched = 0
+    for start in range(0, len(vectors), DISCOVERY_ANN_BATCH):
+        rows = [{"idx": start + i, "embedding": vector_literal(v)}
+                for i, v in enumerate(vectors[start:start + DISCOVERY_ANN_BATCH])]
+        values_sql, params = multi_row_values(rows, ["idx", "embedding"])
+        result = session.execute(text(f"""
+            SELECT c.idx, n.id, n.name, n.description, n.embedding_fingerprint,
+                   1 - n.distance AS similarity
+            FROM (VALUES {values_sql}) AS c (idx, embedding)
+            CROSS JOIN LATERAL (
+                SELECT t.id, t.name, t.description, t.embedding_fingerprint,
+                       t.embedding <=> CAST(c.embedding AS vector) AS distance
+                FROM topics t
+                WHERE t.is_active = true AND t.embedding IS NOT NULL
+                ORDER BY t.embedding <=> CAST(c.embedding AS vector)
+                LIMIT {DISCOVERY_ANN_NEIGHBOURS}
+            ) n
+            ORDER BY c.idx, n.distance
+        """), params).fetchall()
+        for r in result:
+            idx = int(r.idx)
+            if nearest[idx] is not None:
+                continue
+            expected = embedding_fingerprint(encoder_name, embedding_text(r.name, r.description))
+            if r.embedding_fingerprint != expected:
+                mismatched += 1
+                continue
+            nearest[idx] = (str(r.id), float(r.similarity))
+    if mismatched:
+        logger.info("topic_discovery: ignored stale or foreign-encoder embeddings",
+                    neighbours=mismatched, encoder=encoder_name)
+    return nearest
 
-    if not existing_topics:
-        return None
 
-    choices = {t["id"]: t["name"] for t in existing_topics}
-    match = process.extractOne(keyword, choices, scorer=fuzz.token_sort_ratio)
+def _semantic_dedup(new_topics: list, threshold: float) -> tuple[list, list]:
+    """
+    Drop would-be new topics that are semantic near-duplicates, either of an
+    existing topic (via the embedding index) or of an earlier candidate in
+    this run. Candidates are encoded from the same embedding_text as stored
+    topics. Returns (kept topics, [(keyword, topic_id)] links for the
+    duplicates). Without a usable encoder every candidate is kept.
+    """
+    try:
+        encoder = get_encoder()
+        vectors = encoder.encode([embedding_text(t["name"], t.get("description"))
+                                  for t in new_topics])
+    except Exception as e:
+        logger.warning("topic_discovery: semantic dedup skipped, encoder unavailable",
+                       error=str(e)[:200])
+        return new_topics, []
 
-    if match and match[1] >= 85:
-        return {"topic_id": match[2], "score": match[1] / 100}
-    return None
+    with get_sync_db() as session:
+        nearest = _nearest_topics(session, vectors, encoder.name)
+
+    kept, links = [], []
+    kept_vectors = np.empty_like(vectors)
+    for topic, vector, near in zip(new_topics, vectors, nearest):
+        if near is not None and near[1] >= threshold:
+            links.append((topic["keyword"], near[0]))
+            continue
+        if kept:
+            sims = kept_vectors[:len(kept)] @ vector
+            j = int(np.argmax(sims))
+            if sims[j] >= threshold:
+                links.append((topic["keyword"], kept[j]["id"]))
+                continue
+        kept_vectors[len(kept)] = vector
+        kept.append(topic)
+    return kept, links
 
 
 @celery_app.task(name="app.tasks.discovery.discover_topics",
@@ -247,7 +470,8 @@ def discover_topics(self):
     1. Expand existing topics via Google Trends related queries
     2. Process seed keywords for uncovered categories
     3. Fuzzy-match new keywords to existing topics
-    4. Create new topics for unmatched keywords
+    4. Drop semantic near-duplicates (embedding nearest neighbour)
+    5. Create new topics for unmatched keywords
     """
     started = datetime.utcnow()
     today = date.today()
@@ -255,6 +479,9 @@ def discover_topics(self):
     total_new_topics = 0
     total_linked = 0
     total_errors = 0
+    keywords_skipped = 0
+    topics_skipped = 0
+    semantic_duplicates = 0
 
     logger.info("topic_discovery: starting")
 
@@ -282,40 +509,30 @@ def discover_topics(self):
         # ── Step 2: Fetch related queries from Google Trends for existing topics ──
         related_keywords = set()
         try:
-            from pytrends.request import TrendReq
-            pytrends = TrendReq(hl="en-US", tz=360, timeout=(10, 30))
-
-            # Sample up to 30 topics to avoid rate limits
-            sample_topics = random.sample(existing_topics, min(30, len(existing_topics)))
-
-            for i, topic in enumerate(sample_topics):
-                try:
-                    pytrends.build_payload([topic["name"]], timeframe="today 3-m", geo="US")
-                    related = pytrends.related_queries()
-
-                    if topic["name"] in related:
-                        for qtype in ["top", "rising"]:
-                            df = related[topic["name"]].get(qtype)
-                            if df is not None and not df.empty:
-                                for _, row in df.iterrows():
-                                    kw = str(row.get("query", "")).strip()
-                                    if kw and len(kw) > 3 and len(kw) < 80:
-                                        related_keywords.add(kw)
-
-                    # Rate limit
-                    delay = random.uniform(3, 6)
-                    time.sleep(delay)
-
-                except Exception as e:
-                    if "429" in str(e):
-                        logger.warning("topic_discovery: rate limited, waiting 65s")
-                        time.sleep(65)
-                    else:
-                        logger.debug("topic_discovery: related query error",
-                                     topic=topic["name"], error=str(e)[:100])
-                    total_errors += 1
+            from pytrends.request import TrendReq  # noqa: F401 - fail fast if missing
+
+            with get_sync_db() as session:
+                expansion_topics = _select_expansion_topics(
+                    session, settings.DISCOVERY_EXPANSION_FRACTION)
+            expansion = _expand_related_queries(
+                expansion_topics, settings.DISCOVERY_RELATED_TIMEFRAME)
+            related_keywords = expansion["keywords"]
+            total_errors += expansion["errors"]
+
+            with get_sync_db() as session:
+                if expansion["expanded_ids"]:
+                    session.execute(text("""
+                        UPDATE topics SET discovery_expanded_at = :now
+                        WHERE id = ANY(CAST(:tids AS uuid[]))
+                    """), {"now": datetime.utcnow(), "tids": expansion["expanded_ids"]})
+                log_dq_metric(session, run_id, "discovery_topics_expanded",
+                              len(expansion["expanded_ids"]))
+                log_dq_metric(session, run_id, "discovery_related_requests", expansion["requests"])
+                log_dq_metric(session, run_id, "discovery_related_cache_hits", expansion["cache_hits"])
 
             logger.info("topic_discovery: related queries fetched",
+                        topics=len(expansion_topics), expanded=len(expansion["expanded_ids"]),
+                        requests=expansion["requests"], cache_hits=expansion["cache_hits"],
                         keywords_found=len(related_keywords))
 
         except ImportError:
@@ -331,9 +548,21 @@ def discover_topics(self):
         logger.info("topic_discovery: total candidates", count=len(all_candidates))
 
         # ── Step 4: Process each candidate keyword ──
+        keyword_links = []
         new_topics_batch = []
-
-        for keyword in all_candidates:
+        now = datetime.utcnow()
+
+        # Match every not-yet-known candidate in one indexed pass
+        candidates = list(all_candidates)
+        matcher = TopicMatcher(existing_topics)
+        to_match = [k for k in candidates
+                    if k.lower() not in existing_names and slugify(k) not in existing_slugs]
+        matches = dict(zip(to_match, matcher.match_many(to_match)))
+        # ... and classify the ones that would become new topics in one batch
+        unmatched = [k for k in to_match if matches[k] is None]
+        categories = dict(zip(unmatched, classify_many(unmatched)))
+
+        for keyword in candidates:
             total_discovered += 1
             kw_slug = slugify(keyword)
 
@@ -342,27 +571,18 @@ def discover_topics(self):
                 continue
 
             # Fuzzy match against existing topics
-            match = fuzzy_match_topic(keyword, existing_topics)
+            match = matches.get(keyword)
 
             if match:
                 # Link as keyword to existing topic
-                total_linked += 1
-                with get_sync_db() as session:
-                    try:
-                        session.execute(text("""
-                            INSERT INTO keywords (id, keyword, topic_id, source, match_score, created_at)
-                            VALUES (:id, :kw, :tid, 'discovery', :score, :now)
-                            ON CONFLICT (keyword, source) DO NOTHING
-                        """), {
-                            "id": str(uuid.uuid4()), "kw": keyword,
-                            "tid": match["topic_id"], "score": match["score"],
-                            "now": datetime.utcnow()
-                        })
-                    except Exception:
-                        pass  # keywords table may not exist yet
+                keyword_links.append({
+                    "id": str(uuid.uuid4()), "keyword": keyword,
+                    "topic_id": match["topic_id"], "source": "discovery",
+                    "geo": "US", "created_at": now,
+                })
             else:
                 # Create new topic
-                category = classify_category(keyword)
+                category = categories[keyword]
                 topic_name = keyword.title()
                 topic_slug = kw_slug
 
@@ -372,39 +592,60 @@ def discover_topics(self):
 
                 new_topics_batch.append({
                     "id": str(uuid.uuid4()),
+                    "keyword": keyword,
                     "name": topic_name,
                     "slug": topic_slug,
-                    "category": category,
+                    "primary_category": category,
                     "description": f"Auto-discovered product niche: {keyword}",
+                    "stage": "unknown",
+                    "is_active": True,
+                    "created_at": now,
+                    "updated_at": now,
                 })
                 existing_slugs.add(topic_slug)
                 existing_names.add(keyword.lower())
 
-        # ── Step 5: Bulk insert new topics ──
-        if new_topics_batch:
-            with get_sync_db() as session:
-                for topic in new_topics_batch:
-                    try:
-                        session.execute(text("""
-                            INSERT INTO topics (id, name, slug, primary_category, description,
-                                                stage, is_active, meta_json, created_at, updated_at)
-                            VALUES (:id, :name, :slug, :cat, :desc,
-                                    'unknown', true, :meta, :now, :now)
-                            ON CONFLICT (slug) DO NOTHING
-                        """), {
-                            "id": topic["id"],
-                            "name": topic["name"],
-                            "slug": topic["slug"],
-                            "cat": topic["category"],
-                            "desc": topic["description"],
-                            "meta": '{"source": "auto_discovery", "version": "v1"}',
-                            "now": datetime.utcnow(),
-                        })
-                        total_new_topics += 1
-                    except Exception as e:
-                        logger.debug("topic_discovery: insert error",
-                                     topic=topic["name"], error=str(e)[:100])
-                        total_errors += 1
+        # ── Step 5: Semantic dedup of would-be new topics ──
+        if new_topics_batch and settings.DISCOVERY_SEMANTIC_DEDUP:
+            new_topics_batch, duplicates = _semantic_dedup(
+                new_topics_batch, settings.DISCOVERY_SEMANTIC_THRESHOLD)
+            semantic_duplicates = len(duplicates)
+            for keyword, topic_id in duplicates:
+                keyword_links.append({
+                    "id": str(uuid.uuid4()), "keyword": keyword,
+                    "topic_id": topic_id, "source": "discovery",
+                    "geo": "US", "created_at": now,
+                })
+            logger.info("topic_discovery: semantic dedup",
+                        duplicates=semantic_duplicates, new_topics=len(new_topics_batch))
+
+        # ── Step 6: Bulk insert new topics, then keyword links ──
+        with get_sync_db() as session:
+            created_ids, topics_skipped, failed = _insert_chunked(
+                session, "topics", NEW_TOPIC_COLUMNS, new_topics_batch,
+                "(slug)", "new topic",
+            )
+            total_new_topics = len(created_ids)
+            total_errors += failed
+
+            # Links to a new topic that was not created would violate the FK
+            created = set(created_ids)
+            pending_ids = {t["id"] for t in new_topics_batch}
+            linkable = [link for link in keyword_links
+                        if link["topic_id"] not in pending_ids or link["topic_id"] in created]
+            keywords_skipped = len(keyword_links) - len(linkable)
+
+            linked_ids, skipped, failed = _insert_chunked(
+                session, "keywords", KEYWORD_LINK_COLUMNS, linkable,
+                "ON CONSTRAINT uq_keywords_unique", "keyword link",
+            )
+            total_linked = len(linked_ids)
+            keywords_skipped += skipped
+            total_errors += failed
+
+        logger.info("topic_discovery: inserted",
+                    keywords_linked=total_linked, keywords_skipped=keywords_skipped,
+                    topics_created=total_new_topics, topics_skipped=topics_skipped)
 
         status = "success" if total_errors < 5 else "partial"
 
@@ -419,6 +660,10 @@ def discover_topics(self):
     with get_sync_db() as session:
         update_ingestion_run(session, run_id, status,
                              total_discovered, total_new_topics, total_linked, total_errors)
+        log_dq_metric(session, run_id, "discovery_keywords_skipped", keywords_skipped)
+        log_dq_metric(session, run_id, "discovery_topics_skipped", topics_skipped)
+        log_dq_metric(session, run_id, "discovery_semantic_duplicates", semantic_duplicates)
+    bump_generations("topics")
 
     result = {
         "run_id": run_id, "status": status,
@@ -0,0 +1,165 @@
+"""
+Topic embedding task.
+
+Fills Topic.embedding for active topics from their name and description.
+Every row stores a fingerprint of the encoder and the text it was embedded
+from; only topics whose fingerprint changed (new topics, edited text, or a
+different encoder) are re-encoded. Topics are scanned in id-keyset pages,
+encoded in large CPU batches and written back with one multi-row
+UPDATE ... FROM (VALUES ...) per batch.
+
+The HNSW index on topics.embedding (cosine) serves /topics/{id}/similar.
+"""
+import hashlib
+from datetime import datetime, date
+
+from sqlalchemy import text
+import structlog
+
+from app.config import get_settings
+from app.services.embeddings import EMBEDDING_DIM, embedding_text, get_encoder, vector_literal
+from app.tasks import celery_app
+from app.tasks.db_helpers import (
+    get_sync_db, log_ingestion_run, update_ingestion_run,
+    log_dq_metric, log_error, multi_row_values,
+)
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+EMBEDDING_SCAN_SIZE = 5000  # topics read per keyset page
+EMBEDDING_UPDATE_BATCH = 500  # rows per UPDATE ... FROM (VALUES ...)
+EMBEDDING_UPDATE_COLUMNS = ["id", "embedding", "fingerprint"]
+
+
+def embedding_fingerprint(encoder_name: str, content: str) -> str:
+    return hashlib.sha256(f"{encoder_name}\n{content}".encode()).hexdigest()
+
+
+def _pending_embeddings(rows, encoder_name: str, force: bool = False) -> list[tuple]:
+    """
+    (id, text, fingerprint) of the topic rows (id, name, description,
+    embedding_fingerprint) whose fingerprint no longer matches: new or
+    edited topics, or every row once the encoder changes. ``force`` takes
+    every row.
+    """
+    pending = []
+    for r in rows:
+        content = embedding_text(r.name, r.description)
+        fingerprint = embedding_fingerprint(encoder_name, content)
+        if force or fingerprint != r.embedding_fingerprint:
+            pending.append((str(r.id), content, fingerprint))
+    return pending
+
+
+def _embedding_updates(pending: list[tuple], vectors) -> list[dict]:
+    """_write_embeddings rows for ``pending`` and their encoded vectors."""
+    return [
+        {"id": topic_id, "embedding": vector_literal(vector), "fingerprint": fingerprint}
+        for (topic_id, _, fingerprint), vector in zip(pending, vectors)
+    ]
+
+
+def _write_embeddings(session, rows: list[dict]) -> int:
+    """Bulk-update embedding and fingerprint for ``rows``. Returns rows updated."""
+    updated = 0
+    for i in range(0, len(rows), EMBEDDING_UPDATE_BATCH):
+        values_sql, params = multi_row_values(rows[i:i + EMBEDDING_UPDATE_BATCH],
+                                              EMBEDDING_UPDATE_COLUMNS)
+        result = session.execute(text(f"""
+            UPDATE topics t
+            SET embedding = CAST(v.embedding AS vector),
+                embedding_fingerprint = v.fingerprint
+            FROM (VALUES {values_sql}) AS v (id, embedding, fingerprint)
+            WHERE t.id = CAST(v.id AS uuid)
+        """), params)
+        updated += result.rowcount
+    return updated
+
+
+@celery_app.task(name="app.tasks.embeddings.embed_topics",
+                 bind=True, max_retries=1, default_retry_delay=300)
+def embed_topics(self, encoder: str = None, force: bool = False):
+    """
+    Embed active topics whose text (or encoder) changed since their last
+    embedding. ``encoder`` picks an encoder by name (default
+    settings.EMBEDDING_ENCODER); ``force`` re-embeds every topic.
+    """
+    started = datetime.utcnow()
+    today = date.today()
+    total_scanned = 0
+    total_embedded = 0
+    total_unchanged = 0
+    total_errors = 0
+
+    with get_sync_db() as session:
+        run_id = log_ingestion_run(
+            session, dag_id="topic_embeddings",
+            run_date=today, status="running", started_at=started
+        )
+        session.commit()
+
+    try:
+        model = get_encoder(encoder)
+        if model.dim != EMBEDDING_DIM:
+            raise ValueError(f"encoder {model.name} produces {model.dim} dims, "
+                             f"Topic.embedding holds {EMBEDDING_DIM}")
+        logger.info("embeddings: starting", encoder=model.name, force=force)
+
+        last_id = None
+        while True:
+            with get_sync_db() as session:
+                rows = session.execute(text("""
+                    SELECT id, name, description, embedding_fingerprint
+                    FROM topics
+                    WHERE is_active = true
+                      AND (CAST(:last_id AS uuid) IS NULL OR id > CAST(:last_id AS uuid))
+                    ORDER BY id
+                    LIMIT :limit
+                """), {"last_id": last_id, "limit": EMBEDDING_SCAN_SIZE}).fetchall()
+            if not rows:
+                break
+            last_id = str(rows[-1].id)
+            total_scanned += len(rows)
+
+            pending = _pending_embeddings(rows, model.name, force)
+            total_unchanged += len(rows) - len(pending)
+            if not pending:
+                continue
+
+            try:
+                vectors = model.encode([content for _, content, _ in pending],
+                                       batch_size=settings.EMBEDDING_BATCH_SIZE)
+                updates = _embedding_updates(pending, vectors)
+                with get_sync_db() as session:
+                    total_embedded += _write_embeddings(session, updates)
+            except Exception as e:
+                logger.warning("embeddings: batch failed", topics=len(pending), error=str(e)[:200])
+                total_errors += len(pending)
+
+            logger.info("embeddings: page done", scanned=total_scanned,
+                        embedded=total_embedded, unchanged=total_unchanged)
+
+        status = "success" if total_errors == 0 else "partial"
+
+    except Exception as e:
+        logger.error("embeddings: fatal error", error=str(e))
+        status = "failed"
+        total_errors += 1
+        with get_sync_db() as session:
+            log_error(session, "topic_embeddings", type(e).__name__, str(e))
+
+    with get_sync_db() as session:
+        update_ingestion_run(session, run_id, status,
+                             total_scanned, total_embedded, total_unchanged, total_errors)
+        log_dq_metric(session, run_id, "embeddings_unchanged", total_unchanged)
+
+    result = {
+        "run_id": run_id, "status": status,
+        "topics_scanned": total_scanned,
+        "topics_embedded": total_embedded,
+        "topics_unchanged": total_unchanged,
+        "errors": total_errors,
+    }
+    logger.info("embeddings: complete", **result)
+    return result
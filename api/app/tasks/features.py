@@ -8,59 +8,291 @@ Computes derived features from source_timeseries for each active topic:
   - volatility_4w
   - reddit_velocity
   - cross_source_correlation
+
+Topics are processed in chunks: one ordered source_timeseries query per
+chunk, features computed for the whole chunk in one vectorized pass
+(app.services.feature_engine), one multi-row upsert per chunk.
+
+Incremental mode only revisits topics with source_timeseries rows newer than
+their feature_state high-water mark (the upsert only bumps created_at when a
+value changes). Rows appended after the stored window roll it forward and
+re-fetched dates inside it are patched in place, without rescanning history;
+rewrites reaching further back fall back to a full reload of that topic.
+
+created_at is stamped by the writer before its transaction commits, so a row
+can become visible after a later-stamped one was already read. The stored
+high-water mark therefore trails the read by HWM_SAFETY_LAG (see
+_high_water_mark) and the next run re-reads that overlap; re-applying a row
+is idempotent. Deleted source_timeseries rows leave nothing newer than the
+mark to find, so incremental runs don't see deletions: a topic whose rows
+were deleted keeps its stored window until a full (incremental=False) run.
 """
-import uuid
-from datetime import datetime, date, timedelta
+import json
+import time
+from bisect import bisect_left
+from datetime import datetime, date, timedelta, timezone
+from typing import Optional
 
 from sqlalchemy import text
 import structlog
 
 from app.tasks import celery_app
-from app.tasks.db_helpers import get_sync_db, log_ingestion_run, update_ingestion_run, log_error
+from app.services.feature_engine import compute_features, GT_WINDOW, REDDIT_WINDOW
+from app.tasks.db_helpers import (
+    get_sync_db, log_ingestion_run, update_ingestion_run, update_ingestion_progress,
+    log_dq_metric, log_error, multi_row_values,
+)
 
 logger = structlog.get_logger()
 
+FEATURES_CHUNK_SIZE = 500  # topics per series query / upsert statement
+# Points kept per series in feature_state. At least GT_WINDOW / REDDIT_WINDOW;
+# the Google Trends one covers the ~90 daily points every "today 3-m" fetch
+# re-upserts, so re-fetched dates are patched in place instead of reloading.
+STATE_GT_POINTS = max(GT_WINDOW, 100)
+STATE_REDDIT_POINTS = max(REDDIT_WINDOW, 31)
+# Longest a writer holds rows it stamped with created_at before committing them
+# (one ingestion batch / flush). Rows stamped within this of a read are re-read.
+HWM_SAFETY_LAG = timedelta(minutes=30)
+# Column the Google Trends series is read from. Stored windows record it, and
+# a window built from another column is discarded and the topic reloaded.
+GT_VALUE_COLUMN = "scaled_value"
 
-def _compute_growth(values: list[float], weeks_back: int) -> float | None:
-    """Compute growth rate: (current - past) / max(past, 1)."""
-    if len(values) < weeks_back + 1:
-        return None
-    current_sma = (values[-1] + values[-2]) / 2 if len(values) >= 2 else values[-1]
-    past_sma = (values[-(weeks_back + 1)] + values[-(weeks_back + 2)]) / 2 if len(values) >= weeks_back + 2 else values[-(weeks_back + 1)]
-    return (current_sma - past_sma) / max(past_sma, 1.0)
 
+def _new_series_entry() -> dict:
+    return {"gt": [], "gt_dates": [], "gt_before": None,
+            "reddit": [], "reddit_dates": [], "reddit_before": None,
+            "sources": set(), "hwm": None}
 
-def _compute_volatility(values: list[float], window: int) -> float | None:
-    """Standard deviation of last N values."""
-    if len(values) < window:
-        return None
-    recent = values[-window:]
-    mean = sum(recent) / len(recent)
-    variance = sum((v - mean) ** 2 for v in recent) / len(recent)
-    return variance ** 0.5
 
+def _set_point(entry: dict, key: str, day: date, value) -> bool:
+    """
+    Set ``day``'s point of series ``key``: append after the last date, patch
+    or insert within the held points, or drop it when the value became NULL.
+    ``<key>_before`` is the max of points already trimmed off the front (None
+    if nothing was), so a change that reaches before the held points returns
+    False: the entry can't apply it and the topic needs a full reload.
+    """
+    values, dates = entry[key], entry[f"{key}_dates"]
+    pos = bisect_left(dates, day)
+    if pos < len(dates) and dates[pos] == day:
+        if value is not None:
+            values[pos] = value
+            return True
+        if entry[f"{key}_before"] is not None:
+            return False  # dropping a point would pull one in from trimmed history
+        del values[pos], dates[pos]
+        return True
+    if value is None:
+        return True
+    if pos == 0 and dates and entry[f"{key}_before"] is not None:
+        return False
+    values.insert(pos, value)
+    dates.insert(pos, day)
+    return True
+
+
+def _apply_row(entry: dict, r) -> bool:
+    """
+    Apply one source_timeseries row to a series entry. Returns False if the
+    row rewrites history older than the entry holds.
+    """
+    entry["sources"].add(r.source)
+    if r.created_at is not None and (entry["hwm"] is None or r.created_at > entry["hwm"]):
+        entry["hwm"] = r.created_at
+    if r.geo != "US":
+        return True
+
+    if r.source == "google_trends":
+        value = float(r.scaled_value) if r.scaled_value is not None else None
+        return _set_point(entry, "gt", r.date, value)
+    if r.source == "reddit":
+        value = float(r.raw_value) if r.raw_value is not None else None
+        return _set_point(entry, "reddit", r.date, value)
+    return True
+
+
+def _all_time_high(entry: dict) -> Optional[float]:
+    """Max Google Trends value over the topic's full history."""
+    held = max(entry["gt"]) if entry["gt"] else None
+    before = entry["gt_before"]
+    if held is None or before is None:
+        return before if held is None else held
+    return max(held, before)
+
+
+def _load_series_chunk(session, topic_ids: list[str]) -> dict[str, dict]:
+    """
+    Load full source_timeseries history for a chunk of topics in a single
+    ordered query. Returns {topic_id: series entry}.
+    """
+    series = {tid: _new_series_entry() for tid in topic_ids}
+    if not topic_ids:
+        return series
+
+    rows = session.execute(text("""
+        SELECT topic_id, source, geo, date, raw_value, scaled_value, created_at
+        FROM source_timeseries
+        WHERE topic_id = ANY(CAST(:tids AS uuid[]))
+        ORDER BY topic_id, source, date ASC
+    """), {"tids": topic_ids}).fetchall()
 
-def _compute_sma(values: list[float], window: int) -> float | None:
-    """Simple moving average of last N values."""
-    if len(values) < window:
+    for r in rows:
+        _apply_row(series[str(r.topic_id)], r)
+
+    return series
+
+
+def _get_changed_topics(session) -> list:
+    """
+    Active topics with no feature_state yet or with rows past their
+    high-water mark. Topics whose rows were only deleted are not found.
+    """
+    return session.execute(text("""
+        SELECT t.id, t.name, fs.high_water_mark, fs.window_json
+        FROM topics t
+        LEFT JOIN feature_state fs ON fs.topic_id = t.id
+        WHERE t.is_active = true
+          AND (fs.topic_id IS NULL OR fs.high_water_mark IS NULL OR EXISTS (
+              SELECT 1 FROM source_timeseries ts
+              WHERE ts.topic_id = t.id AND ts.created_at > fs.high_water_mark
+          ))
+        ORDER BY t.id
+    """)).fetchall()
+
+
+def _entry_from_state(window: dict, high_water_mark: datetime) -> Optional[dict]:
+    """
+    Series entry from a stored window; None for a state written before dates
+    were kept or built from another Google Trends value column.
+    """
+    if "gt_dates" not in window or "reddit_dates" not in window:
         return None
-    return sum(values[-window:]) / window
+    if window.get("gt_value") != GT_VALUE_COLUMN:
+        return None
+    entry = _new_series_entry()
+    for key in ("gt", "reddit"):
+        entry[key] = list(window[key])
+        entry[f"{key}_dates"] = [date.fromisoformat(d) for d in window[f"{key}_dates"]]
+        entry[f"{key}_before"] = window[f"{key}_before"]
+    entry["sources"] = set(window.get("sources", []))
+    entry["hwm"] = high_water_mark
+    return entry
+
+
+def _roll_forward_chunk(session, entries: dict[str, dict]) -> list[str]:
+    """
+    Apply rows newer than each topic's high-water mark to its stored window.
+    Returns the topic ids whose history was rewritten and need a full reload.
+    """
+    if not entries:
+        return []
+
+    topic_ids = list(entries)
+    rows = session.execute(text("""
+        SELECT ts.topic_id, ts.source, ts.geo, ts.date, ts.raw_value,
+               ts.scaled_value, ts.created_at
+        FROM unnest(CAST(:tids AS uuid[]), CAST(:hwms AS timestamptz[])) AS w(topic_id, hwm)
+        JOIN source_timeseries ts ON ts.topic_id = w.topic_id AND ts.created_at > w.hwm
+        ORDER BY ts.topic_id, ts.source, ts.date ASC
+    """), {"tids": topic_ids, "hwms": [entries[tid]["hwm"] for tid in topic_ids]}).fetchall()
+
+    rewritten = set()
+    for r in rows:
+        tid = str(r.topic_id)
+        if tid in rewritten:
+            continue
+        if not _apply_row(entries[tid], r):
+            rewritten.add(tid)
+    return list(rewritten)
+
+
+def _high_water_mark(latest: Optional[datetime], read_started: datetime) -> datetime:
+    """
+    High-water mark to store after reading a topic's rows: the newest
+    created_at read, but no later than HWM_SAFETY_LAG before the read
+    started, so rows stamped before the read and committed after it are
+    still newer than the mark next time.
+    """
+    cutoff = read_started - HWM_SAFETY_LAG
+    return cutoff if latest is None else min(latest, cutoff)
+
+
+def _state_row(topic_id: str, entry: dict, now: datetime, read_started: datetime) -> dict:
+    """
+    feature_state row holding each series' trailing points with their dates,
+    plus the max of everything trimmed off, so later runs can append, patch
+    re-fetched dates in place and keep the all-time high exact.
+    """
+    window = {"sources": sorted(entry["sources"]), "gt_value": GT_VALUE_COLUMN}
+    for key, held in (("gt", STATE_GT_POINTS), ("reddit", STATE_REDDIT_POINTS)):
+        values, dates, before = entry[key], entry[f"{key}_dates"], entry[f"{key}_before"]
+        if len(values) > held:
+            trimmed = max(values[:-held])
+            before = trimmed if before is None else max(before, trimmed)
+        window[key] = values[-held:]
+        window[f"{key}_dates"] = [d.isoformat() for d in dates[-held:]]
+        window[f"{key}_before"] = before
+    return {
+        "topic_id": topic_id,
+        "high_water_mark": _high_water_mark(entry["hwm"], read_started),
+        "window_json": json.dumps(window),
+        "updated_at": now,
+    }
+
+
+def _upsert_feature_state(session, rows: list[dict]) -> None:
+    if not rows:
+        return
+    values_sql, params = multi_row_values(
+        rows, ["topic_id", "high_water_mark", "window_json", "updated_at"]
+    )
+    session.execute(text(f"""
+        INSERT INTO feature_state (topic_id, high_water_mark, window_json, updated_at)
+        VALUES {values_sql}
+        ON CONFLICT (topic_id)
+        DO UPDATE SET high_water_mark = EXCLUDED.high_water_mark,
+                      window_json = EXCLUDED.window_json,
+                      updated_at = EXCLUDED.updated_at
+    """), params)
+
+
+def _upsert_feature_rows(session, rows: list[dict]) -> int:
+    """Write derived_features rows with one multi-row upsert. Returns row count."""
+    if not rows:
+        return 0
+    values_sql, params = multi_row_values(
+        rows, ["topic_id", "date", "feature_name", "feature_value", "created_at"]
+    )
+    session.execute(text(f"""
+        INSERT INTO derived_features (topic_id, date, feature_name, feature_value, created_at)
+        VALUES {values_sql}
+        ON CONFLICT (topic_id, date, feature_name)
+        DO UPDATE SET feature_value = EXCLUDED.feature_value, created_at = EXCLUDED.created_at
+    """), params)
+    return len(rows)
 
 
 @celery_app.task(name="app.tasks.features.generate_features",
                  bind=True, max_retries=1, default_retry_delay=120)
-def generate_features(self):
+def generate_features(self, chunk_size: int = FEATURES_CHUNK_SIZE, incremental: bool = False):
     """
     Compute derived features for all active topics from source_timeseries.
     Runs daily after ingestion tasks complete.
+
+    Topics are processed ``chunk_size`` at a time; each chunk's timing is
+    recorded as a dq_metrics row against the run. With ``incremental`` only
+    topics whose series changed since the last run are recomputed; the rest
+    are counted as skipped.
     """
     started = datetime.utcnow()
     today = date.today()
     total_topics = 0
     total_features = 0
+    total_skipped = 0
     total_errors = 0
 
-    logger.info("feature_generation: starting")
+    logger.info("feature_generation: starting", chunk_size=chunk_size, incremental=incremental)
 
     with get_sync_db() as session:
         run_id = log_ingestion_run(
@@ -71,118 +303,88 @@ def generate_features(self):
 
     try:
         with get_sync_db() as session:
-            topics = session.execute(text("""
-                SELECT id, name, stage FROM topics WHERE is_active = true
-            """)).fetchall()
-
-        for topic in topics:
-            topic_id = str(topic.id)
-            total_topics += 1
+            if incremental:
+                topics = _get_changed_topics(session)
+                active_count = session.execute(text(
+                    "SELECT COUNT(*) FROM topics WHERE is_active = true"
+                )).scalar()
+                total_skipped = active_count - len(topics)
+            else:
+                topics = session.execute(text("""
+                    SELECT id, name FROM topics WHERE is_active = true
+                    ORDER BY id
+                """)).fetchall()
+
+        logger.info("feature_generation: topics to process",
+                     count=len(topics), skipped=total_skipped)
+
+        chunks = [topics[i:i + chunk_size] for i in range(0, len(topics), chunk_size)]
+
+        for chunk_idx, chunk in enumerate(chunks):
+            chunk_started = time.monotonic()
+            read_started = datetime.now(timezone.utc)
+            topic_ids = [str(t.id) for t in chunk]
 
             try:
                 with get_sync_db() as session:
-                    # Get Google Trends timeseries (weekly, sorted by date)
-                    gt_rows = session.execute(text("""
-                        SELECT date, normalized_value
-                        FROM source_timeseries
-                        WHERE topic_id = :tid AND source = 'google_trends' AND geo = 'US'
-                        ORDER BY date ASC
-                    """), {"tid": topic_id}).fetchall()
-
-                    gt_values = [float(r.normalized_value) for r in gt_rows if r.normalized_value is not None]
-
-                    # Get Reddit timeseries
-                    reddit_rows = session.execute(text("""
-                        SELECT date, raw_value
-                        FROM source_timeseries
-                        WHERE topic_id = :tid AND source = 'reddit' AND geo = 'US'
-                        ORDER BY date ASC
-                    """), {"tid": topic_id}).fetchall()
-
-                    reddit_values = [float(r.raw_value) for r in reddit_rows if r.raw_value is not None]
-
-                    # Count distinct sources
-                    src_count = session.execute(text("""
-                        SELECT COUNT(DISTINCT source) FROM source_timeseries
-                        WHERE topic_id = :tid
-                    """), {"tid": topic_id}).scalar()
-
-                # Compute features from Google Trends
-                features = {}
-
-                if len(gt_values) >= 2:
-                    features["value_latest"] = gt_values[-1]
-
-                if len(gt_values) >= 4:
-                    features["growth_1w"] = _compute_growth(gt_values, 1)
-                    features["sma_4w"] = _compute_sma(gt_values, 4)
-                    features["volatility_4w"] = _compute_volatility(gt_values, 4)
-
-                if len(gt_values) >= 6:
-                    features["growth_4w"] = _compute_growth(gt_values, 4)
-
-                    # Acceleration: growth_1w[t] - growth_1w[t-1]
-                    g1w_current = _compute_growth(gt_values, 1)
-                    g1w_prev = _compute_growth(gt_values[:-1], 1) if len(gt_values) > 2 else None
-                    if g1w_current is not None and g1w_prev is not None:
-                        features["acceleration"] = g1w_current - g1w_prev
-
-                if len(gt_values) >= 14:
-                    features["growth_12w"] = _compute_growth(gt_values, 12)
-                    features["sma_12w"] = _compute_sma(gt_values, 12)
-
-                # Volume percentile (compared to all-time high)
-                if gt_values:
-                    ath = max(gt_values)
-                    features["volume_percentile"] = (gt_values[-1] / max(ath, 1)) * 100
-
-                # Reddit velocity
-                if len(reddit_values) >= 2:
-                    r_current = reddit_values[-1]
-                    r_prev = reddit_values[-2] if len(reddit_values) >= 2 else 0
-                    features["reddit_velocity"] = (r_current - r_prev) / max(r_prev, 1)
-
-                # Cross-source info
-                features["source_count"] = src_count or 0
-
-                # Cross-source correlation (Google vs Reddit)
-                if len(gt_values) >= 12 and len(reddit_values) >= 12:
-                    # Simple Pearson correlation on last 12 points
-                    n = min(12, len(gt_values), len(reddit_values))
-                    g = gt_values[-n:]
-                    r = reddit_values[-n:]
-                    g_mean = sum(g) / n
-                    r_mean = sum(r) / n
-                    num = sum((gi - g_mean) * (ri - r_mean) for gi, ri in zip(g, r))
-                    den_g = sum((gi - g_mean) ** 2 for gi in g) ** 0.5
-                    den_r = sum((ri - r_mean) ** 2 for ri in r) ** 0.5
-                    if den_g > 0 and den_r > 0:
-                        features["cross_source_correlation"] = num / (den_g * den_r)
-
-                # Upsert features into derived_features
+                    series = {}
+                    if incremental:
+                        for t in chunk:
+                            if t.window_json is not None and t.high_water_mark is not None:
+                                entry = _entry_from_state(t.window_json, t.high_water_mark)
+                                if entry is not None:
+                                    series[str(t.id)] = entry
+                        for tid in _roll_forward_chunk(session, series):
+                            del series[tid]
+                    missing = [tid for tid in topic_ids if tid not in series]
+                    series.update(_load_series_chunk(session, missing))
+                load_seconds = time.monotonic() - chunk_started
+
+                now = datetime.utcnow()
+                chunk_features = compute_features(
+                    [series[tid]["gt"] for tid in topic_ids],
+                    [series[tid]["reddit"] for tid in topic_ids],
+                    [len(series[tid]["sources"]) for tid in topic_ids],
+                    [_all_time_high(series[tid]) for tid in topic_ids],
+                )
+                total_topics += len(chunk)
+
+                rows = [
+                    {
+                        "topic_id": topic_id, "date": today,
+                        "feature_name": feature_name,
+                        "feature_value": round(feature_value, 4),
+                        "created_at": now,
+                    }
+                    for topic_id, features in zip(topic_ids, chunk_features)
+                    for feature_name, feature_value in features.items()
+                ]
+
+                with get_sync_db() as session:
+                    total_features += _upsert_feature_rows(session, rows)
+                    _upsert_feature_state(session, [
+                        _state_row(tid, series[tid], now, read_started) for tid in topic_ids
+                    ])
+
+                chunk_seconds = time.monotonic() - chunk_started
                 with get_sync_db() as session:
-                    for feature_name, feature_value in features.items():
-                        if feature_value is None:
-                            continue
-                        session.execute(text("""
-                            INSERT INTO derived_features (topic_id, date, feature_name, feature_value, created_at)
-                            VALUES (:tid, :dt, :fname, :fval, :now)
-                            ON CONFLICT (topic_id, date, feature_name)
-                            DO UPDATE SET feature_value = :fval, created_at = :now
-                        """), {
-                            "tid": topic_id, "dt": today,
-                            "fname": feature_name, "fval": round(float(feature_value), 4),
-                            "now": datetime.utcnow(),
-                        })
-                        total_features += 1
+                    log_dq_metric(session, run_id, f"feature_chunk_{chunk_idx}_seconds",
+                                  round(chunk_seconds, 3))
+                    update_ingestion_progress(session, run_id, total_topics,
+                                              total_features, total_skipped, total_errors)
+
+                logger.info("feature_generation: chunk complete",
+                             chunk=chunk_idx + 1, chunks=len(chunks), topics=len(chunk),
+                             features=len(rows), load_seconds=round(load_seconds, 3),
+                             total_seconds=round(chunk_seconds, 3))
 
             except Exception as e:
                 total_errors += 1
-                logger.error("feature_generation: topic error",
-                              topic=topic.name, error=str(e))
+                logger.error("feature_generation: chunk error",
+                              chunk=chunk_idx, error=str(e))
                 with get_sync_db() as session:
                     log_error(session, "feature_generation", type(e).__name__,
-                              str(e), {"topic_id": topic_id})
+                              str(e), {"chunk": chunk_idx, "topic_ids": topic_ids})
 
         status = "success" if total_errors == 0 else "partial"
 
@@ -195,12 +397,12 @@ def generate_features(self):
 
     with get_sync_db() as session:
         update_ingestion_run(session, run_id, status,
-                              total_topics, total_features, 0, total_errors)
+                              total_topics, total_features, total_skipped, total_errors)
 
     result = {
-        "run_id": run_id, "status": status,
+        "run_id": run_id, "status": status, "incremental": incremental,
         "topics_processed": total_topics, "features_computed": total_features,
-        "errors": total_errors,
+        "skipped": total_skipped, "errors": total_errors,
     }
     logger.info("feature_generation: complete", **result)
     return result
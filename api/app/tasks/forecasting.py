@@ -4,9 +4,31 @@ Forecasting task.
 Runs forecasting on active topics with >= 26 weekly datapoints.
 Uses Prophet if available and working, otherwise falls back to
 linear trend + seasonal decomposition.
+
+generate_forecasts is a coordinator: it splits eligible topics into id
+ranges and runs them as a chord of forecast_topic_range tasks, so the run
+scales across worker nodes; merge_forecast_results folds the chunk counts
+into the run's ingestion_runs row. A single range can be re-run on its own
+without refitting the rest of the catalog.
+
+Inside each range task, series loading and persistence happen in the task
+process; model fits fan out to a billiard process pool (Celery's
+multiprocessing fork, which may be used from inside prefork workers) with a
+hard per-fit timeout. Range tasks are routed to FORECAST_QUEUE, whose workers
+run one task at a time, so each host runs one pool of FORECAST_WORKERS
+processes instead of one per prefork child. When Prophet is not installed, the linear+seasonal
+model is fitted for a whole chunk in one vectorized call instead. Each
+chunk's forecasts are written in one transaction through a staging table, so
+a topic's forecast set is swapped atomically.
+
+Each forecast row stores a fingerprint of the series, model and parameters it
+was fitted from. Topics whose fingerprint is unchanged since the last run keep
+their existing forecasts and are not refitted.
 """
 import uuid
 import math
+import json
+import hashlib
 from datetime import datetime, date, timedelta
 
 import pandas as pd
@@ -14,70 +36,107 @@ import numpy as np
 from sqlalchemy import text
 import structlog
 
+from celery import chord, group
+
+from app.config import get_settings
+from app.services.cache_versions import bump_generations
 from app.tasks import celery_app
-from app.tasks.db_helpers import get_sync_db, log_ingestion_run, update_ingestion_run, log_error
+from app.tasks.db_helpers import (
+    get_sync_db, log_ingestion_run, update_ingestion_run, increment_ingestion_progress,
+    log_dq_metric, log_error, multi_row_values,
+)
 
 logger = structlog.get_logger()
+settings = get_settings()
 
 MIN_DATAPOINTS = 26  # ~6 months of weekly data
-MODEL_VERSION = "linear_seasonal_v1"
-
-
-def _linear_seasonal_forecast(df: pd.DataFrame, periods: int = 26) -> pd.DataFrame:
+MODEL_VERSION = "linear_seasonal_v2"
+FORECAST_CEILING_MULTIPLE = 2.0  # forecasts are clamped to [0, this x the series max]
+FORECAST_PERIODS = 26
+FORECAST_CHUNK_SIZE = 200  # topics loaded, fitted and persisted per round
+FORECAST_RANGE_SIZE = 1000  # topics per chord subtask
+FORECAST_MAX_TASKS_PER_CHILD = 100  # recycle pool workers (Prophet/Stan leak memory)
+FORECAST_INSERT_BATCH = 1000  # rows per multi-row VALUES statement
+FORECAST_COLUMNS = [
+    "id", "topic_id", "horizon_months", "forecast_date", "yhat", "yhat_lower",
+    "yhat_upper", "model_version", "input_fingerprint", "generated_at",
+]
+
+PROPHET_PARAMS = {
+    "yearly_seasonality": True,
+    "weekly_seasonality": False,
+    "changepoint_prior_scale": 0.1,
+    "interval_width": 0.80,
+}
+
+
+def _linear_seasonal_forecast_batch(Y: np.ndarray, periods: int = 26):
     """
-    Simple but effective forecast: linear trend + seasonal pattern.
-    Works without Prophet/cmdstanpy dependencies.
+    Linear trend + seasonal pattern for many equal-length weekly series at once.
 
-    Returns DataFrame with columns: ds, yhat, yhat_lower, yhat_upper
+    ``Y`` is a [n_topics, n_weeks] matrix of aligned series. Trends are solved
+    by least squares for every row together and seasonal means are aggregated
+    with np.add.at / np.bincount. Returns (yhat, yhat_lower, yhat_upper), each
+    [n_topics, periods].
     """
-    df = df.copy().sort_values("ds").reset_index(drop=True)
-    n = len(df)
+    Y = np.asarray(Y, dtype=float)
+    n = Y.shape[1]
 
     # Encode time as numeric (weeks from start)
-    df["t"] = np.arange(n, dtype=float)
-    y = df["y"].values.astype(float)
-    t = df["t"].values
+    t = np.arange(n, dtype=float)
 
     # ── Linear trend via least squares ──
     t_mean = t.mean()
-    y_mean = y.mean()
-    slope = np.sum((t - t_mean) * (y - y_mean)) / max(np.sum((t - t_mean) ** 2), 1e-10)
+    y_mean = Y.mean(axis=1, keepdims=True)
+    slope = np.sum((t - t_mean) * (Y - y_mean), axis=1, keepdims=True) / max(np.sum((t - t_mean) ** 2), 1e-10)
     intercept = y_mean - slope * t_mean
 
     trend = intercept + slope * t
 
     # ── Seasonal component (52-week period) ──
-    residuals = y - trend
-    seasonal_period = min(52, n // 2)  # Use 52 weeks or half the data
-    seasonal = np.zeros(seasonal_period)
-    counts = np.zeros(seasonal_period)
-
-    for i in range(n):
-        idx = i % seasonal_period
-        seasonal[idx] += residuals[i]
-        counts[idx] += 1
-
-    seasonal = seasonal / np.maximum(counts, 1)
+    residuals = Y - trend
+    seasonal_period = max(1, min(52, n // 2))  # Use 52 weeks or half the data
+    phase = np.arange(n) % seasonal_period
+    seasonal = np.zeros((seasonal_period, Y.shape[0]))
+    np.add.at(seasonal, phase, residuals.T)
+    counts = np.bincount(phase, minlength=seasonal_period)
+
+    seasonal = seasonal.T / np.maximum(counts, 1)
     # Center the seasonal component
-    seasonal -= seasonal.mean()
+    seasonal -= seasonal.mean(axis=1, keepdims=True)
 
     # ── Residual std for confidence intervals ──
-    fitted = trend + np.array([seasonal[i % seasonal_period] for i in range(n)])
-    residual_std = np.std(y - fitted)
+    fitted = trend + seasonal[:, phase]
+    residual_std = np.std(Y - fitted, axis=1, keepdims=True)
 
     # ── Generate future predictions ──
     future_t = np.arange(n, n + periods, dtype=float)
     future_trend = intercept + slope * future_t
-    future_seasonal = np.array([seasonal[int(i) % seasonal_period] for i in future_t])
+    future_seasonal = seasonal[:, np.arange(n, n + periods) % seasonal_period]
     future_yhat = future_trend + future_seasonal
 
-    # Clamp to reasonable range [0, 200]
-    future_yhat = np.clip(future_yhat, 0, 200)
+    # Clamp to [0, a multiple of each series' max]; global-scale Trends values
+    # aren't bounded by 100, so a fixed ceiling would flatten popular topics.
+    ceiling = np.maximum(FORECAST_CEILING_MULTIPLE * Y.max(axis=1, keepdims=True), 1.0)
+    future_yhat = np.clip(future_yhat, 0, ceiling)
 
     # Confidence intervals widen over time
     ci_widths = residual_std * np.sqrt(1 + (np.arange(periods) / periods))
-    future_lower = np.clip(future_yhat - 1.28 * ci_widths, 0, 200)  # 80% CI
-    future_upper = np.clip(future_yhat + 1.28 * ci_widths, 0, 200)
+    future_lower = np.clip(future_yhat - 1.28 * ci_widths, 0, ceiling)  # 80% CI
+    future_upper = np.clip(future_yhat + 1.28 * ci_widths, 0, ceiling)
+
+    return future_yhat, future_lower, future_upper
+
+
+def _linear_seasonal_forecast(df: pd.DataFrame, periods: int = 26) -> pd.DataFrame:
+    """
+    Simple but effective forecast: linear trend + seasonal pattern.
+    Works without Prophet/cmdstanpy dependencies.
+
+    Returns DataFrame with columns: ds, yhat, yhat_lower, yhat_upper
+    """
+    df = df.sort_values("ds")
+    yhat, lower, upper = _linear_seasonal_forecast_batch(df["y"].values[np.newaxis, :], periods)
 
     # Build future dates
     last_date = df["ds"].max()
@@ -85,12 +144,49 @@ def _linear_seasonal_forecast(df: pd.DataFrame, periods: int = 26) -> pd.DataFra
 
     return pd.DataFrame({
         "ds": future_dates,
-        "yhat": future_yhat,
-        "yhat_lower": future_lower,
-        "yhat_upper": future_upper,
+        "yhat": yhat[0],
+        "yhat_lower": lower[0],
+        "yhat_upper": upper[0],
     })
 
 
+def _linear_seasonal_results(series: dict[str, tuple[list, list]],
+                             periods: int = FORECAST_PERIODS) -> dict[str, dict]:
+    """
+    Fit the linear+seasonal model for many topics, one batched call per
+    distinct series length. Returns results shaped like _fit_forecast's.
+    """
+    by_length = {}
+    for topic_id, (ds, y) in series.items():
+        by_length.setdefault(len(y), []).append(topic_id)
+
+    results = {}
+    for topic_ids in by_length.values():
+        Y = np.array([series[tid][1] for tid in topic_ids], dtype=float)
+        yhat, lower, upper = _linear_seasonal_forecast_batch(Y, periods)
+        for row, topic_id in enumerate(topic_ids):
+            last_date = series[topic_id][0][-1]
+            results[topic_id] = {
+                "topic_id": topic_id,
+                "model": MODEL_VERSION,
+                "last_date": last_date,
+                "points": [
+                    (last_date + timedelta(weeks=i + 1),
+                     float(yhat[row, i]), float(lower[row, i]), float(upper[row, i]))
+                    for i in range(periods)
+                ],
+            }
+    return results
+
+
+def _prophet_available() -> bool:
+    try:
+        import prophet  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
 def _try_prophet_forecast(df: pd.DataFrame, periods: int = 26) -> pd.DataFrame | None:
     """Try Prophet first; return None if it fails."""
     try:
@@ -100,12 +196,7 @@ def _try_prophet_forecast(df: pd.DataFrame, periods: int = 26) -> pd.DataFrame |
 
         from prophet import Prophet
 
-        m = Prophet(
-            yearly_seasonality=True,
-            weekly_seasonality=False,
-            changepoint_prior_scale=0.1,
-            interval_width=0.80,
-        )
+        m = Prophet(**PROPHET_PARAMS)
         m.fit(df)
 
         future = m.make_future_dataframe(periods=periods, freq="W")
@@ -120,21 +211,366 @@ def _try_prophet_forecast(df: pd.DataFrame, periods: int = 26) -> pd.DataFrame |
         return None
 
 
+def _fit_forecast(topic_id: str, ds: list, y: list, periods: int = FORECAST_PERIODS) -> dict:
+    """
+    Fit one topic's series. Runs inside a pool worker, so it takes and returns
+    plain lists. Tries Prophet first, falls back to linear+seasonal.
+    """
+    df = pd.DataFrame({"ds": pd.to_datetime(ds), "y": y})
+    df = df.sort_values("ds").drop_duplicates(subset=["ds"]).dropna(subset=["y"])
+
+    forecast_df = _try_prophet_forecast(df, periods=periods)
+    model_used = "prophet_v1"
+
+    if forecast_df is None or forecast_df.empty:
+        forecast_df = _linear_seasonal_forecast(df, periods=periods)
+        model_used = MODEL_VERSION
+
+    return {
+        "topic_id": topic_id,
+        "model": model_used,
+        "last_date": df["ds"].max().date(),
+        "points": [
+            (row.ds.date() if hasattr(row.ds, "date") else row.ds,
+             float(row.yhat), float(row.yhat_lower), float(row.yhat_upper))
+            for row in forecast_df.itertuples(index=False)
+        ],
+    }
+
+
+def _load_series_chunk(session, topic_ids: list[str]) -> dict[str, tuple[list, list]]:
+    """Load Google Trends series for a chunk of topics in one ordered query."""
+    series = {tid: ([], []) for tid in topic_ids}
+    rows = session.execute(text("""
+        SELECT topic_id, date AS ds, scaled_value AS y
+        FROM source_timeseries
+        WHERE topic_id = ANY(CAST(:tids AS uuid[]))
+            AND source = 'google_trends' AND geo = 'US'
+            AND scaled_value IS NOT NULL
+        ORDER BY topic_id, date ASC
+    """), {"tids": topic_ids}).fetchall()
+    for r in rows:
+        ds, y = series[str(r.topic_id)]
+        ds.append(r.ds)
+        y.append(float(r.y))
+    return series
+
+
+def _series_fingerprint(ds: list, y: list, model_key: str,
+                        periods: int = FORECAST_PERIODS) -> str:
+    """Hash of a topic's (date, scaled_value) series plus model version and params."""
+    h = hashlib.sha256()
+    h.update(json.dumps({
+        "model": model_key,
+        "params": PROPHET_PARAMS if model_key == "prophet_v1" else {},
+        "periods": periods,
+    }, sort_keys=True).encode())
+    for d, v in zip(ds, y):
+        h.update(f"{d.isoformat()}={v:.6f};".encode())
+    return h.hexdigest()
+
+
+def _get_fingerprints(session, topic_ids: list[str]) -> dict[str, str]:
+    """Fingerprint of each topic's current forecast set, if any."""
+    rows = session.execute(text("""
+        SELECT DISTINCT ON (topic_id) topic_id, input_fingerprint
+        FROM forecasts
+        WHERE topic_id = ANY(CAST(:tids AS uuid[])) AND input_fingerprint IS NOT NULL
+        ORDER BY topic_id, generated_at DESC
+    """), {"tids": topic_ids}).fetchall()
+    return {str(r.topic_id): r.input_fingerprint for r in rows if r.input_fingerprint}
+
+
+def _forecast_rows(result: dict, now: datetime) -> list[dict]:
+    """forecasts rows for one fitted result, all stamped with the same generated_at."""
+    rows = []
+    for fdate, yhat, lower, upper in result["points"]:
+        weeks_ahead = max(1, (fdate - result["last_date"]).days // 7)
+        rows.append({
+            "id": str(uuid.uuid4()),
+            "topic_id": result["topic_id"],
+            "horizon_months": 3 if weeks_ahead <= 13 else 6,
+            "forecast_date": fdate,
+            "yhat": round(yhat, 2),
+            "yhat_lower": round(lower, 2),
+            "yhat_upper": round(upper, 2),
+            "model_version": result["model"],
+            "input_fingerprint": result.get("fingerprint"),
+            "generated_at": now,
+        })
+    return rows
+
+
+def _persist_forecasts(session, results: list[dict]) -> int:
+    """
+    Replace the forecasts of every topic in ``results`` in one transaction.
+    Returns rows written.
+
+    New rows are bulk-loaded into a temp staging table first, then swapped in
+    with one DELETE and one INSERT ... SELECT, so readers see either a topic's
+    previous forecast set or the complete new one, never a mix of the two.
+    Every stored row of a written topic is replaced, whatever its model
+    version (an older MODEL_VERSION, prophet_v1 after a linear fallback or
+    the other way round, the forecasting_weekly DAG's rows), so a topic only
+    ever holds one forecast set.
+    """
+    if not results:
+        return 0
+
+    now = datetime.utcnow()
+    rows = [row for result in results for row in _forecast_rows(result, now)]
+
+    session.execute(text("""
+        CREATE TEMP TABLE forecasts_staging
+            (LIKE forecasts INCLUDING DEFAULTS) ON COMMIT DROP
+    """))
+    for i in range(0, len(rows), FORECAST_INSERT_BATCH):
+        values_sql, params = multi_row_values(rows[i:i + FORECAST_INSERT_BATCH], FORECAST_COLUMNS)
+        session.execute(text(f"""
+            INSERT INTO forecasts_staging ({", ".join(FORECAST_COLUMNS)})
+            VALUES {values_sql}
+        """), params)
+
+    session.execute(text("""
+        DELETE FROM forecasts
+        WHERE topic_id IN (SELECT DISTINCT topic_id FROM forecasts_staging)
+    """))
+    session.execute(text(f"""
+        INSERT INTO forecasts ({", ".join(FORECAST_COLUMNS)})
+        SELECT {", ".join(FORECAST_COLUMNS)} FROM forecasts_staging
+    """))
+    return len(rows)
+
+
+def _get_eligible_topics(session, first_id: str = None, last_id: str = None) -> list:
+    """Active topics with enough Google Trends history, optionally within an id range."""
+    return session.execute(text("""
+        SELECT t.id, t.name, COUNT(ts.id) as datapoints
+        FROM topics t
+        JOIN source_timeseries ts ON ts.topic_id = t.id
+            AND ts.source = 'google_trends' AND ts.geo = 'US'
+        WHERE t.is_active = true
+            AND (CAST(:first_id AS uuid) IS NULL OR t.id >= CAST(:first_id AS uuid))
+            AND (CAST(:last_id AS uuid) IS NULL OR t.id <= CAST(:last_id AS uuid))
+        GROUP BY t.id, t.name
+        HAVING COUNT(ts.id) >= :min_pts
+        ORDER BY t.id
+    """), {"min_pts": MIN_DATAPOINTS, "first_id": first_id, "last_id": last_id}).fetchall()
+
+
+def _forecast_topics(run_id: str, topics: list, workers: int, fit_timeout: int) -> dict:
+    """
+    Load, fit and persist forecasts for the given topics, adding each chunk's
+    counts to the run as it completes. Topics whose series fingerprint matches
+    their stored forecasts keep those rows and are not refitted.
+    Returns {"topics", "forecasts", "skipped", "cached", "errors"} counts.
+    """
+    counts = {"topics": 0, "forecasts": 0, "skipped": 0, "cached": 0, "errors": 0}
+    pool = None
+    # Without Prophet every fit would fall back to linear+seasonal anyway,
+    # so fit each chunk in one batched call instead of per-topic pool jobs.
+    batched = not _prophet_available()
+    model_key = MODEL_VERSION if batched else "prophet_v1"
+
+    try:
+        if workers > 1 and not batched:
+            from billiard.pool import Pool
+            pool = Pool(processes=workers, timeout=fit_timeout,
+                        maxtasksperchild=FORECAST_MAX_TASKS_PER_CHILD)
+
+        chunks = [topics[i:i + FORECAST_CHUNK_SIZE] for i in range(0, len(topics), FORECAST_CHUNK_SIZE)]
+
+        for chunk in chunks:
+            before = dict(counts)
+            names = {str(t.id): t.name for t in chunk}
+            with get_sync_db() as session:
+                series = _load_series_chunk(session, list(names))
+                stored = _get_fingerprints(session, list(names))
+
+            eligible = {}
+            fingerprints = {}
+            for topic_id, (ds, y) in series.items():
+                counts["topics"] += 1
+                if len(set(ds)) < MIN_DATAPOINTS:
+                    counts["skipped"] += 1
+                    continue
+                fingerprints[topic_id] = _series_fingerprint(ds, y, model_key)
+                if stored.get(topic_id) == fingerprints[topic_id]:
+                    counts["cached"] += 1
+                    continue
+                eligible[topic_id] = (ds, y)
+
+            # Submit every eligible fit in the chunk before collecting any
+            batch_results = _linear_seasonal_results(eligible) if batched else {}
+            pending = []
+            for topic_id, (ds, y) in eligible.items():
+                if pool is not None:
+                    pending.append((topic_id, pool.apply_async(_fit_forecast, (topic_id, ds, y))))
+                else:
+                    pending.append((topic_id, None))
+
+            fitted = []
+            for topic_id, async_result in pending:
+                try:
+                    if batched:
+                        result = batch_results[topic_id]
+                    elif async_result is not None:
+                        result = async_result.get()
+                    else:
+                        ds, y = series[topic_id]
+                        result = _fit_forecast(topic_id, ds, y)
+                    result["fingerprint"] = fingerprints[topic_id]
+                    fitted.append(result)
+
+                    logger.debug("forecasting: topic fitted", topic=names[topic_id],
+                                  model=result["model"], points=len(result["points"]))
+
+                except Exception as e:
+                    counts["errors"] += 1
+                    logger.error("forecasting: topic error", topic=names[topic_id],
+                                  error=f"{type(e).__name__}: {e}")
+                    with get_sync_db() as session:
+                        log_error(session, "forecasting_weekly", type(e).__name__,
+                                  str(e), {"topic_id": topic_id})
+
+            try:
+                with get_sync_db() as session:
+                    counts["forecasts"] += _persist_forecasts(session, fitted)
+            except Exception as e:
+                counts["errors"] += len(fitted)
+                logger.error("forecasting: chunk write error", topics=len(fitted),
+                              error=f"{type(e).__name__}: {e}")
+                with get_sync_db() as session:
+                    log_error(session, "forecasting_weekly", type(e).__name__, str(e),
+                              {"topic_ids": [r["topic_id"] for r in fitted]})
+
+            with get_sync_db() as session:
+                increment_ingestion_progress(
+                    session, run_id,
+                    counts["topics"] - before["topics"],
+                    counts["forecasts"] - before["forecasts"],
+                    counts["skipped"] - before["skipped"],
+                    counts["errors"] - before["errors"],
+                )
+            logger.info("forecasting: progress", topics=counts["topics"], of=len(topics),
+                         forecasts=counts["forecasts"], cached=counts["cached"],
+                         errors=counts["errors"])
+
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    return counts
+
+
+@celery_app.task(name="app.tasks.forecasting.forecast_topic_range",
+                 bind=True, max_retries=2, default_retry_delay=120)
+def forecast_topic_range(self, run_id: str = None, first_id: str = None, last_id: str = None,
+                         workers: int = None, fit_timeout: int = None):
+    """
+    Forecast the eligible topics whose ids fall in [first_id, last_id].
+
+    Runs as one member of the generate_forecasts chord. Called on its own
+    (run_id=None) it records a separate ingestion run, which is how a failed
+    range is re-run without touching the rest of the catalog.
+    """
+    workers = settings.FORECAST_WORKERS if workers is None else workers
+    fit_timeout = settings.FORECAST_FIT_TIMEOUT if fit_timeout is None else fit_timeout
+    standalone = run_id is None
+
+    if standalone:
+        with get_sync_db() as session:
+            run_id = log_ingestion_run(
+                session, dag_id="forecasting_range_rerun",
+                run_date=date.today(), status="running", started_at=datetime.utcnow()
+            )
+
+    logger.info("forecasting: range starting", run_id=run_id,
+                 first_id=first_id, last_id=last_id, workers=workers)
+
+    try:
+        with get_sync_db() as session:
+            topics = _get_eligible_topics(session, first_id, last_id)
+        counts = _forecast_topics(run_id, topics, workers, fit_timeout)
+        status = "success" if counts["errors"] == 0 else "partial"
+
+    except Exception as e:
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e)
+        logger.error("forecasting: range failed", first_id=first_id, last_id=last_id, error=str(e))
+        counts = {"topics": 0, "forecasts": 0, "skipped": 0, "cached": 0, "errors": 1}
+        status = "failed"
+        with get_sync_db() as session:
+            log_error(session, "forecasting_weekly", type(e).__name__, str(e),
+                      {"run_id": run_id, "first_id": first_id, "last_id": last_id})
+
+    # each range's forecasts are committed by now; serve them without waiting for the chord
+    bump_generations("forecasts")
+
+    result = {"run_id": run_id, "first_id": first_id, "last_id": last_id,
+              "status": status, **counts}
+
+    if standalone:
+        with get_sync_db() as session:
+            update_ingestion_run(session, run_id, status, counts["topics"],
+                                  counts["forecasts"], counts["skipped"], counts["errors"])
+            log_dq_metric(session, run_id, "forecast_fits_skipped_unchanged", counts["cached"])
+
+    logger.info("forecasting: range complete", **result)
+    return result
+
+
+@celery_app.task(name="app.tasks.forecasting.merge_forecast_results", bind=True)
+def merge_forecast_results(self, results: list, run_id: str):
+    """Chord callback: fold per-range counts into the coordinator's ingestion run."""
+    totals = {"topics": 0, "forecasts": 0, "skipped": 0, "cached": 0, "errors": 0}
+    failed_ranges = []
+    for r in results:
+        for key in totals:
+            totals[key] += r.get(key, 0)
+        if r.get("status") == "failed":
+            failed_ranges.append([r.get("first_id"), r.get("last_id")])
+
+    if failed_ranges and len(failed_ranges) == len(results):
+        status = "failed"
+    elif totals["errors"] or failed_ranges:
+        status = "partial"
+    else:
+        status = "success"
+
+    with get_sync_db() as session:
+        update_ingestion_run(session, run_id, status, totals["topics"],
+                              totals["forecasts"], totals["skipped"], totals["errors"])
+        log_dq_metric(session, run_id, "forecast_fits_skipped_unchanged", totals["cached"])
+
+    result = {
+        "run_id": run_id, "status": status, "model": MODEL_VERSION,
+        "chunks": len(results), "failed_ranges": failed_ranges,
+        "topics_processed": totals["topics"], "forecasts_generated": totals["forecasts"],
+        "skipped": totals["skipped"], "fits_skipped": totals["cached"],
+        "errors": totals["errors"],
+    }
+    logger.info("forecasting: complete", **result)
+    return result
+
+
 @celery_app.task(name="app.tasks.forecasting.generate_forecasts",
                  bind=True, max_retries=1, default_retry_delay=300)
-def generate_forecasts(self):
+def generate_forecasts(self, workers: int = None, fit_timeout: int = None,
+                       range_size: int = FORECAST_RANGE_SIZE):
     """
     Weekly forecasting for active topics with sufficient data.
     Tries Prophet first, falls back to linear+seasonal if Prophet fails.
+
+    Coordinator only: splits eligible topics into id ranges of ``range_size``
+    and dispatches them as a chord of forecast_topic_range tasks, each fitting
+    in ``workers`` pool processes with a ``fit_timeout`` per fit.
     """
     started = datetime.utcnow()
     today = date.today()
-    total_topics = 0
-    total_forecasts = 0
-    total_skipped = 0
-    total_errors = 0
 
-    logger.info("forecasting: starting")
+    logger.info("forecasting: starting", range_size=range_size)
 
     with get_sync_db() as session:
         run_id = log_ingestion_run(
@@ -145,105 +581,34 @@ def generate_forecasts(self):
 
     try:
         with get_sync_db() as session:
-            topics = session.execute(text("""
-                SELECT t.id, t.name, COUNT(ts.id) as datapoints
-                FROM topics t
-                JOIN source_timeseries ts ON ts.topic_id = t.id
-                    AND ts.source = 'google_trends' AND ts.geo = 'US'
-                WHERE t.is_active = true
-                GROUP BY t.id, t.name
-                HAVING COUNT(ts.id) >= :min_pts
-            """), {"min_pts": MIN_DATAPOINTS}).fetchall()
-
-        logger.info("forecasting: eligible topics", count=len(topics))
-
-        for topic in topics:
-            topic_id = str(topic.id)
-            total_topics += 1
-
-            try:
-                with get_sync_db() as session:
-                    rows = session.execute(text("""
-                        SELECT date as ds, normalized_value as y
-                        FROM source_timeseries
-                        WHERE topic_id = :tid AND source = 'google_trends' AND geo = 'US'
-                            AND normalized_value IS NOT NULL
-                        ORDER BY date ASC
-                    """), {"tid": topic_id}).fetchall()
-
-                if len(rows) < MIN_DATAPOINTS:
-                    total_skipped += 1
-                    continue
-
-                df = pd.DataFrame([{"ds": r.ds, "y": float(r.y)} for r in rows])
-                df["ds"] = pd.to_datetime(df["ds"])
-                df = df.sort_values("ds").drop_duplicates(subset=["ds"]).dropna(subset=["y"])
-
-                if len(df) < MIN_DATAPOINTS:
-                    total_skipped += 1
-                    continue
+            topic_ids = [str(t.id) for t in _get_eligible_topics(session)]
 
-                # Try Prophet first, fall back to linear+seasonal
-                forecast_df = _try_prophet_forecast(df, periods=26)
-                model_used = "prophet_v1"
+        logger.info("forecasting: eligible topics", count=len(topic_ids))
 
-                if forecast_df is None or forecast_df.empty:
-                    forecast_df = _linear_seasonal_forecast(df, periods=26)
-                    model_used = MODEL_VERSION
+        ranges = [
+            (topic_ids[i], topic_ids[min(i + range_size, len(topic_ids)) - 1])
+            for i in range(0, len(topic_ids), range_size)
+        ]
 
-                # Delete old forecasts for this topic
-                with get_sync_db() as session:
-                    session.execute(text("DELETE FROM forecasts WHERE topic_id = :tid"), {"tid": topic_id})
-
-                    last_date = df["ds"].max()
-                    for _, row in forecast_df.iterrows():
-                        weeks_ahead = max(1, (row["ds"] - last_date).days // 7)
-                        horizon = 3 if weeks_ahead <= 13 else 6
-
-                        session.execute(text("""
-                            INSERT INTO forecasts
-                                (id, topic_id, horizon_months, forecast_date, yhat, yhat_lower, yhat_upper, model_version, generated_at)
-                            VALUES (:id, :tid, :horizon, :fdate, :yhat, :lower, :upper, :model, :now)
-                        """), {
-                            "id": str(uuid.uuid4()),
-                            "tid": topic_id,
-                            "horizon": horizon,
-                            "fdate": row["ds"].date() if hasattr(row["ds"], "date") else row["ds"],
-                            "yhat": round(float(row["yhat"]), 2),
-                            "lower": round(float(row["yhat_lower"]), 2),
-                            "upper": round(float(row["yhat_upper"]), 2),
-                            "model": model_used,
-                            "now": datetime.utcnow(),
-                        })
-                        total_forecasts += 1
-
-                logger.debug("forecasting: topic complete", topic=topic.name,
-                              model=model_used, points=len(forecast_df))
-
-            except Exception as e:
-                total_errors += 1
-                logger.error("forecasting: topic error", topic=topic.name, error=str(e))
-                with get_sync_db() as session:
-                    log_error(session, "forecasting_weekly", type(e).__name__,
-                              str(e), {"topic_id": topic_id})
+        if not ranges:
+            with get_sync_db() as session:
+                update_ingestion_run(session, run_id, "success", 0, 0, 0, 0)
+            return {"run_id": run_id, "status": "no_topics"}
 
-        status = "success" if total_errors == 0 else "partial"
+        header = group(
+            forecast_topic_range.s(run_id, first_id, last_id, workers, fit_timeout)
+            for first_id, last_id in ranges
+        )
+        chord(header)(merge_forecast_results.s(run_id))
 
     except Exception as e:
         logger.error("forecasting: fatal error", error=str(e))
-        status = "failed"
-        total_errors += 1
         with get_sync_db() as session:
             log_error(session, "forecasting_weekly", type(e).__name__, str(e))
+            update_ingestion_run(session, run_id, "failed", 0, 0, 0, 1)
+        return {"run_id": run_id, "status": "failed", "error": str(e)}
 
-    with get_sync_db() as session:
-        update_ingestion_run(session, run_id, status,
-                              total_topics, total_forecasts, total_skipped, total_errors)
-
-    result = {
-        "run_id": run_id, "status": status, "model": MODEL_VERSION,
-        "topics_processed": total_topics, "forecasts_generated": total_forecasts,
-        "skipped": total_skipped, "errors": total_errors,
-    }
-    logger.info("forecasting: complete", **result)
+    result = {"run_id": run_id, "status": "dispatched",
+              "topics": len(topic_ids), "chunks": len(ranges)}
+    logger.info("forecasting: dispatched", **result)
     return result
@@ -1,29 +1,42 @@
 """
 Data ingestion tasks: Google Trends & Reddit.
 
-Google Trends: Fetches interest_over_time for active topics via pytrends.
-Reddit: Fetches mention counts from seed subreddits via PRAW or httpx fallback.
+Google Trends: Fetches interest_over_time for active topics via pytrends,
+reading raw responses from the shared Trends cache first.
+Reddit: Fetches mention counts in the seed subreddits via a concurrent,
+rate-limited async client (app.services.reddit_client), or serially via
+PRAW or httpx fallback.
 """
 import time
 import random
+import asyncio
 import uuid
 import json
 from datetime import datetime, date, timedelta
 
+from celery import chain
 from sqlalchemy import text
 import structlog
 
+from app.config import get_settings
+from app.services.cache_versions import bump_generations
+from app.services.trends_batching import (
+    plan_batches, naive_request_count, fit_scale, bootstrap_scale, fit_error,
+    normalization_error, timeframe_dates, backfill_timeframes,
+)
 from app.tasks import celery_app
-from app.tasks.db_helpers import get_sync_db, log_ingestion_run, update_ingestion_run, log_error
+from app.tasks.db_helpers import (
+    get_sync_db, log_ingestion_run, update_ingestion_run, update_ingestion_progress,
+    log_dq_metric, log_error, bulk_upsert_timeseries, multi_row_values,
+    find_resumable_run, start_checkpoint, checkpoint_batch,
+)
 
 logger = structlog.get_logger()
+settings = get_settings()
 
 # ─── Config ───
-GOOGLE_TRENDS_BATCH_SIZE = 5  # pytrends limit per request
-GOOGLE_TRENDS_SLEEP_MIN = 3   # seconds between requests
-GOOGLE_TRENDS_SLEEP_MAX = 6
+GOOGLE_TRENDS_MAX_NORMALIZATION_ERROR = 0.05  # dq threshold for mean batch fit error
 GOOGLE_TRENDS_TIMEFRAME = "today 3-m"  # last 3 months
-GOOGLE_TRENDS_MAX_RETRIES = 3
 
 REDDIT_SUBREDDITS = [
     "ecommerce", "AmazonSeller", "Entrepreneur", "dropship",
@@ -31,6 +44,10 @@ REDDIT_SUBREDDITS = [
     "BuyItForLife", "gadgets", "InternetIsBeautiful",
 ]
 REDDIT_USER_AGENT = "NeuraNest/1.0 (trend intelligence platform)"
+# Reddit rows are committed every this many keywords: a crash loses at most
+# one chunk of fetched counts (about 30 s of requests at 100 QPM), at the
+# cost of one small upsert statement per chunk.
+REDDIT_FLUSH_KEYWORDS = 50
 
 
 def _get_active_keywords(session) -> list[dict]:
@@ -49,186 +66,556 @@ def _get_active_keywords(session) -> list[dict]:
              "slug": r.slug, "keyword": r.keyword} for r in rows]
 
 
-def _batch_keywords(keywords: list[dict], batch_size: int) -> list[list[dict]]:
-    """Split keywords into batches for pytrends."""
-    return [keywords[i:i + batch_size] for i in range(0, len(keywords), batch_size)]
-
-
 # ═══════════════════════════════════════════════════════
 #  GOOGLE TRENDS INGESTION
 # ═══════════════════════════════════════════════════════
 
+def _get_recent_trends_levels(session) -> dict[str, float]:
+    """Mean Google Trends level per topic over the last 4 weeks, for batch packing."""
+    rows = session.execute(text("""
+        SELECT topic_id, AVG(scaled_value) AS level
+        FROM source_timeseries
+        WHERE source = 'google_trends' AND geo = 'US'
+          AND date >= CURRENT_DATE - INTERVAL '28 days'
+          AND scaled_value IS NOT NULL
+        GROUP BY topic_id
+    """)).fetchall()
+    return {str(r.topic_id): float(r.level) for r in rows}
+
+
+def _load_anchor_series(session, anchor: str, start: date, end: date) -> dict:
+    rows = session.execute(text("""
+        SELECT date, value FROM trends_anchor
+        WHERE anchor = :anchor AND geo = 'US' AND date BETWEEN :start AND :end
+    """), {"anchor": anchor, "start": start, "end": end}).fetchall()
+    return {r.date: float(r.value) for r in rows}
+
+
+def _extend_anchor_series(session, anchor: str, points: dict) -> None:
+    """Store anchor dates not seen before; stored dates are never rescaled."""
+    if not points:
+        return
+    rows = [{"anchor": anchor, "geo": "US", "date": d, "value": v, "created_at": datetime.utcnow()}
+            for d, v in sorted(points.items())]
+    values_sql, params = multi_row_values(rows, ["anchor", "geo", "date", "value", "created_at"])
+    session.execute(text(f"""
+        INSERT INTO trends_anchor (anchor, geo, date, value, created_at)
+        VALUES {values_sql}
+        ON CONFLICT (anchor, geo, date) DO NOTHING
+    """), params)
+
+
+def _store_trends_batch(batch_idx: int, kw_list: list[str], df, topic_map: dict,
+                        anchor: str, anchor_series: dict) -> dict:
+    """
+    Rescale one interest_over_time frame onto the global scale and upsert its
+    topic series. The batch is fitted on its anchor column against
+    ``anchor_series`` (the stored per-date anchor values, extended here with
+    dates it lacks; the first batch ever defines it). raw_value keeps the
+    batch-local 0-100 value; scaled_value is on the global scale, and is
+    NULL for the partial last day or when the batch can't be fitted. Rows that already hold a
+    global-scale value are left unchanged.
+    Returns fetched / inserted / errors counts and the batch's fit error.
+    """
+    partial = set()
+    if "isPartial" in df.columns:
+        partial = {idx.date() if hasattr(idx, "date") else idx
+                   for idx, flag in df["isPartial"].items() if bool(flag)}
+        df = df.drop(columns=["isPartial"])
+    dates = [idx.date() if hasattr(idx, "date") else idx for idx in df.index]
+
+    reference = {anchor: anchor_series}
+    factor = (fit_scale(df, reference, partial) if anchor_series
+              else bootstrap_scale(df, anchor, partial))
+    scaled = df.astype(float) * factor if factor is not None else None
+    if scaled is None:
+        logger.warning("google_trends_ingest: batch has too little anchor overlap to rescale",
+                        batch=batch_idx)
+
+    rows = []
+    for keyword_col in df.columns:
+        for topic_id in topic_map.get(keyword_col, []):
+            for (dt_idx, value), row_date in zip(df[keyword_col].items(), dates):
+                rows.append({
+                    "topic_id": topic_id, "source": "google_trends",
+                    "date": row_date, "geo": "US", "raw_value": float(value),
+                    "scaled_value": (round(max(0.0, float(scaled.at[dt_idx, keyword_col])), 4)
+                                         if scaled is not None and row_date not in partial
+                                         else None),
+                })
+
+    counts = {"fetched": len(rows), "inserted": 0, "errors": 0,
+              "fit_error": fit_error(scaled, reference, partial) if scaled is not None else None,
+              "scaled": scaled is not None}
+    try:
+        with get_sync_db() as session:
+            upserted = bulk_upsert_timeseries(session, rows, freeze_scaled=True)
+            if scaled is not None:
+                new_points = {
+                    row_date: round(float(value), 4)
+                    for row_date, value in zip(dates, scaled[anchor])
+                    if row_date not in partial and row_date not in anchor_series
+                }
+                _extend_anchor_series(session, anchor, new_points)
+                anchor_series.update(new_points)
+        counts["inserted"] = upserted["inserted"] + upserted["updated"]
+        logger.debug("google_trends_ingest: batch upserted",
+                      batch=batch_idx, factor=factor, **upserted)
+    except Exception as e:
+        counts["errors"] = 1
+        logger.error("google_trends_ingest: batch upsert error",
+                      batch=batch_idx, rows=len(rows), error=str(e))
+        with get_sync_db() as session:
+            log_error(session, "google_trends_ingest", type(e).__name__,
+                      str(e), {"batch": kw_list})
+    return counts
+
+
+def _store_related_queries(related: dict, topic_map: dict) -> None:
+    """Add the top/rising related queries of each batch keyword as gtrends keywords."""
+    with get_sync_db() as session:
+        for kw, queries in related.items():
+            topic_ids = topic_map.get(kw)
+            if not topic_ids or queries is None:
+                continue
+            topic_id = topic_ids[0]
+            for qtype in ["top", "rising"]:
+                qdf = queries.get(qtype)
+                if qdf is None or qdf.empty:
+                    continue
+                for _, row in qdf.head(5).iterrows():
+                    query_kw = row.get("query", "")
+                    if query_kw:
+                        session.execute(text("""
+                            INSERT INTO keywords (id, topic_id, keyword, source, geo, language)
+                            VALUES (:id, :tid, :kw, 'gtrends', 'US', 'en')
+                            ON CONFLICT (keyword, source, geo) DO NOTHING
+                        """), {
+                            "id": str(uuid.uuid4()),
+                            "tid": topic_id,
+                            "kw": query_kw[:500],
+                        })
+
+
 @celery_app.task(name="app.tasks.ingestion.ingest_google_trends",
                  bind=True, max_retries=2, default_retry_delay=300)
-def ingest_google_trends(self):
+def ingest_google_trends(self, resume_run_id: str = None, timeframe: str = None):
     """
     Daily Google Trends ingestion for all active topics.
-    Fetches interest_over_time via pytrends, upserts into source_timeseries.
+    Fetches interest_over_time via pytrends in anchor-scaled batches
+    (app.services.trends_batching), spread across the configured Trends
+    identities (app.services.trends_fetcher), and upserts into
+    source_timeseries on one global scale. Planned requests (next to what
+    plain 5-keyword batching would need), live requests and normalization
+    (fit) error are recorded as dq_metrics.
+
+    ``timeframe`` defaults to GOOGLE_TRENDS_TIMEFRAME; backfill_google_trends
+    passes historical windows, which skip related queries and are logged
+    under their own dag_id.
+
+    The batch plan and each completed batch are checkpointed on the
+    ingestion_runs row. A retried or redelivered task (same Celery task id),
+    or one given ``resume_run_id``, continues that run and skips completed
+    batches.
     """
+    timeframe = timeframe or GOOGLE_TRENDS_TIMEFRAME
+    daily = timeframe == GOOGLE_TRENDS_TIMEFRAME
+    dag_id = "google_trends_ingest_daily" if daily else "google_trends_backfill"
     started = datetime.utcnow()
     today = date.today()
     total_fetched = 0
     total_inserted = 0
     total_skipped = 0
     total_errors = 0
-
-    logger.info("google_trends_ingest: starting")
+    batch_errors = []
+    unscaled_batches = 0
+    task_id = self.request.id
+    trends = None
+    batches = None
+    naive_requests = None
 
     with get_sync_db() as session:
-        run_id = log_ingestion_run(
-            session, dag_id="google_trends_ingest_daily",
-            run_date=today, status="running", started_at=started
-        )
+        resumed = find_resumable_run(session, dag_id, task_id, resume_run_id)
+        if resumed is not None:
+            run_id = str(resumed.id)
+            total_fetched = resumed.records_fetched or 0
+            total_inserted = resumed.records_inserted or 0
+            total_skipped = resumed.records_skipped or 0
+            total_errors = resumed.error_count or 0
+            plan = resumed.checkpoint_json
+            completed = resumed.batches_completed or []
+        else:
+            run_id = log_ingestion_run(
+                session, dag_id=dag_id, run_date=today, status="running",
+                started_at=started, task_id=task_id,
+            )
+            plan = None
         session.commit()
 
-    try:
-        from pytrends.request import TrendReq
-
-        pytrends = TrendReq(hl="en-US", tz=360, retries=2, backoff_factor=0.5)
+    logger.info("google_trends_ingest: starting", run_id=run_id, resumed=resumed is not None)
 
+    try:
+        from pytrends.request import TrendReq  # noqa: F401 - fail fast if missing
+    except ImportError:
+        logger.error("google_trends_ingest: pytrends not installed. Run: pip install pytrends")
+        total_errors += 1
         with get_sync_db() as session:
-            keywords = _get_active_keywords(session)
+            log_error(session, "google_trends_ingest", "ImportError",
+                      "pytrends package not installed")
+            update_ingestion_run(session, run_id, "failed", total_fetched, total_inserted,
+                                 total_skipped, total_errors)
+        return {"run_id": run_id, "status": "failed", "errors": total_errors}
 
-        if not keywords:
-            logger.warning("google_trends_ingest: no active topics found")
+    try:
+        from app.services.trends_fetcher import TrendsFetcherPool, TrendsIdentity
+
+        if plan is None:
             with get_sync_db() as session:
-                update_ingestion_run(session, run_id, "success", 0, 0, 0, 0)
-            return {"status": "no_topics", "run_id": run_id}
+                keywords = _get_active_keywords(session)
 
-        batches = _batch_keywords(keywords, GOOGLE_TRENDS_BATCH_SIZE)
-        logger.info("google_trends_ingest: processing batches",
-                     total_keywords=len(keywords), batches=len(batches))
+            if not keywords:
+                logger.warning("google_trends_ingest: no active topics found")
+                with get_sync_db() as session:
+                    update_ingestion_run(session, run_id, "success", 0, 0, 0, 0)
+                return {"status": "no_topics", "run_id": run_id}
 
-        for batch_idx, batch in enumerate(batches):
-            kw_list = [item["keyword"] for item in batch]
-            topic_map = {item["keyword"]: item["topic_id"] for item in batch}
+            anchor = settings.GOOGLE_TRENDS_ANCHOR_KEYWORD
+            topics_by_keyword = {}
+            for item in keywords:
+                topics_by_keyword.setdefault(item["keyword"], []).append(item["topic_id"])
+            with get_sync_db() as session:
+                levels = _get_recent_trends_levels(session)
+            batches = plan_batches(
+                list(topics_by_keyword), anchor,
+                {kw: levels[tids[0]] for kw, tids in topics_by_keyword.items() if tids[0] in levels},
+            )
+            naive_requests = naive_request_count(len(keywords))
+            with get_sync_db() as session:
+                start_checkpoint(session, run_id, {
+                    "anchor": anchor, "timeframe": timeframe, "batches": batches,
+                    "topics_by_keyword": topics_by_keyword, "naive_requests": naive_requests,
+                }, len(batches))
+            done = set()
+            logger.info("google_trends_ingest: processing batches",
+                         total_keywords=len(keywords), unique_keywords=len(topics_by_keyword),
+                         batches=len(batches), naive_batches=naive_requests,
+                         anchor=anchor, timeframe=timeframe)
+        else:
+            anchor = plan["anchor"]
+            timeframe = plan.get("timeframe", timeframe)
+            batches = plan["batches"]
+            topics_by_keyword = plan["topics_by_keyword"]
+            naive_requests = plan.get("naive_requests")
+            done = set(completed)
+            logger.info("google_trends_ingest: resuming from checkpoint",
+                         batches=len(batches), completed=len(done))
+
+        pending = [(i, kw_list) for i, kw_list in enumerate(batches) if i not in done]
+        start, end = timeframe_dates(timeframe, today)
+        with get_sync_db() as session:
+            anchor_series = _load_anchor_series(session, anchor, start, end)
+        trends = TrendsFetcherPool(TrendsIdentity.from_settings(), timeframe, "US",
+                                   with_related=daily)
+        logger.info("google_trends_ingest: fetching", identities=len(trends.identities),
+                     pending_batches=len(pending))
 
-            for attempt in range(GOOGLE_TRENDS_MAX_RETRIES):
-                try:
-                    pytrends.build_payload(kw_list, timeframe=GOOGLE_TRENDS_TIMEFRAME, geo="US")
-                    df = pytrends.interest_over_time()
-
-                    if df is not None and not df.empty:
-                        # Drop the isPartial column if present
-                        if "isPartial" in df.columns:
-                            df = df.drop(columns=["isPartial"])
-
-                        with get_sync_db() as session:
-                            for keyword_col in df.columns:
-                                topic_id = topic_map.get(keyword_col)
-                                if not topic_id:
-                                    continue
-
-                                for dt_idx, value in df[keyword_col].items():
-                                    row_date = dt_idx.date() if hasattr(dt_idx, "date") else dt_idx
-                                    total_fetched += 1
-
-                                    try:
-                                        session.execute(text("""
-                                            INSERT INTO source_timeseries
-                                                (topic_id, source, date, geo, raw_value, normalized_value, created_at)
-                                            VALUES (:tid, 'google_trends', :dt, 'US', :raw, :norm, :now)
-                                            ON CONFLICT (topic_id, source, date, geo)
-                                            DO UPDATE SET raw_value = :raw, normalized_value = :norm
-                                        """), {
-                                            "tid": topic_id, "dt": row_date,
-                                            "raw": float(value), "norm": min(100, max(0, float(value))),
-                                            "now": datetime.utcnow(),
-                                        })
-                                        total_inserted += 1
-                                    except Exception as e:
-                                        total_errors += 1
-                                        logger.error("google_trends_ingest: row insert error",
-                                                      keyword=keyword_col, error=str(e))
-
-                    # Also fetch related queries for topic enrichment
-                    try:
-                        related = pytrends.related_queries()
-                        with get_sync_db() as session:
-                            for kw, queries in related.items():
-                                topic_id = topic_map.get(kw)
-                                if not topic_id or queries is None:
-                                    continue
-                                for qtype in ["top", "rising"]:
-                                    qdf = queries.get(qtype)
-                                    if qdf is None or qdf.empty:
-                                        continue
-                                    for _, row in qdf.head(5).iterrows():
-                                        query_kw = row.get("query", "")
-                                        if query_kw:
-                                            session.execute(text("""
-                                                INSERT INTO keywords (id, topic_id, keyword, source, geo, language)
-                                                VALUES (:id, :tid, :kw, 'gtrends', 'US', 'en')
-                                                ON CONFLICT (keyword, source, geo) DO NOTHING
-                                            """), {
-                                                "id": str(uuid.uuid4()),
-                                                "tid": topic_id,
-                                                "kw": query_kw[:500],
-                                            })
-                    except Exception as e:
-                        logger.warning("google_trends_ingest: related queries failed", error=str(e))
-
-                    break  # Success, exit retry loop
+        for batch_idx, kw_list, df, related, error in trends.run(pending):
+            topic_map = {kw: topics_by_keyword[kw] for kw in kw_list if kw in topics_by_keyword}
 
+            if error is not None:
+                total_errors += 1
+                logger.error("google_trends_ingest: batch error", batch=batch_idx, error=str(error))
+                with get_sync_db() as session:
+                    log_error(session, "google_trends_ingest", type(error).__name__,
+                              str(error), {"batch": kw_list})
+                continue
+
+            stored_ok = True
+            if df is not None and not df.empty:
+                stored = _store_trends_batch(batch_idx, kw_list, df, topic_map,
+                                             anchor, anchor_series)
+                total_fetched += stored["fetched"]
+                total_inserted += stored["inserted"]
+                total_errors += stored["errors"]
+                stored_ok = stored["errors"] == 0
+                if not stored["scaled"]:
+                    unscaled_batches += 1
+                elif stored["fit_error"] is not None:
+                    batch_errors.append(stored["fit_error"])
+
+            # Also store related queries for topic enrichment
+            if related:
+                try:
+                    _store_related_queries(related, topic_map)
                 except Exception as e:
-                    if "429" in str(e) or "Too Many" in str(e):
-                        wait = 60 * (attempt + 1) + random.randint(0, 30)
-                        logger.warning("google_trends_ingest: rate limited, waiting",
-                                        wait_seconds=wait, attempt=attempt + 1)
-                        time.sleep(wait)
-                    else:
-                        total_errors += 1
-                        logger.error("google_trends_ingest: batch error",
-                                      batch=batch_idx, error=str(e), attempt=attempt + 1)
-                        if attempt == GOOGLE_TRENDS_MAX_RETRIES - 1:
-                            with get_sync_db() as session:
-                                log_error(session, "google_trends_ingest", type(e).__name__,
-                                          str(e), {"batch": kw_list})
-                        time.sleep(10)
-
-            # Rate limiting between batches
-            sleep_time = random.uniform(GOOGLE_TRENDS_SLEEP_MIN, GOOGLE_TRENDS_SLEEP_MAX)
-            time.sleep(sleep_time)
+                    logger.warning("google_trends_ingest: related queries failed", error=str(e))
 
-        status = "success" if total_errors == 0 else "partial"
+            with get_sync_db() as session:
+                # A batch whose upsert failed stays pending for a resumed run.
+                if stored_ok:
+                    checkpoint_batch(session, run_id, batch_idx)
+                update_ingestion_progress(session, run_id, total_fetched, total_inserted,
+                                          total_skipped, total_errors)
 
-    except ImportError:
-        logger.error("google_trends_ingest: pytrends not installed. Run: pip install pytrends")
-        status = "failed"
-        total_errors += 1
-        with get_sync_db() as session:
-            log_error(session, "google_trends_ingest", "ImportError",
-                      "pytrends package not installed")
+        status = "success" if total_errors == 0 else "partial"
 
     except Exception as e:
         logger.error("google_trends_ingest: fatal error", error=str(e))
-        status = "failed"
         total_errors += 1
         with get_sync_db() as session:
-            log_error(session, "google_trends_ingest", type(e).__name__, str(e))
+            log_error(session, "google_trends_ingest", type(e).__name__, str(e),
+                      {"run_id": run_id})
+            update_ingestion_progress(session, run_id, total_fetched, total_inserted,
+                                      total_skipped, total_errors)
+        if self.request.retries < self.max_retries:
+            # Run stays 'running'; the retry (same task id) resumes its checkpoint.
+            raise self.retry(exc=e)
+        status = "failed"
 
+    norm_error = normalization_error(batch_errors)
+    cache_hits = trends.hits if trends else 0
+    cache_misses = trends.misses if trends else 0
+    total_requests = cache_misses
     with get_sync_db() as session:
         update_ingestion_run(session, run_id, status,
                               total_fetched, total_inserted, total_skipped, total_errors)
+        log_dq_metric(session, run_id, "trends_cache_hits", cache_hits)
+        log_dq_metric(session, run_id, "trends_cache_misses", cache_misses)
+        log_dq_metric(session, run_id, "trends_requests", total_requests)
+        if batches is not None and naive_requests is not None:
+            log_dq_metric(session, run_id, "trends_planned_requests", len(batches))
+            log_dq_metric(session, run_id, "trends_naive_requests", naive_requests)
+        log_dq_metric(session, run_id, "trends_unscaled_batches", unscaled_batches,
+                      threshold=0, passed=unscaled_batches == 0)
+        if norm_error is not None:
+            log_dq_metric(session, run_id, "trends_normalization_error", round(norm_error, 6),
+                          threshold=GOOGLE_TRENDS_MAX_NORMALIZATION_ERROR,
+                          passed=norm_error <= GOOGLE_TRENDS_MAX_NORMALIZATION_ERROR)
+    bump_generations("timeseries")
 
     result = {
         "run_id": run_id, "status": status,
         "fetched": total_fetched, "inserted": total_inserted, "errors": total_errors,
+        "cache_hits": cache_hits, "cache_misses": cache_misses,
+        "requests": total_requests, "unscaled_batches": unscaled_batches,
+        "planned_requests": len(batches) if batches is not None else None,
+        "naive_requests": naive_requests,
+        "normalization_error": norm_error,
     }
     logger.info("google_trends_ingest: complete", **result)
     return result
 
 
+@celery_app.task(name="app.tasks.ingestion.backfill_google_trends")
+def backfill_google_trends(days: int = 365):
+    """
+    Re-fetch Google Trends history older than the stored anchor series, one
+    overlapping window at a time (newest first), so every window is fitted
+    onto the global scale the previous one stored. Run after the daily
+    ingestion has established the anchor series.
+    """
+    with get_sync_db() as session:
+        earliest = session.execute(text("""
+            SELECT MIN(date) FROM trends_anchor WHERE anchor = :anchor AND geo = 'US'
+        """), {"anchor": settings.GOOGLE_TRENDS_ANCHOR_KEYWORD}).scalar()
+    if earliest is None:
+        logger.warning("google_trends_backfill: no anchor series yet, run ingest_google_trends first")
+        return {"status": "no_anchor", "windows": 0}
+
+    timeframes = backfill_timeframes(earliest, date.today() - timedelta(days=days))
+    if timeframes:
+        chain(*(ingest_google_trends.si(timeframe=tf) for tf in timeframes)).apply_async()
+    logger.info("google_trends_backfill: dispatched", windows=len(timeframes),
+                 earliest=str(earliest))
+    return {"status": "dispatched", "windows": len(timeframes), "timeframes": timeframes}
+
+
 # ═══════════════════════════════════════════════════════
 #  REDDIT MENTIONS INGESTION
 # ═══════════════════════════════════════════════════════
 
+def _flush_reddit_rows(rows: list[dict]) -> int:
+    """Upsert buffered reddit rows and clear the buffer. Returns rows written."""
+    if not rows:
+        return 0
+    with get_sync_db() as session:
+        counts = bulk_upsert_timeseries(session, rows)
+    logger.debug("reddit_ingest: rows upserted", **counts)
+    rows.clear()
+    return counts["inserted"] + counts["updated"]
+
+
+def _reddit_row(topic_id: str, today: date, mention_count: int) -> dict:
+    return {
+        "topic_id": topic_id, "source": "reddit", "date": today, "geo": "US",
+        "raw_value": float(mention_count),
+        "normalized_value": min(100, float(mention_count) * 2),  # Rough normalization
+    }
+
+
+async def _ingest_reddit_async(keywords: list[dict], today: date, cfg, base_url: str = None) -> dict:
+    """
+    Fetch mention counts for all keywords concurrently and upsert them every
+    REDDIT_FLUSH_KEYWORDS results as they arrive. Returns fetched / inserted /
+    errors counts.
+    """
+    from app.services.reddit_client import RedditSearchClient
+
+    client = RedditSearchClient(
+        user_agent=REDDIT_USER_AGENT,
+        base_url=base_url or cfg.REDDIT_BASE_URL,
+        client_id=cfg.REDDIT_CLIENT_ID,
+        client_secret=cfg.REDDIT_CLIENT_SECRET,
+        subreddits=REDDIT_SUBREDDITS,
+        concurrency=cfg.REDDIT_CONCURRENCY,
+        requests_per_minute=cfg.REDDIT_REQUESTS_PER_MINUTE,
+    )
+    logger.info("reddit_ingest: using async client", base_url=client.base_url,
+                 oauth=client.oauth, concurrency=client.concurrency,
+                 requests_per_minute=round(client.bucket.rate * 60, 1))
+
+    counts = {"fetched": 0, "inserted": 0, "errors": 0}
+    pending_rows = []
+    async for kw_item, stats, error in client.iter_mentions(keywords):
+        if error is not None:
+            counts["errors"] += 1
+            logger.error("reddit_ingest: keyword error", keyword=kw_item["keyword"], error=str(error))
+            with get_sync_db() as session:
+                log_error(session, "reddit_ingest", type(error).__name__, str(error),
+                          {"keyword": kw_item["keyword"], "topic_id": kw_item["topic_id"]})
+            continue
+
+        counts["fetched"] += 1
+        pending_rows.append(_reddit_row(kw_item["topic_id"], today, stats["mention_count"]))
+        if len(pending_rows) >= REDDIT_FLUSH_KEYWORDS:
+            counts["inserted"] += _flush_reddit_rows(pending_rows)
+
+    counts["inserted"] += _flush_reddit_rows(pending_rows)
+    return counts
+
+
+def _ingest_reddit_serial(keywords: list[dict], today: date, cfg) -> dict:
+    """
+    Fetch mention counts one keyword at a time, PRAW if credentials are
+    configured, otherwise httpx + public JSON API. Returns fetched / inserted /
+    errors counts.
+    """
+    counts = {"fetched": 0, "inserted": 0, "errors": 0}
+
+    # Determine Reddit client
+    use_praw = bool(cfg.REDDIT_CLIENT_ID and cfg.REDDIT_CLIENT_SECRET)
+    reddit = None
+
+    if use_praw:
+        try:
+            import praw
+            reddit = praw.Reddit(
+                client_id=cfg.REDDIT_CLIENT_ID,
+                client_secret=cfg.REDDIT_CLIENT_SECRET,
+                user_agent=REDDIT_USER_AGENT,
+            )
+            logger.info("reddit_ingest: using PRAW (authenticated)")
+        except ImportError:
+            logger.warning("reddit_ingest: praw not installed, falling back to httpx")
+            use_praw = False
+
+    if not use_praw:
+        import httpx
+        logger.info("reddit_ingest: using httpx (public JSON API)")
+
+    subreddit_str = "+".join(REDDIT_SUBREDDITS)
+    pending_rows = []
+
+    for kw_item in keywords:
+        keyword = kw_item["keyword"]
+        topic_id = kw_item["topic_id"]
+
+        try:
+            mention_count = 0
+            total_score = 0
+            comment_count = 0
+            top_subreddit = None
+
+            if use_praw and reddit:
+                # Search across subreddits for posts in last 24h
+                results = reddit.subreddit(subreddit_str).search(
+                    keyword, time_filter="day", sort="relevance", limit=100
+                )
+                sub_counts = {}
+                for post in results:
+                    mention_count += 1
+                    total_score += post.score
+                    comment_count += post.num_comments
+                    sub_name = post.subreddit.display_name
+                    sub_counts[sub_name] = sub_counts.get(sub_name, 0) + 1
+
+                if sub_counts:
+                    top_subreddit = max(sub_counts, key=sub_counts.get)
+
+            else:
+                # Fallback: public Reddit JSON API (no auth needed, rate limited)
+                import httpx
+                url = (f"https://www.reddit.com/r/{subreddit_str}/search.json"
+                       f"?q={keyword}&restrict_sr=1&sort=relevance&t=day&limit=100")
+                headers = {"User-Agent": REDDIT_USER_AGENT}
+
+                with httpx.Client(timeout=15) as client:
+                    resp = client.get(url, headers=headers)
+                    if resp.status_code == 200:
+                        data = resp.json()
+                        posts = data.get("data", {}).get("children", [])
+                        sub_counts = {}
+                        for post_wrap in posts:
+                            post = post_wrap.get("data", {})
+                            mention_count += 1
+                            total_score += post.get("score", 0)
+                            comment_count += post.get("num_comments", 0)
+                            sub_name = post.get("subreddit", "")
+                            sub_counts[sub_name] = sub_counts.get(sub_name, 0) + 1
+
+                        if sub_counts:
+                            top_subreddit = max(sub_counts, key=sub_counts.get)
+                    elif resp.status_code == 429:
+                        logger.warning("reddit_ingest: rate limited, sleeping 60s")
+                        time.sleep(60)
+
+            counts["fetched"] += 1
+
+            # Upsert into source_timeseries
+            metadata = {
+                "mention_count": mention_count,
+                "avg_score": round(total_score / max(mention_count, 1), 1),
+                "comment_count": comment_count,
+                "top_subreddit": top_subreddit,
+            }
+
+            pending_rows.append(_reddit_row(topic_id, today, mention_count))
+            if len(pending_rows) >= REDDIT_FLUSH_KEYWORDS:
+                counts["inserted"] += _flush_reddit_rows(pending_rows)
+
+            # Rate limit: be nice to Reddit
+            time.sleep(random.uniform(1.5, 3.0))
+
+        except Exception as e:
+            counts["errors"] += 1
+            logger.error("reddit_ingest: keyword error", keyword=keyword, error=str(e))
+            with get_sync_db() as session:
+                log_error(session, "reddit_ingest", type(e).__name__,
+                          str(e), {"keyword": keyword, "topic_id": topic_id})
+
+    counts["inserted"] += _flush_reddit_rows(pending_rows)
+    return counts
+
 @celery_app.task(name="app.tasks.ingestion.ingest_reddit_mentions",
                  bind=True, max_retries=2, default_retry_delay=300)
-def ingest_reddit_mentions(self):
+def ingest_reddit_mentions(self, concurrent: bool = None, base_url: str = None):
     """
     Daily Reddit mention counts for active topics.
-    Uses PRAW if credentials are configured, otherwise uses httpx + public JSON API.
+
+    By default (REDDIT_ASYNC) keywords are searched concurrently through
+    app.services.reddit_client, rate-limited to Reddit's published limits.
+    The serial mode uses PRAW if credentials are configured, otherwise
+    httpx + public JSON API.
     """
     started = datetime.utcnow()
     today = date.today()
@@ -257,116 +644,15 @@ def ingest_reddit_mentions(self):
                 update_ingestion_run(session, run_id, "success", 0, 0, 0, 0)
             return {"status": "no_topics", "run_id": run_id}
 
-        # Determine Reddit client
-        use_praw = bool(cfg.REDDIT_CLIENT_ID and cfg.REDDIT_CLIENT_SECRET)
-        reddit = None
-
-        if use_praw:
-            try:
-                import praw
-                reddit = praw.Reddit(
-                    client_id=cfg.REDDIT_CLIENT_ID,
-                    client_secret=cfg.REDDIT_CLIENT_SECRET,
-                    user_agent=REDDIT_USER_AGENT,
-                )
-                logger.info("reddit_ingest: using PRAW (authenticated)")
-            except ImportError:
-                logger.warning("reddit_ingest: praw not installed, falling back to httpx")
-                use_praw = False
-
-        if not use_praw:
-            import httpx
-            logger.info("reddit_ingest: using httpx (public JSON API)")
-
-        subreddit_str = "+".join(REDDIT_SUBREDDITS)
-
-        for kw_item in keywords:
-            keyword = kw_item["keyword"]
-            topic_id = kw_item["topic_id"]
-
-            try:
-                mention_count = 0
-                total_score = 0
-                comment_count = 0
-                top_subreddit = None
-
-                if use_praw and reddit:
-                    # Search across subreddits for posts in last 24h
-                    results = reddit.subreddit(subreddit_str).search(
-                        keyword, time_filter="day", sort="relevance", limit=100
-                    )
-                    sub_counts = {}
-                    for post in results:
-                        mention_count += 1
-                        total_score += post.score
-                        comment_count += post.num_comments
-                        sub_name = post.subreddit.display_name
-                        sub_counts[sub_name] = sub_counts.get(sub_name, 0) + 1
-
-                    if sub_counts:
-                        top_subreddit = max(sub_counts, key=sub_counts.get)
-
-                else:
-                    # Fallback: public Reddit JSON API (no auth needed, rate limited)
-                    import httpx
-                    url = f"https://www.reddit.com/search.json?q={keyword}&sort=new&t=day&limit=25"
-                    headers = {"User-Agent": REDDIT_USER_AGENT}
-
-                    with httpx.Client(timeout=15) as client:
-                        resp = client.get(url, headers=headers)
-                        if resp.status_code == 200:
-                            data = resp.json()
-                            posts = data.get("data", {}).get("children", [])
-                            sub_counts = {}
-                            for post_wrap in posts:
-                                post = post_wrap.get("data", {})
-                                mention_count += 1
-                                total_score += post.get("score", 0)
-                                comment_count += post.get("num_comments", 0)
-                                sub_name = post.get("subreddit", "")
-                                sub_counts[sub_name] = sub_counts.get(sub_name, 0) + 1
-
-                            if sub_counts:
-                                top_subreddit = max(sub_counts, key=sub_counts.get)
-                        elif resp.status_code == 429:
-                            logger.warning("reddit_ingest: rate limited, sleeping 60s")
-                            time.sleep(60)
-
-                total_fetched += 1
-
-                # Upsert into source_timeseries
-                metadata = {
-                    "mention_count": mention_count,
-                    "avg_score": round(total_score / max(mention_count, 1), 1),
-                    "comment_count": comment_count,
-                    "top_subreddit": top_subreddit,
-                }
-
-                with get_sync_db() as session:
-                    session.execute(text("""
-                        INSERT INTO source_timeseries
-                            (topic_id, source, date, geo, raw_value, normalized_value, created_at)
-                        VALUES (:tid, 'reddit', :dt, 'US', :raw, :norm, :now)
-                        ON CONFLICT (topic_id, source, date, geo)
-                        DO UPDATE SET raw_value = :raw, normalized_value = :norm
-                    """), {
-                        "tid": topic_id, "dt": today,
-                        "raw": float(mention_count),
-                        "norm": min(100, float(mention_count) * 2),  # Rough normalization
-                        "now": datetime.utcnow(),
-                    })
-                    total_inserted += 1
-
-                # Rate limit: be nice to Reddit
-                time.sleep(random.uniform(1.5, 3.0))
-
-            except Exception as e:
-                total_errors += 1
-                logger.error("reddit_ingest: keyword error", keyword=keyword, error=str(e))
-                with get_sync_db() as session:
-                    log_error(session, "reddit_ingest", type(e).__name__,
-                              str(e), {"keyword": keyword, "topic_id": topic_id})
-
+        if concurrent is None:
+            concurrent = cfg.REDDIT_ASYNC
+        if concurrent:
+            counts = asyncio.run(_ingest_reddit_async(keywords, today, cfg, base_url))
+        else:
+            counts = _ingest_reddit_serial(keywords, today, cfg)
+        total_fetched = counts["fetched"]
+        total_inserted = counts["inserted"]
+        total_errors = counts["errors"]
         status = "success" if total_errors == 0 else "partial"
 
     except Exception as e:
@@ -379,6 +665,7 @@ def ingest_reddit_mentions(self):
     with get_sync_db() as session:
         update_ingestion_run(session, run_id, status,
                               total_fetched, total_inserted, 0, total_errors)
+    bump_generations("timeseries")
 
     result = {
         "run_id": run_id, "status": status,
@@ -3,6 +3,8 @@ Scoring task.
 
 Computes opportunity scores, competition index, and updates lifecycle stage
 for all active topics using derived features and the scoring service.
+Each topic's topic_latest row is rebuilt in the same transaction as its new
+scores, so API reads never see one without the other.
 """
 import uuid
 import json
@@ -12,7 +14,10 @@ from sqlalchemy import text
 import structlog
 
 from app.tasks import celery_app
-from app.tasks.db_helpers import get_sync_db, log_ingestion_run, update_ingestion_run, log_error
+from app.tasks.db_helpers import (
+    get_sync_db, log_ingestion_run, update_ingestion_run, log_error, refresh_topic_latest,
+)
+from app.services.cache_versions import bump_generations
 from app.services.scoring import compute_opportunity_score, compute_competition_index, detect_trend_stage
 
 logger = structlog.get_logger()
@@ -53,7 +58,7 @@ def _get_competition_data(session, topic_id: str) -> dict | None:
 def _get_monthly_growth_rates(session, topic_id: str) -> list[float]:
     """Compute month-over-month growth rates from Google Trends timeseries."""
     rows = session.execute(text("""
-        SELECT date, normalized_value
+        SELECT date, scaled_value
         FROM source_timeseries
         WHERE topic_id = :tid AND source = 'google_trends' AND geo = 'US'
         ORDER BY date ASC
@@ -68,7 +73,7 @@ def _get_monthly_growth_rates(session, topic_id: str) -> list[float]:
         month_key = r.date.strftime("%Y-%m")
         if month_key not in monthly:
             monthly[month_key] = []
-        monthly[month_key].append(float(r.normalized_value) if r.normalized_value else 0)
+        monthly[month_key].append(float(r.scaled_value) if r.scaled_value else 0)
 
     monthly_avgs = [(k, sum(v) / len(v)) for k, v in sorted(monthly.items())]
 
@@ -93,14 +98,14 @@ def _get_forecast_pct_change(session, topic_id: str) -> float:
     """), {"tid": topic_id}).fetchone()
 
     current_row = session.execute(text("""
-        SELECT normalized_value FROM source_timeseries
-        WHERE topic_id = :tid AND source = 'google_trends'
+        SELECT scaled_value FROM source_timeseries
+        WHERE topic_id = :tid AND source = 'google_trends' AND scaled_value IS NOT NULL
         ORDER BY date DESC
         LIMIT 1
     """), {"tid": topic_id}).fetchone()
 
     if row and current_row:
-        current = float(current_row.normalized_value) if current_row.normalized_value else 1
+        current = float(current_row.scaled_value) if current_row.scaled_value else 1
         forecast = float(row.yhat) if row.yhat else current
         return ((forecast - current) / max(current, 1)) * 100
     return 0
@@ -239,6 +244,9 @@ def compute_all_scores(self):
                             WHERE id = :tid
                         """), {"stage": new_stage, "now": datetime.utcnow(), "tid": topic_id})
 
+                    # Read model, committed together with the scores above
+                    refresh_topic_latest(session, [topic_id])
+
                 logger.debug("scoring: topic scored", topic=topic.name,
                               opportunity=opp_score, competition=comp_index, stage=new_stage)
 
@@ -261,6 +269,7 @@ def compute_all_scores(self):
     with get_sync_db() as session:
         update_ingestion_run(session, run_id, status,
                               total_topics, total_scores, 0, total_errors)
+    bump_generations("topics", "scores")
 
     result = {
         "run_id": run_id, "status": status,
@@ -94,8 +94,9 @@ async def seed():
                 val = max(0, trend_curve(t["stage"], day, total_days))
                 norm = min(100, max(0, val))
                 await conn.execute(
-                    "INSERT INTO source_timeseries (topic_id, source, date, geo, raw_value, normalized_value) VALUES ($1,$2,$3,'US',$4,$5) ON CONFLICT DO NOTHING",
-                    tid, source, date, round(val, 2), round(norm, 2))
+                    "INSERT INTO source_timeseries (topic_id, source, date, geo, raw_value, normalized_value, scaled_value) VALUES ($1,$2,$3,'US',$4,$5,$6) ON CONFLICT DO NOTHING",
+                    tid, source, date, round(val, 2), round(norm, 2),
+                    round(norm, 2) if source == "google_trends" else None)
 
     print("Creating ASINs...")
     asin_codes = []
@@ -0,0 +1,8 @@
+"""
+Code shared by the API/Celery workers and the Airflow DAGs.
+
+Installed as its own package (``pip install ./api/shared``) into both the
+API image and the Airflow image, so the DAGs import it without the api
+package on their path. Modules here depend on nothing that isn't already in
+both images (SQLAlchemy at most).
+"""
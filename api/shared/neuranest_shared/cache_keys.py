@@ -0,0 +1,40 @@
+"""
+Redis key scheme of the API cache generations (app.services.cache_versions).
+
+Dependency-free, so the Airflow DAGs bump exactly the keys the API reads.
+"""
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+NAMESPACES = ("topics", "scores", "timeseries", "forecasts", "competition")
+
+
+def generation_key(namespace: str) -> str:
+    if namespace not in NAMESPACES:
+        raise ValueError(f"unknown cache namespace {namespace!r}; expected one of {NAMESPACES}")
+    return f"neuranest:gen:{namespace}"
+
+
+def bump_generations(redis_client, *namespaces: str) -> list:
+    """Increment each namespace's generation in one round trip; returns the new generations."""
+    keys = [generation_key(ns) for ns in namespaces]
+    pipe = redis_client.pipeline(transaction=False)
+    for key in keys:
+        pipe.incr(key)
+    return pipe.execute()
+
+
+def bump_generations_from_airflow(*namespaces: str,
+                                  redis_conn_id: str = "neuranest_redis") -> Optional[list]:
+    """
+    bump_generations through an Airflow Redis connection. A failure is
+    logged and never fails the task; cached entries then expire by TTL.
+    """
+    try:
+        from airflow.providers.redis.hooks.redis import RedisHook
+        return bump_generations(RedisHook(redis_conn_id=redis_conn_id).get_conn(), *namespaces)
+    except Exception as e:
+        logger.warning("cache generation bump failed for %s: %s", namespaces, e)
+        return None
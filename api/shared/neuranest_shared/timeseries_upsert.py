@@ -0,0 +1,85 @@
+"""
+source_timeseries upsert SQL, shared by the Celery tasks and the Airflow DAGs.
+
+Depends on nothing but SQLAlchemy so a DAG can import it without loading the
+app settings, the Celery app or the task database engine. UPSERT_CHUNK_SIZE
+is the one default chunk size; the app's TIMESERIES_UPSERT_CHUNK_SIZE
+setting defaults to it.
+"""
+from datetime import datetime
+
+from sqlalchemy import text
+
+UPSERT_CHUNK_SIZE = 1000  # source_timeseries rows per upsert statement
+
+TIMESERIES_COLUMNS = ["topic_id", "source", "date", "geo", "raw_value", "normalized_value",
+                      "scaled_value", "created_at"]
+
+
+def multi_row_values(rows: list[dict], columns: list[str]) -> tuple[str, dict]:
+    """
+    Render rows as a multi-row VALUES list for a text() statement.
+    Returns the SQL fragment and its bind params (named :<column>_<row index>).
+    """
+    groups = []
+    params = {}
+    for i, row in enumerate(rows):
+        names = []
+        for col in columns:
+            key = f"{col}_{i}"
+            params[key] = row[col]
+            names.append(f":{key}")
+        groups.append(f"({', '.join(names)})")
+    return ", ".join(groups), params
+
+
+def upsert_timeseries(session, rows: list[dict], chunk_size: int = UPSERT_CHUNK_SIZE,
+                      freeze_scaled: bool = False) -> dict:
+    """
+    Upsert source_timeseries rows with chunked multi-row
+    INSERT ... ON CONFLICT (topic_id, source, date, geo) DO UPDATE.
+
+    Rows need topic_id, source, date, geo and raw_value; normalized_value
+    and scaled_value default to NULL and created_at to now. Rows repeating a
+    key keep the last value, as sequential single-row upserts would.
+
+    An existing row is only rewritten (and its created_at bumped) when its
+    values actually change, so re-fetching an overlapping window leaves
+    unchanged dates behind the feature high-water mark. With
+    ``freeze_scaled`` the rows carry scaled_value (Google Trends on the fixed
+    anchor scale): an update writes raw_value and scaled_value, leaves
+    normalized_value alone, and skips stored rows whose scaled_value is
+    already set, so values on the fixed scale stay put.
+    Returns {"inserted": n, "updated": n, "unchanged": n}.
+    """
+    now = datetime.utcnow()
+    deduped = {}
+    for row in rows:
+        key = (str(row["topic_id"]), row["source"], row["date"], row["geo"])
+        deduped[key] = {
+            "normalized_value": None, "scaled_value": None, "created_at": now, **row,
+        }
+    rows = list(deduped.values())
+
+    value_column = "scaled_value" if freeze_scaled else "normalized_value"
+    frozen = "source_timeseries.scaled_value IS NULL AND " if freeze_scaled else ""
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    for i in range(0, len(rows), chunk_size):
+        chunk = rows[i:i + chunk_size]
+        values_sql, params = multi_row_values(chunk, TIMESERIES_COLUMNS)
+        result = session.execute(text(f"""
+            INSERT INTO source_timeseries ({", ".join(TIMESERIES_COLUMNS)})
+            VALUES {values_sql}
+            ON CONFLICT (topic_id, source, date, geo)
+            DO UPDATE SET raw_value = EXCLUDED.raw_value,
+                          {value_column} = EXCLUDED.{value_column},
+                          created_at = EXCLUDED.created_at
+            WHERE {frozen}(source_timeseries.raw_value IS DISTINCT FROM EXCLUDED.raw_value
+               OR source_timeseries.{value_column} IS DISTINCT FROM EXCLUDED.{value_column})
+            RETURNING (xmax = 0) AS inserted
+        """), params).fetchall()
+        inserted = sum(1 for r in result if r.inserted)
+        counts["inserted"] += inserted
+        counts["updated"] += len(result) - inserted
+        counts["unchanged"] += len(chunk) - len(result)
+    return counts
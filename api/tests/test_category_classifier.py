@@ -0,0 +1,61 @@
+"""Compiled category classifier vs. the per-rule CATEGORY_RULES loop it replaced."""
+import re
+
+import numpy as np
+import pytest
+
+from app.tasks.discovery import (
+    CATEGORY_RULES, SEED_DISCOVERY_KEYWORDS, CategoryClassifier, classify_category, classify_many,
+)
+
+
+def reference_category(keyword):
+    """classify_category before CategoryClassifier."""
+    kw_lower = keyword.lower()
+    for category_slug, patterns in CATEGORY_RULES:
+        for pattern in patterns:
+            if re.search(pattern, kw_lower):
+                return category_slug
+    return "general"
+
+
+def _vocabulary():
+    words = {w for kws in SEED_DISCOVERY_KEYWORDS.values() for kw in kws for w in kw.split()}
+    # literal fragments of the rule patterns, so keywords hit several rules at once
+    for _, patterns in CATEGORY_RULES:
+        for pattern in patterns:
+            words.update(w for w in re.split(r"[|.*()?\\]+", pattern) if w.isalpha())
+    return sorted(words)
+
+
+def _random_keywords(seed, n=3000):
+    rng = np.random.default_rng(seed)
+    vocab = _vocabulary()
+    keywords = []
+    for _ in range(n):
+        words = list(rng.choice(vocab, int(rng.integers(1, 5))))
+        keyword = " ".join(words) if rng.random() < 0.7 else "".join(words)
+        keywords.append(keyword.upper() if rng.random() < 0.1 else keyword)
+    return keywords + ["", "zzz", "anti-aging serum", "anti aging"]
+
+
+def test_seed_keywords_match_reference():
+    keywords = [kw for kws in SEED_DISCOVERY_KEYWORDS.values() for kw in kws]
+    assert classify_many(keywords) == [reference_category(k) for k in keywords]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_classify_many_matches_reference(seed):
+    keywords = _random_keywords(seed)
+    expected = [reference_category(k) for k in keywords]
+    assert classify_many(keywords) == expected
+    assert [classify_category(k) for k in keywords] == expected
+    assert len(set(expected)) > 5
+
+
+def test_first_rule_wins_across_positions():
+    rules = [("late", [r"zeta"]), ("early", [r"alpha"])]
+    classifier = CategoryClassifier(rules)
+    # "alpha" matches earlier in the string, but "late" is the earlier rule
+    assert classifier.classify("alpha zeta") == "late"
+    assert classifier.classify_many(["alpha", "zeta alpha", "none"]) == ["early", "late", "general"]
@@ -0,0 +1,131 @@
+"""Topic embedding refresh with the hashing encoder: changed-text selection and the bulk UPDATE."""
+import re
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services.embeddings import EMBEDDING_DIM, HashingEmbedder, embedding_text
+from app.tasks.embeddings import (
+    EMBEDDING_UPDATE_BATCH, _embedding_updates, _pending_embeddings, _write_embeddings,
+)
+
+
+class RecordingSession:
+    """
+    Applies the UPDATE ... FROM (VALUES ...) statements _write_embeddings
+    issues to an in-memory topics table, keyed by id.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.statements = []
+
+    def execute(self, statement, params):
+        sql = str(statement)
+        assert "UPDATE topics t" in sql and "FROM (VALUES" in sql
+        self.statements.append(params)
+        n_rows = len(re.findall(r"\(:id_\d+, :embedding_\d+, :fingerprint_\d+", sql))
+        updated = 0
+        for i in range(n_rows):
+            row = self.table.get(params[f"id_{i}"])
+            if row is not None:
+                row["embedding"] = np.array(
+                    [float(v) for v in params[f"embedding_{i}"].strip("[]").split(",")])
+                row["embedding_fingerprint"] = params[f"fingerprint_{i}"]
+                updated += 1
+        return SimpleNamespace(rowcount=updated)
+
+
+def _table(n, seed=0):
+    rng = np.random.default_rng(seed)
+    words = ["smart", "ring", "led", "mask", "air", "fryer", "pet", "camera", "yoga", "mat"]
+    table = {}
+    for _ in range(n):
+        topic_id = str(uuid.uuid4())
+        table[topic_id] = {
+            "id": topic_id,
+            "name": " ".join(rng.choice(words, 2)),
+            "description": None if rng.random() < 0.3 else " ".join(rng.choice(words, 6)),
+            "embedding": None, "embedding_fingerprint": None,
+        }
+    return table
+
+
+def _rows(table):
+    return [SimpleNamespace(**row) for row in sorted(table.values(), key=lambda r: r["id"])]
+
+
+def _refresh(table, encoder, force=False):
+    """One embed_topics page: select changed topics, encode, bulk-update. Returns ids embedded."""
+    pending = _pending_embeddings(_rows(table), encoder.name, force)
+    if pending:
+        vectors = encoder.encode([content for _, content, _ in pending])
+        assert _write_embeddings(RecordingSession(table), _embedding_updates(pending, vectors)) \
+            == len(pending)
+    return {topic_id for topic_id, _, _ in pending}
+
+
+def test_only_changed_text_is_re_embedded():
+    encoder = HashingEmbedder()
+    table = _table(50)
+
+    assert _refresh(table, encoder) == set(table)
+    assert _refresh(table, encoder) == set()
+
+    ids = sorted(table)
+    table[ids[0]]["name"] += " pro"
+    table[ids[1]]["description"] = "now with a description"
+    table[ids[2]]["description"] = table[ids[2]]["description"]  # same text: not re-embedded
+    new_id = str(uuid.uuid4())
+    table[new_id] = {"id": new_id, "name": "heated jacket", "description": None,
+                     "embedding": None, "embedding_fingerprint": None}
+
+    assert _refresh(table, encoder) == {ids[0], ids[1], new_id}
+    assert _refresh(table, encoder) == set()
+    assert _refresh(table, encoder, force=True) == set(table)
+
+
+def test_encoder_change_re_embeds_everything():
+    table = _table(20)
+    _refresh(table, HashingEmbedder())
+
+    class OtherEncoder(HashingEmbedder):
+        name = "hashing-v2"
+
+    assert _refresh(table, OtherEncoder()) == set(table)
+
+
+def test_stored_vectors_match_the_encoder():
+    encoder = HashingEmbedder()
+    table = _table(30, seed=1)
+    _refresh(table, encoder)
+
+    rows = _rows(table)
+    expected = encoder.encode([embedding_text(r.name, r.description) for r in rows])
+    stored = np.stack([table[r.id]["embedding"] for r in rows])
+    assert stored.shape == (len(rows), EMBEDDING_DIM)
+    np.testing.assert_allclose(stored, expected, atol=1e-6)
+    np.testing.assert_allclose(np.linalg.norm(stored, axis=1), 1.0, atol=1e-4)
+
+
+@pytest.mark.parametrize("n", [1, EMBEDDING_UPDATE_BATCH, 2 * EMBEDDING_UPDATE_BATCH + 3])
+def test_bulk_update_batches(n):
+    table = _table(n, seed=2)
+    pending = _pending_embeddings(_rows(table), HashingEmbedder.name)
+    vectors = HashingEmbedder().encode([content for _, content, _ in pending])
+    session = RecordingSession(table)
+
+    assert _write_embeddings(session, _embedding_updates(pending, vectors)) == n
+    assert len(session.statements) == -(-n // EMBEDDING_UPDATE_BATCH)
+    assert all(row["embedding_fingerprint"] is not None for row in table.values())
+
+
+def test_bulk_update_skips_deleted_topics():
+    table = _table(5, seed=3)
+    pending = _pending_embeddings(_rows(table), HashingEmbedder.name)
+    del table[pending[0][0]]
+    vectors = HashingEmbedder().encode([content for _, content, _ in pending])
+
+    assert _write_embeddings(RecordingSession(table), _embedding_updates(pending, vectors)) == 4
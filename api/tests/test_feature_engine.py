@@ -0,0 +1,113 @@
+"""Vectorized feature engine vs. the original per-topic feature loop."""
+import numpy as np
+import pytest
+
+from app.services.feature_engine import GT_WINDOW, REDDIT_WINDOW, compute_features
+
+
+def _growth(values, weeks_back):
+    if len(values) < weeks_back + 1:
+        return None
+    current_sma = (values[-1] + values[-2]) / 2 if len(values) >= 2 else values[-1]
+    past_sma = ((values[-(weeks_back + 1)] + values[-(weeks_back + 2)]) / 2
+                if len(values) >= weeks_back + 2 else values[-(weeks_back + 1)])
+    return (current_sma - past_sma) / max(past_sma, 1.0)
+
+
+def _sma(values, window):
+    if len(values) < window:
+        return None
+    return sum(values[-window:]) / window
+
+
+def _volatility(values, window):
+    if len(values) < window:
+        return None
+    recent = values[-window:]
+    mean = sum(recent) / len(recent)
+    return (sum((v - mean) ** 2 for v in recent) / len(recent)) ** 0.5
+
+
+def reference_features(gt_values, reddit_values, src_count):
+    """Per-topic implementation generate_features used before the engine."""
+    features = {}
+    if len(gt_values) >= 2:
+        features["value_latest"] = gt_values[-1]
+    if len(gt_values) >= 4:
+        features["growth_1w"] = _growth(gt_values, 1)
+        features["sma_4w"] = _sma(gt_values, 4)
+        features["volatility_4w"] = _volatility(gt_values, 4)
+    if len(gt_values) >= 6:
+        features["growth_4w"] = _growth(gt_values, 4)
+        g1w_current = _growth(gt_values, 1)
+        g1w_prev = _growth(gt_values[:-1], 1) if len(gt_values) > 2 else None
+        if g1w_current is not None and g1w_prev is not None:
+            features["acceleration"] = g1w_current - g1w_prev
+    if len(gt_values) >= 14:
+        features["growth_12w"] = _growth(gt_values, 12)
+        features["sma_12w"] = _sma(gt_values, 12)
+    if gt_values:
+        features["volume_percentile"] = (gt_values[-1] / max(max(gt_values), 1)) * 100
+    if len(reddit_values) >= 2:
+        r_prev = reddit_values[-2]
+        features["reddit_velocity"] = (reddit_values[-1] - r_prev) / max(r_prev, 1)
+    features["source_count"] = src_count or 0
+    if len(gt_values) >= 12 and len(reddit_values) >= 12:
+        n = 12
+        g, r = gt_values[-n:], reddit_values[-n:]
+        g_mean, r_mean = sum(g) / n, sum(r) / n
+        num = sum((gi - g_mean) * (ri - r_mean) for gi, ri in zip(g, r))
+        den_g = sum((gi - g_mean) ** 2 for gi in g) ** 0.5
+        den_r = sum((ri - r_mean) ** 2 for ri in r) ** 0.5
+        if den_g > 0 and den_r > 0:
+            features["cross_source_correlation"] = num / (den_g * den_r)
+    return {k: v for k, v in features.items() if v is not None}
+
+
+def _random_topics(seed, n_topics=500):
+    rng = np.random.default_rng(seed)
+    gt, reddit, sources = [], [], []
+    for _ in range(n_topics):
+        n_gt, n_reddit = rng.integers(0, 40), rng.integers(0, 40)
+        if rng.random() < 0.5:
+            # Trends-like integers, with flat stretches and zeros
+            gt.append([float(v) for v in rng.integers(0, 101, n_gt)])
+        else:
+            gt.append([float(v) for v in rng.gamma(2.0, 30.0, n_gt)])
+        if rng.random() < 0.1:
+            reddit.append([0.0] * n_reddit)
+        else:
+            reddit.append([float(v) for v in rng.poisson(5, n_reddit)])
+        sources.append(int(rng.integers(0, 4)))
+    return gt, reddit, sources
+
+
+def _rounded(features):
+    return {k: round(float(v), 4) for k, v in features.items()}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_reference_implementation(seed):
+    gt, reddit, sources = _random_topics(seed)
+    got = compute_features(gt, reddit, sources)
+
+    assert len(got) == len(gt)
+    for g, r, s, features in zip(gt, reddit, sources, got):
+        expected = reference_features(g, r, s)
+        assert set(features) == set(expected)
+        assert _rounded(features) == _rounded(expected)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_truncated_windows_with_all_time_high(seed):
+    gt, reddit, sources = _random_topics(100 + seed)
+    highs = [max(g) if g else None for g in gt]
+    got = compute_features([g[-GT_WINDOW:] for g in gt], [r[-REDDIT_WINDOW:] for r in reddit],
+                           sources, all_time_highs=highs)
+
+    for g, r, s, features in zip(gt, reddit, sources, got):
+        assert _rounded(features) == _rounded(reference_features(g, r, s))
+
+
+def test_empty_input():
+    assert compute_features([], [], []) == []
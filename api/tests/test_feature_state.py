@@ -0,0 +1,38 @@
+"""Incremental feature state: the high-water mark and re-applying rows read twice."""
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app.tasks.features import HWM_SAFETY_LAG, _apply_row, _high_water_mark, _new_series_entry
+
+READ_AT = datetime(2026, 3, 2, 6, 0, tzinfo=timezone.utc)
+
+
+def _row(day, value, created_at, source="google_trends"):
+    return SimpleNamespace(source=source, geo="US", date=day, created_at=created_at,
+                           scaled_value=value, raw_value=value)
+
+
+def test_mark_trails_the_read():
+    recent = READ_AT - timedelta(minutes=1)
+    old = READ_AT - 2 * HWM_SAFETY_LAG
+    assert _high_water_mark(recent, READ_AT) == READ_AT - HWM_SAFETY_LAG
+    assert _high_water_mark(old, READ_AT) == old
+    assert _high_water_mark(None, READ_AT) == READ_AT - HWM_SAFETY_LAG
+
+
+def test_late_committed_row_stays_past_the_mark():
+    # Writer A stamps and commits just before the read; writer B stamped its
+    # row earlier but commits after the read, so the read only sees A's.
+    a = _row(date(2026, 3, 1), 40.0, READ_AT - timedelta(minutes=1))
+    b = _row(date(2026, 2, 28), 35.0, READ_AT - timedelta(minutes=5))
+
+    entry = _new_series_entry()
+    assert _apply_row(entry, a)
+    mark = _high_water_mark(entry["hwm"], READ_AT)
+    assert entry["hwm"] == a.created_at and b.created_at > mark
+
+    # The next run reads everything past the mark: A again and B for the first time.
+    for r in (a, b):
+        assert _apply_row(entry, r)
+    assert entry["gt_dates"] == [date(2026, 2, 28), date(2026, 3, 1)]
+    assert entry["gt"] == [35.0, 40.0]
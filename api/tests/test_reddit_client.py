@@ -0,0 +1,168 @@
+"""RedditSearchClient against a stub Reddit server: Retry-After backoff, 401 token refresh, concurrency."""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from app.services.reddit_client import RedditSearchClient
+
+SUBREDDITS = ["gadgets", "BuyItForLife"]
+
+
+class StubReddit:
+    """
+    Token endpoint plus /r/<subs>/search.json. ``respond(stub, keyword, auth)``
+    may return a (status, headers) pair to answer instead of a listing.
+    """
+
+    def __init__(self, respond=lambda stub, keyword, auth: None, delay=0.0):
+        self.respond = respond
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.searches = []  # (arrival time, keyword, Authorization, status)
+        self.token_requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def issue_token(self, handler):
+        with self.lock:
+            self.token_requests.append(handler.headers.get("Authorization"))
+            token = f"tok{len(self.token_requests)}"
+        return 200, {}, {"access_token": token, "token_type": "bearer", "expires_in": 3600}
+
+    def search(self, handler):
+        url = urlparse(handler.path)
+        params = parse_qs(url.query)
+        keyword = params["q"][0]
+        auth = handler.headers.get("Authorization")
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            override = self.respond(self, keyword, auth)
+            status, headers = override or (200, {})
+            with self.lock:
+                self.searches.append((time.monotonic(), keyword, auth, status))
+            assert url.path == f"/r/{'+'.join(SUBREDDITS)}/search.json"
+            assert params["restrict_sr"] == ["1"] and params["limit"] == ["100"]
+            posts = [{"data": {"score": 10, "num_comments": 2, "subreddit": "gadgets"}}] * len(keyword)
+            return status, headers, {"data": {"children": posts}} if status == 200 else {}
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture
+def stub_reddit():
+    stub = StubReddit()
+
+    class Handler(BaseHTTPRequestHandler):
+        def _respond(self, status, headers, body):
+            raw = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self._respond(*stub.issue_token(self))
+
+        def do_GET(self):
+            self._respond(*stub.search(self))
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    stub.base_url = f"http://127.0.0.1:{server.server_port}"
+    yield stub
+    server.shutdown()
+    server.server_close()
+
+
+def _client(stub, **kwargs):
+    kwargs.setdefault("requests_per_minute", 60000)
+    return RedditSearchClient("neuranest-test", base_url=stub.base_url, subreddits=SUBREDDITS,
+                              **kwargs)
+
+
+def _fetch(client, keywords):
+    async def run():
+        results = {}
+        async for item, stats, error in client.iter_mentions([{"keyword": k} for k in keywords]):
+            results[item["keyword"]] = (stats, error)
+        return results
+    return asyncio.run(run())
+
+
+def test_retry_after_defers_the_host(stub_reddit):
+    def respond(stub, keyword, auth):
+        if keyword == "limited" and not any(k == "limited" for _, k, _, _ in stub.searches):
+            return 429, {"Retry-After": "0.5"}
+        return None
+
+    stub_reddit.respond = respond
+    keywords = ["limited"] + [f"kw{i}" for i in range(8)]
+    results = _fetch(_client(stub_reddit, concurrency=3), keywords)
+
+    assert all(error is None for _, error in results.values())
+    assert results["limited"][0]["mention_count"] == len("limited")
+    limited_at = next(t for t, k, _, status in stub_reddit.searches if status == 429)
+    retried_at = next(t for t, k, _, status in stub_reddit.searches
+                      if k == "limited" and status == 200)
+    assert retried_at - limited_at >= 0.45
+    # the whole host waited, not just the rate-limited keyword (in-flight requests aside)
+    assert not [t for t, _, _, _ in stub_reddit.searches if limited_at + 0.1 < t < limited_at + 0.45]
+
+
+def test_rejected_token_is_refreshed_once(stub_reddit):
+    def respond(stub, keyword, auth):
+        if auth == "Bearer tok1" and len(stub.searches) >= 3:
+            return 401, {}
+        return None
+
+    stub_reddit.respond = respond
+    stub_reddit.delay = 0.02
+    keywords = [f"kw{i}" for i in range(16)]
+    results = _fetch(_client(stub_reddit, client_id="id", client_secret="secret", concurrency=4),
+                     keywords)
+
+    assert all(error is None for _, error in results.values())
+    # several workers saw the 401 at once, but only one of them refreshed
+    assert len(stub_reddit.token_requests) == 2
+    assert all(auth.startswith("Basic ") for auth in stub_reddit.token_requests)
+    rejected = [auth for _, _, auth, status in stub_reddit.searches if status == 401]
+    assert rejected and set(rejected) == {"Bearer tok1"}
+    last = max(t for t, _, _, status in stub_reddit.searches if status == 401)
+    assert all(auth == "Bearer tok2" for t, _, auth, status in stub_reddit.searches
+               if status == 200 and t > last)
+
+
+@pytest.mark.parametrize("concurrency", [1, 3, 6])
+def test_concurrency_bound(stub_reddit, concurrency):
+    stub_reddit.delay = 0.05
+    keywords = [f"kw{i}" for i in range(18)]
+    results = _fetch(_client(stub_reddit, concurrency=concurrency), keywords)
+
+    assert sorted(results) == sorted(keywords)
+    assert all(error is None for _, error in results.values())
+    assert stub_reddit.max_in_flight == concurrency
+
+
+def test_gives_up_after_max_attempts(stub_reddit):
+    stub_reddit.respond = lambda stub, keyword, auth: (429, {"Retry-After": "0"})
+    results = _fetch(_client(stub_reddit, concurrency=2, max_attempts=3), ["a", "b"])
+
+    assert all(isinstance(error, RuntimeError) and stats is None for stats, error in results.values())
+    assert len(stub_reddit.searches) == 6
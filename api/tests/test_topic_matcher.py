@@ -0,0 +1,93 @@
+"""TopicMatcher vs. the per-keyword extractOne / substring loop discovery used before."""
+import sys
+
+import numpy as np
+import pytest
+
+from app.services.topic_matcher import TopicMatcher
+
+WORDS = ["smart", "led", "desk", "lamp", "air", "fryer", "yoga", "mat", "wireless", "earbuds",
+         "portable", "blender", "pet", "camera", "standing", "bottle", "water", "usb", "hub",
+         "ring", "light", "mini", "projector", "heated", "jacket", "oil", "diffuser", "x"]
+
+
+def reference_match(keyword, topics):
+    """fuzzy_match_topic before TopicMatcher."""
+    from rapidfuzz import fuzz, process
+
+    if not topics:
+        return None
+    choices = {t["id"]: t["name"] for t in topics}
+    match = process.extractOne(keyword, choices, scorer=fuzz.token_sort_ratio)
+    if match and match[1] >= 85:
+        return {"topic_id": match[2], "score": match[1] / 100}
+    return None
+
+
+def reference_fallback(keyword, topics):
+    """fuzzy_match_topic's substring fallback without rapidfuzz."""
+    kw_lower = keyword.lower()
+    for t in topics:
+        name_lower = t["name"].lower()
+        if kw_lower == name_lower or kw_lower in name_lower or name_lower in kw_lower:
+            return {"topic_id": t["id"], "score": 0.90}
+    return None
+
+
+def _mutate(rng, name):
+    tokens = name.split()
+    op = rng.integers(0, 6)
+    if op == 0 and len(tokens) > 1:
+        rng.shuffle(tokens)
+    elif op == 1:
+        chars = list(" ".join(tokens))
+        pos = int(rng.integers(0, len(chars)))
+        chars[pos] = chr(int(rng.integers(97, 123)))
+        return "".join(chars)
+    elif op == 2:
+        tokens.append(str(rng.choice(WORDS)))
+    elif op == 3 and len(tokens) > 1:
+        tokens.pop(int(rng.integers(0, len(tokens))))
+    elif op == 4:
+        return " ".join(tokens).upper()
+    return " ".join(tokens)
+
+
+def _random_case(seed, n_topics=400, n_keywords=600):
+    rng = np.random.default_rng(seed)
+    names = [" ".join(rng.choice(WORDS, int(rng.integers(1, 5)))) for _ in range(n_topics)]
+    names += names[:5]  # duplicate names: the earliest topic must win
+    topics = [{"id": f"t{i}", "name": name} for i, name in enumerate(names)]
+    keywords = [_mutate(rng, str(rng.choice(names))) for _ in range(n_keywords // 2)]
+    keywords += [" ".join(rng.choice(WORDS, int(rng.integers(1, 5))))
+                 for _ in range(n_keywords - len(keywords))]
+    keywords += ["", "x", "a"]
+    return topics, keywords
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_match_many_equals_extract_one(seed):
+    pytest.importorskip("rapidfuzz")
+    topics, keywords = _random_case(seed)
+    matcher = TopicMatcher(topics)
+    assert matcher.uses_rapidfuzz
+
+    got = matcher.match_many(keywords)
+    expected = [reference_match(k, topics) for k in keywords]
+    assert got == expected
+    assert any(m is not None for m in got) and any(m is None for m in got)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_fallback_equals_substring_loop(seed, monkeypatch):
+    monkeypatch.setitem(sys.modules, "rapidfuzz", None)  # import now raises ImportError
+    topics, keywords = _random_case(seed)
+    matcher = TopicMatcher(topics)
+    assert not matcher.uses_rapidfuzz
+
+    got = matcher.match_many(keywords)
+    assert got == [reference_fallback(k, topics) for k in keywords]
+
+
+def test_no_topics():
+    assert TopicMatcher([]).match_many(["smart lamp"]) == [None]
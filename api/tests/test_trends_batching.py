@@ -0,0 +1,109 @@
+"""Anchor-scaled Trends batching: payload plan, request count and drift over chained runs."""
+import math
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.trends_batching import (
+    ANCHOR_LEVEL, PAYLOAD_SIZE, bootstrap_scale, fit_error, fit_scale,
+    naive_request_count, plan_batches,
+)
+
+ANCHOR = "weather"
+
+
+def test_anchor_in_every_payload():
+    keywords = [f"kw{i}" for i in range(23)] + ["kw3", "kw7", ANCHOR]
+    batches = plan_batches(keywords, ANCHOR)
+
+    assert all(batch[0] == ANCHOR and len(batch) <= PAYLOAD_SIZE for batch in batches)
+    members = [kw for batch in batches for kw in batch[1:]]
+    assert sorted(members) == sorted(set(keywords) - {ANCHOR})
+
+
+def test_packs_by_level_new_keywords_last():
+    levels = {"high": 80.0, "low": 2.0, "mid": 20.0}
+    batches = plan_batches(["new", "high", "mid", "low"], ANCHOR, levels)
+    assert batches == [[ANCHOR, "low", "mid", "high", "new"]]
+
+
+@pytest.mark.parametrize("n_topics,n_unique", [(1, 1), (40, 40), (200, 120), (500, 180)])
+def test_request_count_against_naive_batching(n_topics, n_unique):
+    keywords = [f"kw{i % n_unique}" for i in range(n_topics)]
+    batches = plan_batches(keywords, ANCHOR)
+
+    assert len(batches) == math.ceil(n_unique / (PAYLOAD_SIZE - 1))
+    assert naive_request_count(n_topics) == math.ceil(n_topics / PAYLOAD_SIZE)
+    # The anchor slot costs up to a quarter more requests with no duplicates;
+    # deduplication wins it back once topics share keywords.
+    if n_unique == n_topics:
+        assert len(batches) <= math.ceil(naive_request_count(n_topics) * 1.25)
+    else:
+        assert len(batches) <= naive_request_count(n_topics)
+
+
+def _truth(days, seed):
+    """Daily true interest for the anchor and four keywords of different magnitudes."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(days)
+    anchor = 40 + 8 * np.sin(2 * np.pi * t / 365) + 3 * np.sin(2 * np.pi * t / 7)
+    series = {ANCHOR: anchor}
+    for i, level in enumerate([5.0, 15.0, 30.0, 60.0]):
+        trend = np.exp(np.cumsum(rng.normal(0.002, 0.02, days)))
+        series[f"kw{i}"] = level * trend / trend[0]
+    return series
+
+
+def _trends_response(truth, start, end, first_day):
+    """What Trends returns: the window scaled so its largest value is 100, rounded."""
+    window = {kw: values[start:end] for kw, values in truth.items()}
+    peak = max(float(v.max()) for v in window.values())
+    index = [first_day + timedelta(days=i) for i in range(start, end)]
+    return pd.DataFrame({kw: np.round(v * 100 / peak) for kw, v in window.items()}, index=index)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_chained_daily_runs_do_not_drift(seed):
+    days, window = 450, 90
+    truth = _truth(days, seed)
+    first_day = date(2025, 1, 1)
+    anchor_series, stored, errors = {}, {}, []
+
+    # One run per day over a rolling window, the last day partial, the way
+    # ingest_google_trends uses _store_trends_batch: fit on the stored anchor
+    # series, extend it with new dates, never rewrite a stored date.
+    for end in range(window, days + 1):
+        df = _trends_response(truth, end - window, end, first_day)
+        partial = {df.index[-1]}
+        factor = (fit_scale(df, {ANCHOR: anchor_series}, partial) if anchor_series
+                  else bootstrap_scale(df, ANCHOR, partial))
+        assert factor is not None
+        scaled = df.astype(float) * factor
+        if len(anchor_series) > 0:
+            errors.append(fit_error(scaled, {ANCHOR: anchor_series}, partial))
+        for day, row in scaled.iterrows():
+            if day in partial:
+                continue
+            anchor_series.setdefault(day, float(row[ANCHOR]))
+            for kw in truth:
+                stored.setdefault((kw, day), float(row[kw]))
+
+    # The global scale is the truth times the factor the first run fixed.
+    unit = ANCHOR_LEVEL / float(np.mean(truth[ANCHOR][:window - 1]))
+
+    def relative_error(offset, length=60):
+        errs = []
+        for kw, values in truth.items():
+            for i in range(offset, offset + length):
+                expected = values[i] * unit
+                errs.append(abs(stored[(kw, first_day + timedelta(days=i))] - expected) / expected)
+        return float(np.mean(errs))
+
+    early, late = relative_error(0), relative_error(days - 61)
+    assert early < 0.05
+    assert late < 0.05
+    # A year of chained fits doesn't accumulate error on top of the rounding.
+    assert late < early + 0.02
+    assert max(errors) < 0.05
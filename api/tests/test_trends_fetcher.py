@@ -0,0 +1,368 @@
+"""TrendsFetcherPool: 429 cooldown, requeue, retries, identity retirement, and the real client."""
+import json
+import sys
+import threading
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+
+from app.services import trends_fetcher
+from app.services.trends_fetcher import (
+    MAX_BATCH_ATTEMPTS, MAX_RATE_LIMIT_STRIKES, TrendsFetcherPool, TrendsIdentity,
+    default_client_factory,
+)
+
+
+class TooManyRequestsError(Exception):
+    pass
+
+
+class FakeClient:
+    """Stands in for CachedTrendsClient; ``script`` decides each call's outcome."""
+
+    def __init__(self, identity, before_request, script):
+        self.identity = identity
+        self.before_request = before_request
+        self.script = script
+        self.calls = []
+        self.hits = 0
+        self.misses = 0
+
+    def interest_over_time(self, keywords, timeframe, geo="US"):
+        self.before_request()
+        self.misses += 1
+        self.calls.append(tuple(keywords))
+        outcome = self.script(self.identity.name, keywords, len(self.calls))
+        if isinstance(outcome, Exception):
+            raise outcome
+        return pd.DataFrame({kw: [1.0, 2.0] for kw in keywords})
+
+    def related_queries(self, keywords, timeframe, geo="US"):
+        return {kw: None for kw in keywords}
+
+
+@pytest.fixture(autouse=True)
+def fast_cooldown(monkeypatch):
+    monkeypatch.setattr(trends_fetcher, "COOLDOWN_BASE_SECONDS", 0.01)
+    monkeypatch.setattr(trends_fetcher, "POLL_SECONDS", 0.01)
+
+
+def _pool(identities, script):
+    clients = {}
+
+    def factory(identity, cache, before_request):
+        clients[identity.name] = FakeClient(identity, before_request, script)
+        return clients[identity.name]
+
+    pool = TrendsFetcherPool(identities, "today 3-m", cache=None, with_related=False,
+                             client_factory=factory)
+    return pool, clients
+
+
+def _identities(*names):
+    return [TrendsIdentity(name, requests_per_minute=60000) for name in names]
+
+
+def _batches(n):
+    return [(i, [f"kw{i}a", f"kw{i}b"]) for i in range(n)]
+
+
+def _run(pool, batches):
+    results = {}
+    for batch_idx, keywords, df, related, error in pool.run(batches):
+        assert batch_idx not in results
+        results[batch_idx] = (keywords, df, error)
+    return results
+
+
+def test_all_batches_complete():
+    pool, clients = _pool(_identities("a", "b"), lambda name, kws, n: None)
+    results = _run(pool, _batches(10))
+
+    assert sorted(results) == list(range(10))
+    assert all(error is None and list(df.columns) == kws for kws, df, error in results.values())
+    assert sum(len(c.calls) for c in clients.values()) == 10
+    assert pool.misses == 10
+
+
+def test_rate_limit_cools_down_identity_and_requeues_batch():
+    # "a" is rate limited on its first request only
+    def script(name, keywords, n):
+        return TooManyRequestsError("429") if name == "a" and n == 1 else None
+
+    identities = _identities("a", "b")
+    pool, clients = _pool(identities, script)
+    results = _run(pool, _batches(6))
+
+    assert sorted(results) == list(range(6))
+    assert all(error is None for _, _, error in results.values())
+    # the 429'd batch was fetched again, by whichever identity picked it up
+    assert sum(len(c.calls) for c in clients.values()) == 7
+    assert not identities[0].retired
+
+
+def test_cooldown_defers_only_the_limited_identity(monkeypatch):
+    monkeypatch.setattr(trends_fetcher, "COOLDOWN_BASE_SECONDS", 30.0)
+    identities = _identities("a", "b")
+    pool, _ = _pool(identities, lambda name, kws, n: None)
+
+    pool._on_rate_limited(identities[0], TooManyRequestsError("429"))
+
+    assert identities[0].strikes == 1
+    assert pool.backoff.delay("a") >= 29.0
+    assert pool.backoff.delay("b") == 0
+
+
+def test_identity_retired_after_repeated_rate_limits():
+    a_exhausted = threading.Event()
+
+    def script(name, keywords, n):
+        if name == "a":
+            if n >= MAX_RATE_LIMIT_STRIKES:
+                a_exhausted.set()
+            return TooManyRequestsError("429")
+        # hold "b" back until "a" has used up its strikes
+        a_exhausted.wait(timeout=5)
+        return None
+
+    identities = _identities("a", "b")
+    pool, clients = _pool(identities, script)
+    results = _run(pool, _batches(8))
+
+    assert identities[0].retired
+    assert identities[0].strikes == MAX_RATE_LIMIT_STRIKES
+    assert len(clients["a"].calls) == MAX_RATE_LIMIT_STRIKES
+    assert not identities[1].retired
+    assert all(error is None for _, _, error in results.values())
+    assert len(clients["b"].calls) == 8
+
+
+def test_batches_fail_once_every_identity_is_retired():
+    identities = _identities("a", "b")
+    pool, _ = _pool(identities, lambda name, kws, n: TooManyRequestsError("429"))
+    results = _run(pool, _batches(5))
+
+    assert all(i.retired for i in identities)
+    assert sorted(results) == list(range(5))
+    assert all(df is None and error is not None for _, df, error in results.values())
+
+
+def test_transient_error_is_retried():
+    failures = {}
+    lock = threading.Lock()
+
+    def script(name, keywords, n):
+        with lock:
+            failures[keywords[0]] = failures.get(keywords[0], 0) + 1
+            return ValueError("boom") if failures[keywords[0]] < MAX_BATCH_ATTEMPTS else None
+
+    pool, _ = _pool(_identities("a", "b"), script)
+    results = _run(pool, _batches(3))
+
+    assert all(error is None for _, _, error in results.values())
+    assert all(count == MAX_BATCH_ATTEMPTS for count in failures.values())
+
+
+def test_persistent_error_gives_up_after_max_attempts():
+    pool, clients = _pool(_identities("a"), lambda name, kws, n: ValueError("boom"))
+    results = _run(pool, _batches(2))
+
+    assert all(isinstance(error, ValueError) for _, _, error in results.values())
+    assert len(clients["a"].calls) == 2 * MAX_BATCH_ATTEMPTS
+
+
+def test_default_factory_applies_cookies_lazily(monkeypatch):
+    created = []
+
+    class FakeTrendReq:
+        def __init__(self, **kwargs):
+            self.kwargs = kwargs
+            self.cookies = {"NID": "from-google"}
+            created.append(self)
+
+        def build_payload(self, keywords, timeframe, geo):
+            self.payload = (keywords, timeframe, geo)
+
+        def interest_over_time(self):
+            return pd.DataFrame({kw: [1.0] for kw in self.payload[0]})
+
+    module = types.ModuleType("pytrends.request")
+    module.TrendReq = FakeTrendReq
+    monkeypatch.setitem(sys.modules, "pytrends", types.ModuleType("pytrends"))
+    monkeypatch.setitem(sys.modules, "pytrends.request", module)
+
+    identity = TrendsIdentity("a", proxy="http://proxy:8080", cookies={"NID": "configured"})
+    client = default_client_factory(identity, None, lambda: None)
+    client.cache = None
+    assert created == []
+
+    client.interest_over_time(["x"], "today 3-m")
+    assert len(created) == 1
+    assert created[0].cookies["NID"] == "configured"
+    assert created[0].kwargs["proxies"] == ["http://proxy:8080"]
+
+
+# ─── Real client against a stub Trends server ───
+
+class StubTrends:
+    """
+    Minimal Google Trends HTTP endpoints for TrendReq: cookie page, explore
+    (tokens), multiline and relatedsearches. ``rate_limit`` decides, per
+    (path, nth request to it), whether to answer 429.
+    """
+
+    def __init__(self, rate_limit=lambda path, n: False):
+        self.rate_limit = rate_limit
+        self.requests = []
+        self.cookies = []
+        self.lock = threading.Lock()
+
+    def handle(self, handler):
+        url = urlparse(handler.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        with self.lock:
+            self.requests.append(url.path)
+            self.cookies.append(handler.headers.get("Cookie", ""))
+            n = self.requests.count(url.path)
+        if self.rate_limit(url.path, n):
+            return 429, "text/html", "", {}
+        if url.path.endswith("/explore/"):
+            return 200, "text/html", "", {"Set-Cookie": "NID=from-google; Path=/"}
+        if url.path.endswith("/api/explore"):
+            keywords = [item["keyword"] for item in json.loads(params["req"])["comparisonItem"]]
+            widgets = [{"id": "TIMESERIES", "token": "t", "request": {"keywords": keywords}}]
+            widgets += [{"id": f"RELATED_QUERIES_{i}", "token": "r", "request": {
+                "restriction": {"complexKeywordsRestriction": {"keyword": [{"value": kw}]}}}}
+                for i, kw in enumerate(keywords)]
+            return 200, "application/json", ")]}'" + json.dumps({"widgets": widgets}), {}
+        if url.path.endswith("/multiline"):
+            keywords = json.loads(params["req"])["keywords"]
+            points = [{"time": str(1700000000 + 86400 * day),
+                       "value": [10 * (i + 1) + day for i in range(len(keywords))]}
+                      for day in range(3)]
+            points[-1]["isPartial"] = True
+            return 200, "application/json", ")]}'," + json.dumps(
+                {"default": {"timelineData": points}}), {}
+        if url.path.endswith("/relatedsearches"):
+            kw = json.loads(params["req"])["restriction"]["complexKeywordsRestriction"]["keyword"][0]["value"]
+            ranked = [{"rankedKeyword": [{"query": f"{kw} deals", "value": 100}]},
+                      {"rankedKeyword": []}]
+            return 200, "application/json", ")]}'," + json.dumps({"default": {"rankedList": ranked}}), {}
+        return 404, "text/html", "", {}
+
+
+@pytest.fixture
+def stub_trends(monkeypatch):
+    request = pytest.importorskip("pytrends.request")
+    stub = StubTrends()
+
+    class Handler(BaseHTTPRequestHandler):
+        def _respond(self):
+            status, content_type, body, headers = stub.handle(self)
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body.encode())
+
+        do_GET = do_POST = _respond
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_port}/trends"
+    monkeypatch.setattr(request, "BASE_TRENDS_URL", base)
+    for name, path in [("GENERAL_URL", "/api/explore"),
+                       ("INTEREST_OVER_TIME_URL", "/api/widgetdata/multiline"),
+                       ("RELATED_QUERIES_URL", "/api/widgetdata/relatedsearches")]:
+        monkeypatch.setattr(request.TrendReq, name, base + path)
+    yield stub
+    server.shutdown()
+    server.server_close()
+
+
+class DictRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+
+def _metered_factory(charges):
+    def factory(identity, cache, before_request):
+        def charge():
+            charges.append(identity.name)
+            before_request()
+        return default_client_factory(identity, cache, charge)
+    return factory
+
+
+def test_default_client_against_stub_server(stub_trends):
+    # the first interest_over_time request is rate limited
+    stub_trends.rate_limit = lambda path, n: path.endswith("/multiline") and n == 1
+    cache = trends_fetcher.TrendsCache(redis_client=DictRedis())
+    charges = []
+    identity = TrendsIdentity("a", cookies={"NID": "configured"}, requests_per_minute=60000)
+    pool = TrendsFetcherPool([identity], "today 3-m", cache=cache,
+                             client_factory=_metered_factory(charges))
+    results = {}
+    for batch_idx, keywords, df, related, error in pool.run(_batches(3)):
+        results[batch_idx] = (keywords, df, related, error)
+
+    assert sorted(results) == [0, 1, 2]
+    for keywords, df, related, error in results.values():
+        assert error is None
+        assert list(df.columns) == keywords + ["isPartial"]
+        assert df[keywords[1]].tolist() == [20, 21, 22]
+        assert df["isPartial"].tolist() == [False, False, True]
+        assert related[keywords[0]]["top"]["query"].tolist() == [f"{keywords[0]} deals"]
+    assert identity.strikes == 0
+
+    paths = stub_trends.requests
+    assert sum(p.endswith("/explore/") for p in paths) == 1
+    assert sum(p.endswith("/multiline") for p in paths) == 4  # 3 batches + the 429'd retry
+    assert sum(p.endswith("/relatedsearches") for p in paths) == 6  # one per keyword
+    # every HTTP request, not every client call, was charged to the bucket
+    assert len(charges) == len(paths)
+    # configured identity cookies replace the one from Google
+    assert all("NID=configured" in c for c, p in zip(stub_trends.cookies, paths)
+               if not p.endswith("/explore/"))
+
+    # a second run is served from the shared cache without touching the server
+    pool = TrendsFetcherPool([TrendsIdentity("b", requests_per_minute=60000)], "today 3-m",
+                             cache=cache, client_factory=_metered_factory(charges))
+    rerun = {batch_idx: df for batch_idx, _, df, _, error in pool.run(_batches(3))}
+    assert sorted(rerun) == [0, 1, 2]
+    assert len(stub_trends.requests) == len(paths)
+    assert pool.hits == 6 and pool.misses == 0
+
+
+def test_default_client_retires_identity_on_persistent_429(stub_trends):
+    stub_trends.rate_limit = lambda path, n: path.endswith("/api/explore")
+    charges = []
+    identity = TrendsIdentity("a", requests_per_minute=60000)
+    pool = TrendsFetcherPool([identity], "today 3-m", cache=None, with_related=False,
+                             client_factory=_metered_factory(charges))
+    results = _run(pool, _batches(2))
+
+    assert identity.retired
+    assert all(df is None and error is not None for _, df, error in results.values())
+    assert sum(p.endswith("/api/explore") for p in stub_trends.requests) == MAX_RATE_LIMIT_STRIKES
+    assert len(charges) == len(stub_trends.requests)
+
+
+def test_pool_shares_one_cache_across_identities():
+    pool = TrendsFetcherPool(_identities("a", "b", "c"), "today 3-m")
+    caches = {id(client.cache) for client in pool.clients.values()}
+    assert len(caches) == 1 and pool.clients["a"].cache is not None
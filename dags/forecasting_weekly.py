@@ -2,7 +2,9 @@
 from datetime import datetime, timedelta
 from airflow import DAG
 from airflow.operators.python import PythonOperator
-import uuid
+from neuranest_shared.cache_keys import bump_generations_from_airflow
+import logging, uuid
+logger = logging.getLogger(__name__)
 
 default_args = {"owner": "neuranest", "retries": 2, "retry_delay": timedelta(minutes=10)}
 dag = DAG("forecasting_weekly", default_args=default_args, schedule_interval="0 12 * * 2",
@@ -20,24 +22,35 @@ def run_forecasts(**ctx):
     """)
     for (topic_id,) in topics:
         ts_data = hook.get_pandas_df(
-            "SELECT date as ds, AVG(COALESCE(normalized_value, raw_value)) as y FROM source_timeseries WHERE topic_id = %s GROUP BY date ORDER BY date",
+            "SELECT date as ds, AVG(COALESCE(scaled_value, normalized_value, raw_value)) as y FROM source_timeseries WHERE topic_id = %s GROUP BY date ORDER BY date",
             parameters=(str(topic_id),))
         if len(ts_data) < 6: continue
         try:
             from prophet import Prophet
             m = Prophet(yearly_seasonality=True, weekly_seasonality=False, changepoint_prior_scale=0.1, interval_width=0.80)
             m.fit(ts_data)
+            rows = []
             for horizon in [3, 6]:
                 future = m.make_future_dataframe(periods=horizon * 30, freq="D")
                 forecast = m.predict(future)
                 # Store monthly forecasts
                 monthly = forecast.tail(horizon * 30).resample("M", on="ds").last()
                 for _, row in monthly.iterrows():
-                    hook.run("""INSERT INTO forecasts (id, topic_id, horizon_months, forecast_date, yhat, yhat_lower, yhat_upper, model_version, generated_at)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW())""",
-                        parameters=(str(uuid.uuid4()), str(topic_id), horizon, row["ds"].date(),
-                            float(row["yhat"]), float(row["yhat_lower"]), float(row["yhat_upper"]), "prophet_v1"))
+                    rows.append((str(uuid.uuid4()), str(topic_id), horizon, row["ds"].date(),
+                        float(row["yhat"]), float(row["yhat_lower"]), float(row["yhat_upper"]), "prophet_v1"))
+            # Replace the topic's whole forecast set (any model version) in one
+            # transaction; NOW() stamps every row with the same generated_at.
+            conn = hook.get_conn()
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("DELETE FROM forecasts WHERE topic_id = %s", (str(topic_id),))
+                    cur.executemany("""INSERT INTO forecasts (id, topic_id, horizon_months, forecast_date, yhat, yhat_lower, yhat_upper, model_version, generated_at)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW())""", rows)
+                conn.commit()
+            finally:
+                conn.close()
         except Exception as e:
             print(f"Forecast failed for {topic_id}: {e}")
+    bump_generations_from_airflow("forecasts")
 
 t1 = PythonOperator(task_id="run_forecasts", python_callable=run_forecasts, dag=dag)
@@ -2,6 +2,7 @@
 from datetime import datetime, timedelta
 from airflow import DAG
 from airflow.operators.python import PythonOperator
+from neuranest_shared.cache_keys import bump_generations_from_airflow
 import logging, uuid
 logger = logging.getLogger(__name__)
 
@@ -14,8 +15,10 @@ dag = DAG("keywordtool_ingest_daily", default_args=default_args,
 def get_tracked_keywords(**ctx):
     from airflow.providers.postgres.hooks.postgres import PostgresHook
     hook = PostgresHook(postgres_conn_id="neuranest_db")
-    records = hook.get_records("SELECT id, keyword, geo FROM keywords WHERE source = 'keywordtool'")
-    ctx["ti"].xcom_push(key="keywords", value=[{"id": str(r[0]), "keyword": r[1], "geo": r[2]} for r in records])
+    records = hook.get_records("SELECT id, keyword, geo, topic_id FROM keywords WHERE source = 'keywordtool'")
+    ctx["ti"].xcom_push(key="keywords", value=[
+        {"id": str(r[0]), "keyword": r[1], "geo": r[2], "topic_id": str(r[3]) if r[3] else None}
+        for r in records])
 
 def fetch_from_api(**ctx):
     import httpx
@@ -36,19 +39,24 @@ def fetch_from_api(**ctx):
 
 def parse_and_upsert(**ctx):
     from airflow.providers.postgres.hooks.postgres import PostgresHook
+    from sqlalchemy.orm import Session
+    from neuranest_shared.timeseries_upsert import upsert_timeseries
     hook = PostgresHook(postgres_conn_id="neuranest_db")
     results = ctx["ti"].xcom_pull(key="api_results")
-    inserted = 0
+    rows = []
     for batch in results:
         if "error" in batch: continue
         for kw in batch["keywords"]:
+            if not kw.get("topic_id"): continue
             vol = batch["data"].get("results", {}).get(kw["keyword"], {}).get("volume", 0)
-            hook.run("""INSERT INTO source_timeseries (topic_id, source, date, geo, raw_value)
-                SELECT k.topic_id, 'keywordtool', %s, k.geo, %s FROM keywords k WHERE k.id = %s AND k.topic_id IS NOT NULL
-                ON CONFLICT (topic_id, source, date, geo) DO UPDATE SET raw_value = EXCLUDED.raw_value""",
-                parameters=(ctx["ds"], vol, kw["id"]))
-            inserted += 1
-    ctx["ti"].xcom_push(key="inserted", value=inserted)
+            rows.append({"topic_id": kw["topic_id"], "source": "keywordtool", "date": ctx["ds"],
+                         "geo": kw["geo"], "raw_value": vol})
+    with Session(hook.get_sqlalchemy_engine()) as session:
+        counts = upsert_timeseries(session, rows)
+        session.commit()
+    bump_generations_from_airflow("timeseries")
+    logger.info("keywordtool upsert: %s inserted, %s updated", counts["inserted"], counts["updated"])
+    ctx["ti"].xcom_push(key="inserted", value=counts["inserted"] + counts["updated"])
 
 def log_run(**ctx):
     from airflow.providers.postgres.hooks.postgres import PostgresHook
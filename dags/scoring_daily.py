@@ -2,7 +2,9 @@
 from datetime import datetime, timedelta
 from airflow import DAG
 from airflow.operators.python import PythonOperator
-import uuid
+from neuranest_shared.cache_keys import bump_generations_from_airflow
+import logging, uuid
+logger = logging.getLogger(__name__)
 
 default_args = {"owner": "neuranest", "retries": 2, "retry_delay": timedelta(minutes=3)}
 dag = DAG("scoring_daily", default_args=default_args, schedule_interval="0 9 * * *",
@@ -17,5 +19,6 @@ def compute_scores(**ctx):
         hook.run("""INSERT INTO scores (id, topic_id, score_type, score_value, explanation_json, computed_at)
             VALUES (%s, %s, 'opportunity', 50.0, '{}', NOW())
             ON CONFLICT DO NOTHING""", parameters=(str(uuid.uuid4()), str(topic_id)))
+    bump_generations_from_airflow("scores")
 
 t1 = PythonOperator(task_id="compute_scores", python_callable=compute_scores, dag=dag)
@@ -271,7 +271,7 @@ function TrendTab({ topicId }: { topicId: string }) {
   for (const p of (ts?.data || [])) {
     const d = p.date
     if (!dateMap[d]) dateMap[d] = { sum: 0, count: 0, sources: {} }
-    const val = p.normalized_value || p.raw_value || 0
+    const val = p.scaled_value || p.normalized_value || p.raw_value || 0
     dateMap[d].sum += val
     dateMap[d].count += 1
     dateMap[d].sources[p.source] = val